@@ -1,5 +1,7 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, session
-from utils import DNSManager
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, session, Response, stream_with_context, g
+from utils import DNSManager, Deadline
+from contextlib import ExitStack
+import json
 import logging
 
 app = Flask(__name__)
@@ -8,19 +10,82 @@ app.config['SECRET_KEY'] = 'your-secret-key-here-change-in-production'
 # DNS configuration
 DNS_SERVER = '192.168.1.201'
 dns_manager = DNSManager(DNS_SERVER)
+dns_manager.start_zone_refresher()
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+@app.before_request
+def bind_ssh_context():
+    """Give the request its own read-only SSH configuration from the session
+
+    Sessions without SSH settings get an explicitly unconfigured context.
+    """
+    ssh_config = session.get('ssh_config')
+    g.ssh_context = ExitStack()
+    g.ssh_context.enter_context(dns_manager.ssh_context(
+        ssh_config if ssh_config and ssh_config.get('configured') else {'configured': False}
+    ))
+
+
+@app.teardown_request
+def release_ssh_context(exc):
+    """Unbind the request SSH configuration from the worker thread"""
+    ssh_context = g.pop('ssh_context', None)
+    if ssh_context is not None:
+        ssh_context.close()
+
+
+def backends_error():
+    """Describe the backends currently failing fast, None when all are reachable"""
+    unavailable = dns_manager.breakers.unavailable()
+    if not unavailable:
+        return None
+    return f"Backend unreachable ({', '.join(unavailable)}), retrying in the background"
+
+
+def run_mutation(kind, zones, function, *args):
+    """Run a record mutation through the background job queue
+
+    Returns (result, None) once the mutation has run: inline when
+    asynchronous mutations are disabled, or after waiting for its job with
+    ?wait=1. Otherwise returns (None, response), the 202 response carrying
+    the job ID to poll at /api/jobs/<id>.
+    """
+    if not dns_manager.config.get('jobs', {}).get('async_mutations', True):
+        return function(*args), None
+
+    job = dns_manager.submit_mutation(kind, zones, function, *args)
+    if job is None:
+        logger.warning(f"Record {kind} rejected: too many pending changes")
+        return None, (jsonify({
+            'success': False,
+            'message': 'Too many pending record changes, retry later'
+        }), 503)
+
+    if request.args.get('wait', '0').lower() in ('1', 'true', 'yes'):
+        return dns_manager.wait_for_job(job['id'])['result'], None
+
+    logger.info(f"Record {kind} queued as job {job['id']} (zones: {', '.join(job['zones'])})")
+    return None, (jsonify({
+        'success': True,
+        'message': f'Record {kind} queued',
+        'job_id': job['id'],
+        'status_url': url_for('get_job', job_id=job['id']),
+        'job': job
+    }), 202)
+
+
 @app.route('/')
 def index():
     """Main application page"""
     try:
         zones = dns_manager.get_zones()
         ssh_configured = 'ssh_config' in session and session['ssh_config'].get('configured', False)
-        return render_template('index.html', zones=zones, ssh_configured=ssh_configured)
+        return render_template('index.html', zones=zones, ssh_configured=ssh_configured,
+                               error=backends_error())
     except Exception as e:
         logger.error(f"Error loading main page: {e}")
         return render_template('index.html', zones=[], ssh_configured=False, 
@@ -79,9 +144,6 @@ def api_ssh_config():
             session['ssh_config'] = ssh_config
             session.permanent = True
             
-            # Update DNS manager configuration
-            dns_manager.update_ssh_config(ssh_config)
-            
             logger.info(f"SSH configuration successful for {username}@{hostname}")
             return jsonify({
                 'success': True,
@@ -132,7 +194,8 @@ def add_record_form():
     try:
         zones = dns_manager.get_zones()
         record_types = dns_manager.get_supported_record_types()
-        return render_template('add_record.html', zones=zones, record_types=record_types)
+        return render_template('add_record.html', zones=zones, record_types=record_types,
+                               error=backends_error())
     except Exception as e:
         logger.error(f"Error loading add page: {e}")
         return render_template('add_record.html', zones=[], record_types=[],
@@ -143,11 +206,6 @@ def add_record_form():
 def api_add_record():
     """API to add a new DNS record"""
     try:
-        # Check if SSH is configured
-        ssh_config = session.get('ssh_config')
-        if ssh_config and ssh_config.get('configured'):
-            dns_manager.update_ssh_config(ssh_config)
-
         # Get form data
         zone = request.form.get('zone', '').strip()
         name = request.form.get('name', '').strip()
@@ -172,8 +230,10 @@ def api_add_record():
             }), 400
 
         # Add record
-        result = dns_manager.add_dns_record(zone, name, record_type, value, ttl)
-        
+        result, queued = run_mutation('add', [zone], dns_manager.add_dns_record, zone, name, record_type, value, ttl)
+        if queued:
+            return queued
+
         if result['success']:
             logger.info(f"Record added successfully: {name}.{zone} {record_type} {value}")
             return jsonify(result)
@@ -216,10 +276,20 @@ def get_records():
         if not zone:
             return jsonify({'error': 'Zone required'}), 400
 
-        records = dns_manager.get_records(zone, record_type)
+        # Clients may give up sooner than the configured request timeout
+        deadline = None
+        timeout = request.args.get('timeout', type=float)
+        if timeout is not None and timeout > 0:
+            configured = dns_manager.config.get('discovery', {}).get('request_timeout', 30)
+            deadline = Deadline(min(timeout, configured) if configured else timeout)
+
+        result = dns_manager.get_records_with_sources(zone, record_type, deadline)
         return jsonify({
             'success': True,
-            'records': records,
+            'records': result['records'],
+            'sources': result['sources'],
+            'complete': result['complete'],
+            'unavailable': result['unavailable'],
             'zone': zone,
             'type': record_type
         })
@@ -232,14 +302,79 @@ def get_records():
         }), 500
 
 
+@app.route('/api/records/stream')
+def stream_records():
+    """API to stream DNS records as they are transferred (NDJSON or chunked JSON)"""
+    zone = request.args.get('zone', '')
+    record_type = request.args.get('type', 'all')
+    output_format = request.args.get('format', 'ndjson')
+
+    if not zone:
+        return jsonify({'error': 'Zone required'}), 400
+    if output_format not in ('ndjson', 'json'):
+        return jsonify({'error': 'Format must be ndjson or json'}), 400
+
+    # Start the transfer before sending headers so a refusal can still
+    # fall back to the regular (non-streamed) record discovery
+    records = dns_manager.iter_zone_records(zone, record_type)
+    try:
+        first = next(records, None)
+        pending = [first] if first is not None else []
+    except Exception as e:
+        logger.warning(f"Streaming transfer unavailable for {zone}, using standard discovery: {e}")
+        try:
+            # The transfer was just refused: go straight to the zone file and queries
+            pending = dns_manager.get_records_with_sources(zone, record_type, try_transfer=False)['records']
+        except Exception as e:
+            logger.error(f"Error retrieving records: {e}")
+            return jsonify({
+                'success': False,
+                'error': f'Error retrieving records: {str(e)}'
+            }), 500
+        records = iter(())
+
+    def generate_ndjson():
+        try:
+            for record in pending:
+                yield json.dumps(record) + '\n'
+            for record in records:
+                yield json.dumps(record) + '\n'
+        except Exception as e:
+            logger.error(f"Error streaming records for {zone}: {e}")
+            yield json.dumps({'error': f'Error retrieving records: {str(e)}'}) + '\n'
+
+    def generate_json():
+        yield f'{{"zone": {json.dumps(zone)}, "type": {json.dumps(record_type)}, "records": ['
+        count = 0
+        error = None
+        try:
+            for source in (pending, records):
+                for record in source:
+                    yield (', ' if count else '') + json.dumps(record)
+                    count += 1
+        except Exception as e:
+            logger.error(f"Error streaming records for {zone}: {e}")
+            error = f'Error retrieving records: {str(e)}'
+        yield f'], "count": {count}, "success": {json.dumps(error is None)}'
+        yield (f', "error": {json.dumps(error)}}}' if error else '}')
+
+    if output_format == 'json':
+        return Response(stream_with_context(generate_json()), mimetype='application/json')
+    return Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/zones')
 def get_zones():
     """API to retrieve the list of DNS zones"""
     try:
         zones = dns_manager.get_zones()
+        status = dns_manager.get_zones_status()
         return jsonify({
             'success': True,
-            'zones': zones
+            'zones': zones,
+            'discovery_method': status['discovery_method'],
+            'refreshed_at': status['refreshed_at'],
+            'refreshing': status['refreshing']
         })
     except Exception as e:
         logger.error(f"Error retrieving zones: {e}")
@@ -251,7 +386,7 @@ def get_zones():
 
 @app.route('/api/zones/refresh', methods=['POST'])
 def refresh_zones():
-    """API to force automatic zone discovery via SSH"""
+    """API to trigger an immediate background zone discovery via SSH"""
     try:
         # Check if SSH is configured
         ssh_config = session.get('ssh_config')
@@ -261,32 +396,37 @@ def refresh_zones():
                 'error': 'SSH configuration required for automatic zone discovery'
             }), 400
 
-        # Update SSH configuration in DNS manager
-        dns_manager.update_ssh_config(ssh_config)
-        
-        # Force zone rediscovery by clearing cache if necessary
+        # Trigger a rescan in the background worker, which runs outside this
+        # request with this SSH configuration; other requests keep being
+        # served from the current snapshot while it runs
         logger.info("Triggering automatic zone discovery...")
-        
-        # Call zone discovery method directly
-        zones = dns_manager._get_zones_from_config()
-        
-        if zones:
+        completed = dns_manager.refresh_zones(ssh_config)
+
+        # Optionally wait (bounded) for the rescan so the caller gets fresh results
+        wait = request.args.get('wait', '0').lower() in ('1', 'true', 'yes')
+        if wait:
+            timeout = dns_manager.config.get('discovery', {}).get('refresh_wait_timeout', 30)
+            completed.wait(timeout)
+
+        status = dns_manager.get_zones_status()
+        zones = status['zones'] or dns_manager.get_zones()
+
+        if not completed.is_set():
+            message = f'Zone discovery running in background, {len(zones)} cached zones returned'
+        elif status['discovery_method'] == 'ssh_automatic':
             logger.info(f"Discovery successful: {len(zones)} zones found")
-            return jsonify({
-                'success': True,
-                'zones': zones,
-                'message': f'{len(zones)} zones automatically discovered',
-                'discovery_method': 'ssh_automatic'
-            })
+            message = f'{len(zones)} zones automatically discovered'
         else:
-            # Use fallback zones
-            fallback_zones = dns_manager._get_fallback_zones()
-            return jsonify({
-                'success': True,
-                'zones': fallback_zones,
-                'message': 'No zones discovered via SSH, using fallback zones',
-                'discovery_method': 'fallback'
-            })
+            message = 'No zones discovered via SSH, using fallback zones'
+
+        return jsonify({
+            'success': True,
+            'zones': zones,
+            'message': message,
+            'discovery_method': status['discovery_method'] or 'fallback',
+            'refreshing': not completed.is_set(),
+            'refreshed_at': status['refreshed_at']
+        }), 200 if completed.is_set() else 202
 
     except Exception as e:
         logger.error(f"Error refreshing zones: {e}")
@@ -296,15 +436,45 @@ def refresh_zones():
         }), 500
 
 
+@app.route('/api/metrics')
+def get_metrics():
+    """API to retrieve runtime metrics (SSH pool, caches)"""
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': dns_manager.get_metrics()
+        })
+    except Exception as e:
+        logger.error(f"Error retrieving metrics: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Error retrieving metrics: {str(e)}'
+        }), 500
+
+
+@app.route('/api/backends')
+def get_backends():
+    """API to retrieve the circuit breaker state of the DNS and SSH backends"""
+    try:
+        status = dns_manager.get_backend_status()
+        return jsonify({
+            'success': True,
+            'healthy': not status['unavailable'],
+            'backends': status['backends'],
+            'unavailable': status['unavailable']
+        })
+    except Exception as e:
+        logger.error(f"Error retrieving backend status: {e}")
+        return jsonify({
+            'success': False,
+            'error': f'Error retrieving backend status: {str(e)}'
+        }), 500
+
+
 @app.route('/api/delete-record', methods=['POST'])
 def api_delete_record():
     """API to delete a DNS record"""
     try:
-        # Check if SSH is configured
-        ssh_config = session.get('ssh_config')
-        if ssh_config and ssh_config.get('configured'):
-            dns_manager.update_ssh_config(ssh_config)
-
         # Get data
         data = request.get_json()
         zone = data.get('zone', '').strip()
@@ -320,8 +490,10 @@ def api_delete_record():
             }), 400
 
         # Delete record
-        result = dns_manager.delete_dns_record(zone, name, record_type, value)
-        
+        result, queued = run_mutation('delete', [zone], dns_manager.delete_dns_record, zone, name, record_type, value)
+        if queued:
+            return queued
+
         if result['success']:
             logger.info(f"Record deleted successfully: {name}.{zone} {record_type} {value}")
             return jsonify(result)
@@ -341,11 +513,6 @@ def api_delete_record():
 def api_update_record():
     """API to modify a DNS record"""
     try:
-        # Check if SSH is configured
-        ssh_config = session.get('ssh_config')
-        if ssh_config and ssh_config.get('configured'):
-            dns_manager.update_ssh_config(ssh_config)
-
         # Get data
         data = request.get_json()
         zone = data.get('zone', '').strip()
@@ -378,8 +545,10 @@ def api_update_record():
             }), 400
 
         # Modify record
-        result = dns_manager.update_dns_record(zone, original, updated)
-        
+        result, queued = run_mutation('update', [zone], dns_manager.update_dns_record, zone, original, updated)
+        if queued:
+            return queued
+
         if result['success']:
             logger.info(f"Record modified successfully: {original} -> {updated}")
             return jsonify(result)
@@ -395,6 +564,66 @@ def api_update_record():
         }), 500
 
 
+@app.route('/api/records/batch', methods=['POST'])
+def api_records_batch():
+    """API to apply add / delete / update operations as one all-or-nothing commit"""
+    try:
+        data = request.get_json(silent=True) or {}
+        operations = data.get('operations')
+
+        # Basic validation
+        if not isinstance(operations, list) or not operations:
+            return jsonify({
+                'success': False,
+                'message': 'A non-empty list of operations is required'
+            }), 400
+
+        # Apply the whole batch, holding back other changes of all its zones
+        zones = [operation['zone'].strip() for operation in operations
+                 if isinstance(operation, dict) and isinstance(operation.get('zone'), str)]
+        result, queued = run_mutation('batch', zones, dns_manager.apply_record_batch, operations)
+        if queued:
+            return queued
+
+        if result['success']:
+            logger.info(f"Record batch applied: {result['message']}")
+            return jsonify(result)
+        else:
+            logger.warning(f"Record batch failed: {result['message']}")
+            return jsonify(result), 400
+
+    except Exception as e:
+        logger.error(f"Error applying record batch: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Technical error during batch: {str(e)}'
+        }), 500
+
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """API to retrieve the status and result of a queued record change"""
+    try:
+        job = dns_manager.get_job(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'message': f'Unknown or expired job {job_id}'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'done': job['status'] in ('succeeded', 'failed'),
+            'job': job
+        })
+    except Exception as e:
+        logger.error(f"Error retrieving job {job_id}: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Error retrieving job: {str(e)}'
+        }), 500
+
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('index.html', zones=[], error="Page not found"), 404
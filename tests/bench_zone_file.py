@@ -0,0 +1,65 @@
+"""Benchmark ZoneFile on a generated zone file
+
+Usage: python tests/bench_zone_file.py [lines]
+
+Generates a zone of about 100k lines (by default) where one record in three
+is an owner-less quoted TXT, then times parsing, serializing and one edit
+(find + remove + add + serial bump + serialize) and checks the round trip.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ZoneFile  # noqa: E402
+
+
+def generate(lines: int) -> str:
+    parts = [
+        '$TTL 3600\n',
+        '@ IN SOA ns1.bench.test. hostmaster.bench.test. (\n',
+        '        2024010101 ; serial\n',
+        '        7200 3600 1209600 300 )\n',
+        '  IN NS ns1\n',
+    ]
+    host = 0
+    while len(parts) < lines:
+        parts.append(f'host{host:<8} 300 IN A 10.{host >> 16 & 255}.{host >> 8 & 255}.{host & 255}\n')
+        parts.append(f'            300 IN AAAA 2001:db8::{host:x}\n')
+        parts.append(f'            300 IN TXT "id={host}; (quoted)" ; comment\n')
+        host += 1
+    return ''.join(parts[:lines])
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = generate(lines)
+    print(f"{lines} lines, {len(text) / 1e6:.1f} MB")
+
+    zone_file, parse_ms = timed(lambda: ZoneFile(text, 'bench.test'))
+    output, serialize_ms = timed(zone_file.to_text)
+    print(f"parse      {parse_ms:8.1f} ms")
+    print(f"serialize  {serialize_ms:8.1f} ms")
+    print(f"round trip {'identical' if output == text else 'DIFFERENT'}")
+
+    def edit():
+        target = f'host{lines // 6}'
+        zone_file.remove(zone_file.find(target, 'A')[0])
+        zone_file.add(target, 'A', '192.0.2.1', 300)
+        zone_file.bump_serial()
+        return zone_file.to_text()
+
+    _, edit_ms = timed(edit)
+    print(f"edit       {edit_ms:8.1f} ms (find + remove + add + serial bump + serialize)")
+    return 0 if output == text else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def in_repo(monkeypatch):
+    """Run from the repository root, where DNSManager reads zones_config.yaml"""
+    monkeypatch.chdir(ROOT)
+    return ROOT
@@ -0,0 +1,176 @@
+"""Request isolation of the shared DNSManager under concurrent threads and requests"""
+import socket
+import threading
+import time
+
+import dns.message
+import dns.query
+import dns.rcode
+import dns.rrset
+import pytest
+
+from utils import DNSManager
+
+THREADS = 16
+ROUNDS = 50
+
+
+class SOAServer:
+    """UDP server answering SOA queries for a fixed set of zones, NXDOMAIN otherwise"""
+
+    def __init__(self, zones):
+        self.zones = {zone.rstrip('.') + '.' for zone in zones}
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self.socket.close()
+
+    def _serve(self):
+        while True:
+            try:
+                wire, address = self.socket.recvfrom(65535)
+            except OSError:
+                return
+            query = dns.message.from_wire(wire)
+            response = dns.message.make_response(query)
+            qname = query.question[0].name
+            if qname.to_text() in self.zones:
+                response.answer.append(dns.rrset.from_text(
+                    qname, 300, 'IN', 'SOA', f'ns1.{qname} admin.{qname} 1 7200 3600 604800 60'
+                ))
+            else:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            self.socket.sendto(response.to_wire(), address)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    soa_server = SOAServer(['found.test', 'other.test'])
+    # Discovery queries port 53; send them to the test server instead
+    udp_with_fallback = dns.query.udp_with_fallback
+    monkeypatch.setattr(dns.query, 'udp_with_fallback',
+                        lambda *args, **kwargs: udp_with_fallback(*args, **{**kwargs, 'port': soa_server.port}))
+    yield soa_server
+    soa_server.close()
+
+
+@pytest.fixture
+def manager(in_repo, server):
+    manager = DNSManager('127.0.0.1')
+    manager.config['test_zones'] = ['found.test', 'missing.test', 'other.test']
+    manager.config['discovery']['dns_timeout'] = 2
+    return manager
+
+
+def ssh_settings(index: int):
+    """A distinct SSH configuration per thread, every fourth thread without one"""
+    if index % 4 == 3:
+        return None
+    return {'hostname': f'10.0.0.{index}', 'username': f'user{index}', 'password': f'secret{index}',
+            'port': 2200 + index, 'configured': True}
+
+
+def run_threads(target):
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def run(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors
+
+
+def test_ssh_context_is_isolated_per_thread(manager):
+    default = manager.ssh_config
+
+    def worker(index):
+        settings = ssh_settings(index)
+        for _ in range(ROUNDS):
+            with manager.ssh_context(settings) as bound:
+                assert manager.ssh_config is bound
+                time.sleep(0.001)  # let the other threads bind theirs
+                if settings is None:
+                    assert bound is default
+                else:
+                    assert bound['hostname'] == settings['hostname']
+                    assert bound['zone_files_path'] == default['zone_files_path']
+                    with manager.ssh_context({'hostname': 'nested', 'configured': True}):
+                        assert manager.ssh_config['hostname'] == 'nested'
+                    assert manager.ssh_config is bound
+                with pytest.raises(TypeError):
+                    bound['hostname'] = 'changed'
+            assert manager.ssh_config is default
+
+    run_threads(worker)
+    assert manager.ssh_config is default
+
+
+def test_fallback_zones_under_concurrent_contexts(manager):
+    timeout, lifetime = manager.resolver.timeout, manager.resolver.lifetime
+
+    def worker(index):
+        settings = ssh_settings(index)
+        with manager.ssh_context(settings):
+            for _ in range(ROUNDS):
+                assert manager._get_fallback_zones() == ['found.test', 'other.test']
+                expected = settings['hostname'] if settings else '127.0.0.1'
+                assert manager.ssh_config['hostname'] == expected
+
+    run_threads(worker)
+    # Per-query lifetimes only: the shared resolver is never reconfigured
+    assert (manager.resolver.timeout, manager.resolver.lifetime) == (timeout, lifetime)
+
+
+def test_api_zones_under_concurrent_sessions(manager, monkeypatch):
+    import app as web
+    monkeypatch.setattr(web, 'dns_manager', manager)
+    monkeypatch.setattr(manager, 'test_ssh_connection', lambda config: {'success': True, 'message': ''})
+    manager.refresh_zones().wait(10)
+
+    seen = {}
+    get_zones = manager.get_zones
+
+    def recording_get_zones():
+        time.sleep(0.001)
+        config = manager.ssh_config
+        seen.setdefault(threading.get_ident(), set()).add((config['hostname'], config['username'],
+                                                           config['configured']))
+        return get_zones()
+
+    monkeypatch.setattr(manager, 'get_zones', recording_get_zones)
+
+    def worker(index):
+        settings = ssh_settings(index)
+        client = web.app.test_client()
+        if settings is not None:
+            # Configuring SSH in one session must not leak into the others
+            response = client.post('/api/ssh-config', data=settings)
+            assert response.status_code == 200, response.get_json()
+            expected = (settings['hostname'], settings['username'], True)
+        else:
+            expected = ('127.0.0.1', 'admin', False)
+        for _ in range(ROUNDS):
+            response = client.get('/api/zones')
+            assert response.status_code == 200
+            assert response.get_json()['zones'] == ['found.test', 'other.test']
+            assert seen[threading.get_ident()] == {expected}
+            # The request context is unbound once the response is returned
+            assert not manager.ssh_config['configured']
+
+    run_threads(worker)
+    # No request handler changed the configuration seen outside requests
+    assert manager.ssh_config is manager._default_ssh_config
+    assert not manager.ssh_config['configured']
+    assert manager._discovery_ssh_config is None
@@ -0,0 +1,236 @@
+"""NSEC / NSEC3 chain walking against a signed zone served by an in-process dnspython server"""
+import socket
+import threading
+
+import dns.dnssec
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+import dns.rrset
+import dns.zone
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+
+from utils import Deadline, DNSSECChainWalker
+
+ZONE_TEXT = """$TTL 300
+@ SOA ns1 admin 1 7200 3600 604800 60
+@ NS ns1
+ns1 A 10.0.0.1
+www A 10.0.0.2
+www AAAA 2001:db8::2
+mail A 10.0.0.3
+mail MX 10 mail
+_sip._tcp SRV 10 5 5060 www
+"""
+OWNERS = {
+    '@': ['NS', 'SOA'],
+    'ns1': ['A'],
+    'www': ['A', 'AAAA'],
+    'mail': ['A', 'MX'],
+    '_sip._tcp': ['SRV'],
+}
+NSEC3_SALT = 'aabbccdd'
+NSEC3_ITERATIONS = 2
+
+
+def make_key():
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    dnskey = dns.dnssec.make_dnskey(private_key.public_key(), dns.dnssec.Algorithm.ED25519, flags=257)
+    return private_key, dnskey
+
+
+def nsec_zone(origin: str) -> dns.zone.Zone:
+    """Zone signed by dnspython, with its NSEC chain"""
+    zone = dns.zone.from_text(ZONE_TEXT, origin, relativize=False)
+    with zone.writer() as txn:
+        dns.dnssec.sign_zone(zone, txn=txn, keys=[make_key()], lifetime=3600)
+    return zone
+
+
+def nsec3_zone(origin: str) -> dns.zone.Zone:
+    """Zone with an NSEC3 chain built here (dnspython does not sign with NSEC3), every RRset signed"""
+    zone = dns.zone.from_text(ZONE_TEXT, origin, relativize=False)
+    private_key, dnskey = make_key()
+    apex = dns.name.from_text(origin)
+    with zone.writer() as txn:
+        txn.add(apex, 300, dnskey)
+        txn.add(apex, 0, dns.rdata.from_text('IN', 'NSEC3PARAM', f'1 0 {NSEC3_ITERATIONS} {NSEC3_SALT}'))
+
+    hashes = {}
+    for name, node in zone.nodes.items():
+        types = sorted({dns.rdatatype.to_text(rdataset.rdtype) for rdataset in node} | {'RRSIG'})
+        owner_hash = dns.dnssec.nsec3_hash(name, NSEC3_SALT, NSEC3_ITERATIONS, 1)
+        hashes[owner_hash] = types
+    ordered = sorted(hashes)
+    with zone.writer() as txn:
+        for index, owner_hash in enumerate(ordered):
+            following = ordered[(index + 1) % len(ordered)]
+            rdata = dns.rdata.from_text(
+                'IN', 'NSEC3',
+                f"1 0 {NSEC3_ITERATIONS} {NSEC3_SALT} {following} {' '.join(hashes[owner_hash])}"
+            )
+            txn.add(dns.name.from_text(owner_hash, apex), 60, rdata)
+
+    with zone.writer() as txn:
+        for name, node in list(zone.nodes.items()):
+            for rdataset in list(node):
+                rrset = dns.rrset.RRset(name, rdataset.rdclass, rdataset.rdtype)
+                rrset.update(rdataset)
+                rrsig = dns.dnssec.sign(rrset, private_key, apex, dnskey, lifetime=3600)
+                txn.add(name, rdataset.ttl, rrsig)
+    return zone
+
+
+class SignedZoneServer:
+    """UDP server answering from a signed zone, with NSEC or NSEC3 denial of existence"""
+
+    def __init__(self, zone: dns.zone.Zone):
+        self.zone = zone
+        self.origin = zone.origin
+        self.queries = 0
+        nsec3param = zone.get_rdataset(self.origin, 'NSEC3PARAM')
+        self.nsec3 = nsec3param[0] if nsec3param else None
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self.socket.close()
+
+    def _serve(self):
+        while True:
+            try:
+                wire, address = self.socket.recvfrom(65535)
+            except OSError:
+                return
+            self.queries += 1
+            query = dns.message.from_wire(wire)
+            self.socket.sendto(self._answer(query).to_wire(max_size=65535), address)
+
+    def _add(self, section, name, rdataset):
+        rrset = dns.rrset.RRset(name, rdataset.rdclass, rdataset.rdtype)
+        rrset.update(rdataset)
+        section.append(rrset)
+        rrsig = self.zone.get_node(name).get_rdataset(dns.rdataclass.IN, dns.rdatatype.RRSIG, rdataset.rdtype)
+        if rrsig is not None:
+            signatures = dns.rrset.RRset(name, rrsig.rdclass, rrsig.rdtype, rrsig.covers)
+            signatures.update(rrsig)
+            section.append(signatures)
+
+    def _answer(self, query):
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        qname, rdtype = question.name, question.rdtype
+        node = self.zone.get_node(qname)
+        if node is not None:
+            rdataset = node.get_rdataset(dns.rdataclass.IN, rdtype)
+            if rdataset is not None:
+                self._add(response.answer, qname, rdataset)
+            else:
+                self._deny(response, qname, exists=True)
+        else:
+            response.set_rcode(dns.rcode.NXDOMAIN)
+            self._deny(response, qname, exists=False)
+        return response
+
+    def _deny(self, response, qname, exists: bool):
+        soa = self.zone.get_rdataset(self.origin, 'SOA')
+        self._add(response.authority, self.origin, soa)
+        if self.nsec3 is None:
+            # NSEC of the name itself, or the one whose span covers it
+            owner = qname if exists else max(
+                (name for name, node in self.zone.nodes.items()
+                 if node.get_rdataset(dns.rdataclass.IN, dns.rdatatype.NSEC) and name < qname),
+                default=self.origin
+            )
+            self._add(response.authority, owner, self.zone.get_rdataset(owner, 'NSEC'))
+            return
+        salt, iterations = self.nsec3.salt.hex(), self.nsec3.iterations
+        targets = [self.origin, qname] if not exists else [qname]
+        for target in targets:
+            target_hash = dns.dnssec.nsec3_hash(target, salt, iterations, 1)
+            owners = sorted(
+                name.labels[0].decode().upper() for name, node in self.zone.nodes.items()
+                if node.get_rdataset(dns.rdataclass.IN, dns.rdatatype.NSEC3)
+            )
+            covering = max((owner for owner in owners if owner <= target_hash), default=owners[-1])
+            owner = dns.name.from_text(covering, self.origin)
+            self._add(response.authority, owner, self.zone.get_rdataset(owner, 'NSEC3'))
+
+
+@pytest.fixture
+def nsec_server():
+    server = SignedZoneServer(nsec_zone('nsec.test'))
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def nsec3_server():
+    server = SignedZoneServer(nsec3_zone('nsec3.test'))
+    yield server
+    server.close()
+
+
+def expected_names(origin: str):
+    return {dns.name.from_text(name, dns.name.from_text(origin)).to_text(): types
+            for name, types in OWNERS.items()}
+
+
+def test_detect_mode(nsec_server, nsec3_server):
+    assert DNSSECChainWalker('127.0.0.1', port=nsec_server.port).detect_mode('nsec.test', 2) == 'nsec'
+    assert DNSSECChainWalker('127.0.0.1', port=nsec3_server.port).detect_mode('nsec3.test', 2) == 'nsec3'
+
+
+def test_nsec_walk_enumerates_every_owner(nsec_server):
+    walker = DNSSECChainWalker('127.0.0.1', port=nsec_server.port)
+    walk = walker.walk_nsec('nsec.test', 2)
+
+    assert walk['complete']
+    assert set(walk['names']) == set(expected_names('nsec.test'))
+    for name, types in expected_names('nsec.test').items():
+        assert set(types) | {'RRSIG', 'NSEC'} <= set(walk['names'][name])
+    assert walk['queries'] == len(OWNERS)
+
+
+def test_nsec_walk_stops_at_query_limit(nsec_server):
+    walk = DNSSECChainWalker('127.0.0.1', max_queries=2, port=nsec_server.port).walk_nsec('nsec.test', 2)
+    assert not walk['complete']
+    assert walk['queries'] == 2
+    assert len(walk['names']) == 2
+
+
+def test_nsec_walk_stops_at_deadline(nsec_server):
+    deadline = Deadline(0.000001)
+    walk = DNSSECChainWalker('127.0.0.1', port=nsec_server.port).walk_nsec('nsec.test', 2, deadline)
+    assert not walk['complete']
+    assert walk['names'] == {}
+    assert deadline.cut_short
+
+
+def test_nsec3_hashes_collected_and_matched_offline(nsec3_server):
+    walker = DNSSECChainWalker('127.0.0.1', port=nsec3_server.port)
+    collected = walker.collect_nsec3('nsec3.test', 2)
+
+    assert collected['complete']
+    assert len(collected['hashes']) == len(OWNERS)
+    assert collected['params'][1] == NSEC3_ITERATIONS
+    # Names are hashed locally first: far fewer queries than candidates tried
+    assert collected['queries'] < 100
+
+    labels = iter(['nope', 'www', 'mail', 'ns1', 'ftp', '_sip._tcp'])
+    names = walker.match_nsec3('nsec3.test', collected['hashes'], collected['params'], labels)
+    assert set(names) == set(expected_names('nsec3.test'))
+    assert set(names['www.nsec3.test.']) == {'A', 'AAAA', 'RRSIG'}
+    assert 'NSEC3PARAM' in names['nsec3.test.']
+
+
+def test_nsec3_collection_stops_at_query_limit(nsec3_server):
+    collected = DNSSECChainWalker('127.0.0.1', max_queries=1, port=nsec3_server.port).collect_nsec3('nsec3.test', 2)
+    assert collected['queries'] == 1
+    assert not collected['complete']
@@ -0,0 +1,216 @@
+"""RFC 2136 engine against a local dnspython UPDATE stand-in"""
+import base64
+import socket
+import struct
+import threading
+
+import dns.flags
+import dns.message
+import dns.opcode
+import dns.rcode
+import dns.rdataclass
+import dns.rdataset
+import dns.rrset
+import dns.tsig
+import dns.tsigkeyring
+import dns.zone
+import pytest
+
+from utils import DNSManager
+
+SECRET = base64.b64encode(b'0123456789abcdef0123456789abcdef').decode()
+ZONE_TEXT = """$TTL 300
+@ SOA ns1 admin 1 7200 3600 604800 60
+@ NS ns1
+ns1 A 10.0.0.1
+www A 10.0.0.2
+mail MX 10 mx
+"""
+
+
+class UpdateServer:
+    """Minimal TCP server applying TSIG-signed UPDATE messages to an in-memory zone"""
+
+    def __init__(self, origin: str):
+        self.zone = dns.zone.from_text(ZONE_TEXT, origin, relativize=False)
+        self.keyring = dns.tsigkeyring.from_text({'edit-key.': SECRET})
+        self.messages = []
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen()
+        self.port = self.socket.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self.socket.close()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self.socket.accept()
+            except OSError:
+                return
+            with client:
+                size = struct.unpack('!H', self._recv(client, 2))[0]
+                wire = self._recv(client, size)
+                try:
+                    response = self._handle(dns.message.from_wire(wire, keyring=self.keyring))
+                except dns.tsig.BadSignature:
+                    response = dns.message.Message(id=struct.unpack('!H', wire[:2])[0])
+                    response.flags = dns.flags.QR
+                    response.set_opcode(dns.opcode.UPDATE)
+                    response.set_rcode(dns.rcode.NOTAUTH)
+                out = response.to_wire()
+                client.sendall(struct.pack('!H', len(out)) + out)
+
+    @staticmethod
+    def _recv(client, size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            data += client.recv(size - len(data))
+        return data
+
+    def _handle(self, update):
+        if update.opcode() == dns.opcode.QUERY:
+            return self._answer(update)
+        self.messages.append(update)
+        response = dns.message.make_response(update)
+        if not update.had_tsig:
+            response.set_rcode(dns.rcode.REFUSED)
+            return response
+        # Value-dependent prerequisites of one name and type form one RRset
+        expected = {}
+        for rrset in update.prerequisite:
+            node = self.zone.get_node(rrset.name)
+            current = node.get_rdataset(dns.rdataclass.IN, rrset.rdtype) if node is not None else None
+            if rrset.deleting == dns.rdataclass.ANY:
+                if current is None:
+                    response.set_rcode(dns.rcode.NXRRSET)
+                    return response
+            else:
+                expected.setdefault((rrset.name, rrset.rdtype), (current, set()))[1].update(rrset)
+        for current, rdatas in expected.values():
+            # The RRset must hold exactly these records
+            if current is None or set(current) != rdatas:
+                response.set_rcode(dns.rcode.NXRRSET)
+                return response
+        with self.zone.writer() as txn:
+            for rrset in update.update:
+                if rrset.deleting is None:
+                    txn.add(rrset.name, rrset.ttl, *list(rrset))
+                elif rrset.deleting == dns.rdataclass.NONE:
+                    rdataset = dns.rdataset.Rdataset(dns.rdataclass.IN, rrset.rdtype)
+                    for rdata in rrset:
+                        rdataset.add(rdata)
+                    if txn.get(rrset.name, rrset.rdtype) is not None:
+                        txn.delete_exact(rrset.name, rdataset)
+        return response
+
+    def _answer(self, query):
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        rdataset = self.zone.get_rdataset(question.name, question.rdtype)
+        if rdataset is not None:
+            response.answer.append(dns.rrset.from_rdata_list(question.name, rdataset.ttl, list(rdataset)))
+        return response
+
+    def rdataset(self, name: str, rdtype: str):
+        return self.zone.get_rdataset(name, rdtype)
+
+
+@pytest.fixture
+def server():
+    update_server = UpdateServer('dyn.test')
+    yield update_server
+    update_server.close()
+
+
+@pytest.fixture
+def manager(in_repo, server):
+    manager = DNSManager('127.0.0.1')
+    manager.config['dynamic_update'] = {
+        'zones': ['dyn.test'], 'server': '127.0.0.1', 'port': server.port,
+        'tsig_key_name': 'edit-key.', 'tsig_secret': SECRET,
+        'tsig_algorithm': 'hmac-sha256', 'timeout': 2
+    }
+    return manager
+
+
+def test_add_update_delete(manager, server):
+    result = manager.add_dns_record('dyn.test', 'api', 'A', '10.0.0.9', 600)
+    assert result['success'], result
+    assert result['engine'] == 'dynamic_update'
+    assert server.rdataset('api.dyn.test.', 'A').to_text() == '600 IN A 10.0.0.9'
+
+    result = manager.update_dns_record(
+        'dyn.test', {'name': 'www', 'type': 'A', 'value': '10.0.0.2'},
+        {'name': 'www', 'type': 'A', 'value': '10.0.0.3', 'ttl': 300}
+    )
+    assert result['success'], result
+    assert server.rdataset('www.dyn.test.', 'A').to_text() == '300 IN A 10.0.0.3'
+
+    result = manager.delete_dns_record('dyn.test', 'mail.dyn.test.', 'MX', '10 mx')
+    assert result['success'], result
+    assert server.rdataset('mail.dyn.test.', 'MX') is None
+    assert all(message.had_tsig for message in server.messages)
+
+
+def test_delete_missing_record_fails_on_prerequisite(manager, server):
+    result = manager.delete_dns_record('dyn.test', 'nothere', 'A', '10.0.0.2')
+    assert not result['success']
+    assert result['rcode'] == 'NXRRSET'
+    assert result['message'] == 'Record not found in zone'
+
+
+def test_delete_missing_value_of_existing_rrset_fails(manager, server):
+    manager.add_dns_record('dyn.test', 'www', 'A', '10.0.0.4', 300)
+    result = manager.delete_dns_record('dyn.test', 'www', 'A', '10.0.0.99')
+    assert not result['success']
+    assert result['rcode'] == 'NXRRSET'
+    assert result['message'] == 'Record not found in zone'
+    assert {rdata.address for rdata in server.rdataset('www.dyn.test.', 'A')} == {'10.0.0.2', '10.0.0.4'}
+
+    # An update of a missing value must not add the new one next to the old ones
+    result = manager.update_dns_record(
+        'dyn.test', {'name': 'www', 'type': 'A', 'value': '10.0.0.99'},
+        {'name': 'www', 'type': 'A', 'value': '10.0.0.5', 'ttl': 300}
+    )
+    assert not result['success']
+    assert {rdata.address for rdata in server.rdataset('www.dyn.test.', 'A')} == {'10.0.0.2', '10.0.0.4'}
+
+    # One value of a multi-record RRset can still be deleted
+    result = manager.delete_dns_record('dyn.test', 'www', 'A', '10.0.0.2')
+    assert result['success'], result
+    assert {rdata.address for rdata in server.rdataset('www.dyn.test.', 'A')} == {'10.0.0.4'}
+
+
+def test_batch_is_one_update_message(manager, server):
+    operations = [{'op': 'add', 'zone': 'dyn.test', 'name': f'b{i}', 'type': 'TXT', 'value': f'"v {i}"'}
+                  for i in range(50)]
+    result = manager.apply_record_batch(operations)
+    assert result['success'], result['message']
+    assert len(server.messages) == 1
+    assert all(operation['success'] for operation in result['operations'])
+    assert server.rdataset('b49.dyn.test.', 'TXT') is not None
+
+
+def test_batch_mixing_engines_is_rejected_before_sending(manager, server):
+    result = manager.apply_record_batch([
+        {'op': 'add', 'zone': 'dyn.test', 'name': 'x', 'type': 'A', 'value': '10.0.0.7'},
+        {'op': 'add', 'zone': 'files.test', 'name': 'y', 'type': 'A', 'value': '10.0.0.8'}
+    ])
+    assert not result['success']
+    assert 'all or nothing' in result['message']
+    assert server.messages == []
+    assert server.rdataset('x.dyn.test.', 'A') is None
+
+
+def test_wrong_key_and_unsigned_updates_are_rejected(manager, server):
+    manager.config['dynamic_update']['tsig_secret'] = base64.b64encode(b'x' * 32).decode()
+    result = manager.add_dns_record('dyn.test', 'bad', 'A', '10.0.0.9', 600)
+    assert not result['success'] and result['rcode'] == 'NOTAUTH'
+
+    manager.config['dynamic_update']['tsig_key_name'] = ''
+    result = manager.add_dns_record('dyn.test', 'bad', 'A', '10.0.0.9', 600)
+    assert not result['success'] and result['rcode'] == 'REFUSED'
+    assert server.rdataset('bad.dyn.test.', 'A') is None
@@ -0,0 +1,123 @@
+"""PipelinedQueryChannel against a local TCP DNS server"""
+import socket
+import struct
+import threading
+import time
+
+import dns.message
+import dns.rrset
+import pytest
+
+import utils
+from utils import PipelinedQueryChannel
+
+
+class TCPServer:
+    """TCP DNS server answering A queries, optionally sending only part of the next response"""
+
+    def __init__(self):
+        self.truncate_next = False
+        self.connections = 0
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen()
+        self.port = self.socket.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self.socket.close()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self.socket.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client):
+        with client:
+            while True:
+                try:
+                    header = client.recv(2)
+                    if len(header) < 2:
+                        return
+                    query = dns.message.from_wire(utils.DNSManager._recv_exactly(client, struct.unpack('!H', header)[0]))
+                except (OSError, EOFError):
+                    return
+                response = dns.message.make_response(query)
+                response.answer.append(dns.rrset.from_text(query.question[0].name, 60, 'IN', 'A', '192.0.2.1'))
+                wire = response.to_wire()
+                frame = struct.pack('!H', len(wire)) + wire
+                if self.truncate_next:
+                    # Length prefix and a few bytes, then silence
+                    self.truncate_next = False
+                    client.sendall(frame[:6])
+                    continue
+                client.sendall(frame)
+
+
+@pytest.fixture
+def server():
+    tcp_server = TCPServer()
+    yield tcp_server
+    tcp_server.close()
+
+
+def query(name='www.example.com.'):
+    return dns.message.make_query(name, 'A')
+
+
+def test_pipelined_queries_share_one_connection(server):
+    channel = PipelinedQueryChannel('127.0.0.1', port=server.port, idle_timeout=5)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(channel.query(query(f'h{i}.example.com.'), 5)))
+               for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 20
+    assert server.connections == 1
+    channel.close()
+
+
+def test_partial_response_fails_connection_instead_of_desynchronizing(server):
+    channel = PipelinedQueryChannel('127.0.0.1', port=server.port, idle_timeout=0.3)
+    assert channel.query(query(), 5).answer
+
+    server.truncate_next = True
+    start = time.monotonic()
+    with pytest.raises(EOFError, match='middle of a response'):
+        channel.query(query(), 5)
+    # Failed by the read timeout, not left waiting for the whole query timeout
+    assert time.monotonic() - start < 2
+    assert channel.get_metrics()['errors'] == 1
+    assert not channel.get_metrics()['connected']
+
+    # The next query opens a fresh connection and gets a well-framed answer
+    assert channel.query(query(), 5).answer
+    assert server.connections == 2
+    channel.close()
+
+
+def test_connect_does_not_hold_the_channel_lock(server, monkeypatch):
+    create_connection = socket.create_connection
+
+    def slow_create_connection(*args, **kwargs):
+        time.sleep(0.5)
+        return create_connection(*args, **kwargs)
+
+    monkeypatch.setattr(utils.socket, 'create_connection', slow_create_connection)
+    channel = PipelinedQueryChannel('127.0.0.1', port=server.port, idle_timeout=5)
+    thread = threading.Thread(target=channel.query, args=(query(), 5))
+    thread.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert not channel.get_metrics()['connected']
+    assert time.monotonic() - start < 0.2
+    thread.join()
+    assert channel.get_metrics()['connections'] == 1
+    channel.close()
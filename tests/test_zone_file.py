@@ -0,0 +1,144 @@
+"""ZoneFile round trips and edits on the zone file layouts BIND accepts"""
+import dns.zone
+import pytest
+
+from utils import ZoneFile
+
+ZONE_TEXT = """$TTL 3600
+@       IN  SOA ns1.example.com. hostmaster.example.com. (
+                2024010101 ; serial
+                7200       ; refresh
+                3600       ; retry
+                1209600    ; expire
+                300 )      ; minimum
+        IN  NS  ns1
+        IN  MX  10 mail
+ns1     IN  A   192.0.2.1
+www     300 IN A 192.0.2.10
+        IN  AAAA 2001:db8::10
+        IN  TXT "v=spf1 -all; not a comment" ; real comment
+mail    IN  A   192.0.2.20
+$ORIGIN lab.example.com.
+host    IN  A   192.0.2.30
+        IN  TXT ( "two" "strings" )
+$ORIGIN example.com.
+last    IN  CNAME www"""
+
+
+def parse(text=ZONE_TEXT):
+    return ZoneFile(text, 'example.com')
+
+
+def loads(text):
+    """The edited text must still be a zone BIND (here dnspython) can load"""
+    return dns.zone.from_text(text, 'example.com', relativize=False, check_origin=False)
+
+
+def test_round_trip_is_byte_identical():
+    assert parse().to_text() == ZONE_TEXT
+    assert parse(ZONE_TEXT + '\n').to_text() == ZONE_TEXT + '\n'
+    assert parse('').to_text() == ''
+
+
+def test_index_follows_omitted_owners_and_origin():
+    zone_file = parse()
+    assert len(zone_file.find('@', 'NS')) == 1
+    assert len(zone_file.find('@', 'MX')) == 1
+    assert zone_file.find('www', 'AAAA')[0].rdata == '2001:db8::10'
+    assert zone_file.find('host.lab', 'A')[0].origin == 'lab.example.com.'
+    assert zone_file.find('host.lab', 'TXT')[0].rdata == '"two" "strings"'
+    assert zone_file.find('last', 'CNAME')[0].rdata == 'www'
+    assert zone_file.find('host', 'A') == []
+
+
+def test_quoted_semicolon_is_not_a_comment():
+    entry = parse().find('www', 'TXT')[0]
+    assert entry.rdata == '"v=spf1 -all; not a comment"'
+    assert entry.text.endswith('; real comment\n')
+
+
+def test_bump_serial_keeps_multiline_soa_layout():
+    zone_file = parse()
+    assert zone_file.bump_serial() == 2024010102
+    text = zone_file.to_text()
+    assert text == ZONE_TEXT.replace('2024010101 ; serial', '2024010102 ; serial')
+    assert loads(text).get_rdataset('@', 'SOA')[0].serial == 2024010102
+
+
+def test_bump_serial_wraps_around():
+    zone_file = parse(ZONE_TEXT.replace('2024010101', '4294967295'))
+    assert zone_file.bump_serial() == 0
+
+
+def test_remove_pins_owner_of_following_record():
+    zone_file = parse()
+    zone_file.remove(zone_file.find('www', 'A')[0])
+    text = zone_file.to_text()
+    assert 'www     300 IN A' not in text
+    assert 'www        IN  AAAA 2001:db8::10' in text
+    zone = loads(text)
+    assert zone.get_rdataset('www', 'A') is None
+    assert zone.get_rdataset('www', 'AAAA') is not None
+    assert zone.get_rdataset('www', 'TXT') is not None
+
+
+def test_remove_of_inheriting_record_leaves_neighbours():
+    zone_file = parse()
+    zone_file.remove(zone_file.find('www', 'AAAA')[0])
+    zone = loads(zone_file.to_text())
+    assert zone.get_rdataset('www', 'AAAA') is None
+    assert zone.get_rdataset('www', 'TXT') is not None
+
+
+def test_replace_with_new_owner_pins_following_record():
+    zone_file = parse()
+    zone_file.replace(zone_file.find('www', 'A')[0], 'web', 'A', '192.0.2.11', 600)
+    zone = loads(zone_file.to_text())
+    assert zone.get_rdataset('web', 'A')[0].address == '192.0.2.11'
+    assert zone.get_rdataset('www', 'A') is None
+    assert zone.get_rdataset('www', 'AAAA') is not None
+    assert zone_file.find('web', 'A') and not zone_file.find('www', 'A')
+
+
+def test_replace_same_owner_leaves_following_record_inheriting():
+    zone_file = parse()
+    entry = zone_file.find('www', 'AAAA')[0]
+    following = zone_file.find('www', 'TXT')[0]
+    zone_file.replace(zone_file.find('www', 'A')[0], 'www', 'A', '192.0.2.12', 300)
+    assert not entry.explicit and not following.explicit
+    assert loads(zone_file.to_text()).get_rdataset('www', 'AAAA') is not None
+
+
+def test_add_under_origin_and_after_owner():
+    zone_file = parse()
+    zone_file.add('www', 'A', '192.0.2.13', 300)
+    zone_file.add('db.lab', 'A', '192.0.2.31', 300)
+    text = zone_file.to_text()
+    zone = loads(text)
+    assert {rdata.address for rdata in zone.get_rdataset('www', 'A')} == {'192.0.2.10', '192.0.2.13'}
+    assert zone.get_rdataset('db.lab', 'A')[0].address == '192.0.2.31'
+    # Inserted after the last www record, before mail
+    assert text.index('192.0.2.13') < text.index('mail    IN')
+
+
+def test_add_keeps_missing_final_newline():
+    zone_file = parse()
+    zone_file.add('new', 'A', '192.0.2.40', 300)
+    text = zone_file.to_text()
+    assert not text.endswith('\n')
+    assert text.splitlines()[-2] == 'last    IN  CNAME www'
+    assert loads(text).get_rdataset('new', 'A')[0].address == '192.0.2.40'
+
+
+def test_add_to_zone_without_records():
+    zone_file = ZoneFile('$TTL 300\n', 'empty.test')
+    zone_file.add('@', 'A', '192.0.2.1', 300)
+    assert zone_file.to_text().splitlines()[1].split() == ['@', '300', 'IN', 'A', '192.0.2.1']
+
+
+@pytest.mark.parametrize('text', [
+    'www IN TXT "unterminated (\n',
+    '@ IN SOA ns1 admin ( 1 2 3\n',
+])
+def test_unbalanced_text_is_kept_verbatim(text):
+    assert ZoneFile(text, 'example.com').to_text() == text
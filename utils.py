@@ -1,13 +1,40 @@
 import dns.resolver
 import dns.zone
 import dns.query
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
 import dns.rdatatype
+import dns.xfr
+import dns.dnssec
+import dns.edns
+import dns.rdtypes.ANY.NSEC3
+import dns.tsigkeyring
+import dns.update
+import dns.rdata
+import dns.rrset
+import base64
+import bisect
+import hashlib
+import io
+import itertools
+import json
 import re
+import secrets
 import logging
 import os
+import shlex
+import socket
+import struct
 import tempfile
+import threading
 import time
-from typing import List, Dict, Any
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import List, Dict, Any, Callable, Iterator, Mapping, Optional, Tuple
 
 try:
     import paramiko
@@ -25,6 +52,2023 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Ordered steps of a zone file commit (backup -> validate -> atomic replace -> reload)
+ZONE_COMMIT_STEPS = ['verify', 'backup', 'write', 'validate', 'replace', 'reload']
+
+# Record types selected by each named record filter
+RECORD_TYPE_FILTERS = {
+    'all': ['A', 'AAAA', 'CNAME', 'MX', 'NS', 'PTR', 'SOA', 'TXT', 'SPF', 'SRV'],
+    'direct': ['A', 'AAAA', 'CNAME'],
+    'inverse': ['PTR'],
+    'special': ['MX', 'NS', 'SOA', 'TXT', 'SPF', 'SRV']
+}
+
+# Tokens of a zone file line: quoted string, comment, parenthesis, newline or word
+ZONE_FILE_TOKEN = re.compile(r'"(?:[^"\\\n]|\\.)*"?|;[^\n]*|[()\n]|[^\s;()"]+')
+
+# Classes that may appear between the owner name and the type of a record
+ZONE_FILE_CLASSES = frozenset(['IN', 'CH', 'HS', 'CS'])
+
+# Separator printed before each configuration file read by _fetch_bind_config_files
+BIND_CONFIG_MARKER = '@@BIND_CONFIG_FILE@@'
+
+# Record types queried for every candidate subdomain label
+SUBDOMAIN_RECORD_TYPES = ['A', 'AAAA', 'CNAME', 'MX', 'TXT']
+
+# Commonly used subdomain labels, tested when no wordlist is configured
+COMMON_SUBDOMAINS = [
+    'www', 'mail', 'ftp', 'ns1', 'ns2', 'ns3', 'ns', 'dns', 'dns1', 'dns2',
+    'mx', 'mx1', 'mx2', 'smtp', 'pop', 'pop3', 'imap', 'webmail',
+    'admin', 'cpanel', 'whm', 'panel', 'control',
+    'blog', 'shop', 'store', 'api', 'app', 'mobile',
+    'test', 'dev', 'staging', 'prod', 'demo',
+    'vpn', 'remote', 'ssh', 'sftp',
+    'cloud', 'cdn', 'static', 'media', 'img', 'images',
+    'video', 'stream', 'live', 'chat',
+    'forum', 'wiki', 'docs', 'help', 'support'
+]
+
+
+class PooledSSHConnection:
+    """SSH client kept alive by SSHConnectionPool, with a reusable SFTP session"""
+
+    def __init__(self, client, key: Tuple[str, int, str]):
+        self.client = client
+        self.key = key
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self._sftp = None
+
+    def exec_command(self, command: str, **kwargs):
+        """Run a command on the pooled transport"""
+        return self.client.exec_command(command, **kwargs)
+
+    def open_sftp(self):
+        """Return the SFTP session of this connection, opening it on first use"""
+        if self._sftp is None or self._sftp.sock.closed:
+            self._sftp = self.client.open_sftp()
+        return self._sftp
+
+    def is_alive(self) -> bool:
+        """Health-check the transport by sending an SSH keepalive (ignore) packet"""
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """Close the SFTP session and the underlying SSH client"""
+        try:
+            if self._sftp is not None:
+                self._sftp.close()
+        except Exception:
+            pass
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class BackendUnavailable(Exception):
+    """Raised instead of contacting a backend whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fail fast on one backend after consecutive failures, until a probe reaches it again
+
+    The breaker opens after failure_threshold failures in a row (0 never
+    opens it); while open, check() raises BackendUnavailable at once. Any
+    success, or a successful background probe, closes it.
+    """
+
+    def __init__(self, name: str, probe, failure_threshold: int = 3):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self._probe = probe
+        self._lock = threading.Lock()
+        self._open = False
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._last_probe_at = None
+        self._metrics = {'trips': 0, 'rejected': 0, 'probes': 0}
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    def check(self):
+        """Raise BackendUnavailable when the breaker is open"""
+        with self._lock:
+            if not self._open:
+                return
+            self._metrics['rejected'] += 1
+            error = self._last_error
+        raise BackendUnavailable(f"{self.name} is unavailable ({error}), waiting for it to recover")
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._open
+            self._open = False
+            self._failures = 0
+        if recovered:
+            logger.info(f"{self.name} is reachable again, circuit breaker closed")
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) or type(error).__name__
+            if self._open or not self.failure_threshold or self._failures < self.failure_threshold:
+                return
+            self._open = True
+            self._opened_at = time.time()
+            self._metrics['trips'] += 1
+        logger.warning(f"{self.name} failed {self._failures} times in a row, circuit breaker opened: {error}")
+
+    def probe(self) -> bool:
+        """Try to reach the backend once, closing the breaker when it answers"""
+        with self._lock:
+            self._metrics['probes'] += 1
+            self._last_probe_at = time.time()
+        try:
+            self._probe()
+        except Exception as e:
+            with self._lock:
+                self._last_error = str(e) or type(e).__name__
+            return False
+        self.record_success()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            status = {
+                'state': 'open' if self._open else 'closed',
+                'consecutive_failures': self._failures,
+                'opened_at': self._opened_at if self._open else None,
+                'last_error': self._last_error,
+                'last_probe_at': self._last_probe_at
+            }
+            status.update(self._metrics)
+        return status
+
+
+class CircuitBreakerSet:
+    """Circuit breakers by backend name, with one background thread probing the open ones"""
+
+    def __init__(self, failure_threshold: int = 3, probe_interval: float = 10):
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self._breakers = OrderedDict()
+        self._lock = threading.Lock()
+        self._prober = None
+
+    def get(self, name: str, probe) -> CircuitBreaker:
+        """Return the breaker of a backend, creating it with its probe on first use"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, probe, self.failure_threshold)
+                if self._prober is None or not self._prober.is_alive():
+                    self._prober = threading.Thread(target=self._probe_loop, name='backend-prober', daemon=True)
+                    self._prober.start()
+        return breaker
+
+    def unavailable(self) -> List[str]:
+        """Return the names of the backends whose breaker is open"""
+        with self._lock:
+            return [name for name, breaker in self._breakers.items() if breaker.is_open]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.status() for breaker in breakers}
+
+    def _probe_loop(self):
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                breakers = [breaker for breaker in self._breakers.values() if breaker.is_open]
+            for breaker in breakers:
+                if breaker.probe():
+                    logger.info(f"Background probe reached {breaker.name}")
+
+
+class SSHConnectionPool:
+    """Pool of persistent SSH connections keyed by (host, port, user)"""
+
+    def __init__(self, idle_timeout: float = 300, keepalive_interval: int = 30,
+                 max_idle_connections: int = 4, connect_timeout: float = 10,
+                 breakers: Optional[CircuitBreakerSet] = None):
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.max_idle_connections = max_idle_connections
+        self.connect_timeout = connect_timeout
+        # Optional per-host circuit breakers failing new connections fast
+        self.breakers = breakers
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'discarded': 0,
+            'handshakes': 0,
+            'handshake_time_total': 0.0,
+            'handshake_time_last': 0.0
+        }
+
+    @staticmethod
+    def _pool_key(ssh_config: Dict[str, Any]) -> Tuple[str, int, str]:
+        return (ssh_config['hostname'], int(ssh_config['port']), ssh_config['username'])
+
+    @contextmanager
+    def connection(self, ssh_config: Dict[str, Any]):
+        """Borrow a live connection for the duration of a with-block"""
+        conn = self.acquire(ssh_config)
+        try:
+            yield conn
+        except (paramiko.SSHException, socket.error, EOFError):
+            # Transport-level failure: never hand this connection out again
+            self.discard(conn)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def acquire(self, ssh_config: Dict[str, Any]) -> PooledSSHConnection:
+        """Return an idle live connection for this key or open a new one"""
+        key = self._pool_key(ssh_config)
+        self.evict_idle()
+
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                conn = idle.pop() if idle else None
+            if conn is None:
+                break
+            if conn.is_alive():
+                with self._lock:
+                    self._metrics['hits'] += 1
+                conn.last_used = time.time()
+                return conn
+            logger.debug(f"Dropping dead pooled SSH connection to {key[0]}:{key[1]}")
+            self.discard(conn)
+
+        with self._lock:
+            self._metrics['misses'] += 1
+        breaker = self.breaker(ssh_config)
+        if breaker is None:
+            return self._connect(ssh_config, key)
+        breaker.check()
+        try:
+            conn = self._connect(ssh_config, key)
+        except paramiko.AuthenticationException:
+            # The server answered: wrong credentials are not an outage
+            breaker.record_success()
+            raise
+        except (paramiko.SSHException, socket.error, EOFError) as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        return conn
+
+    def breaker(self, ssh_config: Mapping[str, Any]) -> Optional[CircuitBreaker]:
+        """Return the circuit breaker of the SSH server of a configuration"""
+        if self.breakers is None:
+            return None
+        host, port = ssh_config['hostname'], int(ssh_config['port'])
+        return self.breakers.get(f"ssh {host}:{port}", lambda: self._probe(host, port))
+
+    def _probe(self, host: str, port: int):
+        """Check that an SSH server accepts connections and sends its banner"""
+        with socket.create_connection((host, port), timeout=self.connect_timeout) as sock:
+            sock.settimeout(self.connect_timeout)
+            if not sock.recv(4).startswith(b'SSH-'):
+                raise paramiko.SSHException(f"No SSH banner from {host}:{port}")
+
+    def _connect(self, ssh_config: Dict[str, Any], key: Tuple[str, int, str]) -> PooledSSHConnection:
+        """Open and authenticate a new SSH connection"""
+        ssh_client = paramiko.SSHClient()
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+        start = time.perf_counter()
+        ssh_client.connect(
+            hostname=ssh_config['hostname'],
+            port=ssh_config['port'],
+            username=ssh_config['username'],
+            password=ssh_config['password'],
+            timeout=self.connect_timeout
+        )
+        handshake_time = time.perf_counter() - start
+
+        transport = ssh_client.get_transport()
+        if transport is not None and self.keepalive_interval:
+            transport.set_keepalive(self.keepalive_interval)
+
+        with self._lock:
+            self._metrics['handshakes'] += 1
+            self._metrics['handshake_time_total'] += handshake_time
+            self._metrics['handshake_time_last'] = handshake_time
+        logger.debug(f"SSH handshake with {key[0]}:{key[1]} took {handshake_time * 1000:.1f} ms")
+
+        self._start_reaper()
+        return PooledSSHConnection(ssh_client, key)
+
+    def release(self, conn: PooledSSHConnection):
+        """Return a connection to the pool"""
+        conn.last_used = time.time()
+        with self._lock:
+            idle = self._idle.setdefault(conn.key, [])
+            if len(idle) < self.max_idle_connections:
+                idle.append(conn)
+                return
+            self._metrics['evictions'] += 1
+        conn.close()
+
+    def discard(self, conn: PooledSSHConnection):
+        """Close a connection without returning it to the pool"""
+        with self._lock:
+            self._metrics['discarded'] += 1
+        conn.close()
+
+    def evict_idle(self):
+        """Close connections that have been idle longer than idle_timeout"""
+        now = time.time()
+        expired = []
+        with self._lock:
+            for key, idle in self._idle.items():
+                keep = []
+                for conn in idle:
+                    if now - conn.last_used > self.idle_timeout:
+                        expired.append(conn)
+                    else:
+                        keep.append(conn)
+                self._idle[key] = keep
+            self._metrics['evictions'] += len(expired)
+        for conn in expired:
+            logger.debug(f"Evicting idle SSH connection to {conn.key[0]}:{conn.key[1]}")
+            conn.close()
+
+    def close_all(self):
+        """Close every idle connection in the pool"""
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle = {}
+        for conn in connections:
+            conn.close()
+
+    def _start_reaper(self):
+        """Start the background thread that evicts idle connections"""
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, name='ssh-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_timeout, self.keepalive_interval or self.idle_timeout))
+        while True:
+            time.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.debug(f"Error evicting idle SSH connections: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return pool hit/miss counters and handshake timings"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['idle_connections'] = sum(len(idle) for idle in self._idle.values())
+        handshakes = metrics['handshakes']
+        metrics['handshake_time_avg_ms'] = (
+            round(metrics['handshake_time_total'] / handshakes * 1000, 2) if handshakes else 0.0
+        )
+        metrics['handshake_time_last_ms'] = round(metrics.pop('handshake_time_last') * 1000, 2)
+        metrics['handshake_time_total_ms'] = round(metrics.pop('handshake_time_total') * 1000, 2)
+        requests = metrics['hits'] + metrics['misses']
+        metrics['hit_rate'] = round(metrics['hits'] / requests, 3) if requests else 0.0
+        return metrics
+
+
+class ZoneCache:
+    """Size-bounded LRU cache of transferred zones, validated by SOA serial"""
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes_held = 0
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+
+    def lookup(self, zone: str, serial: Optional[int]):
+        """Return the cached zone if its serial matches, counting a hit or a miss"""
+        with self._lock:
+            entry = self._entries.get(zone)
+            if entry is not None and serial is not None and entry['serial'] == serial:
+                self._entries.move_to_end(zone)
+                self._metrics['hits'] += 1
+                return entry['zone']
+            self._metrics['misses'] += 1
+            return None
+
+    def peek(self, zone: str) -> Optional[Dict[str, Any]]:
+        """Return the cache entry of a zone without touching LRU order or counters"""
+        with self._lock:
+            return self._entries.get(zone)
+
+    def put(self, zone: str, zone_data, serial: int):
+        """Store a parsed zone, evicting least recently used zones beyond the bounds"""
+        size = self._estimate_size(zone_data)
+        with self._lock:
+            previous = self._entries.pop(zone, None)
+            if previous is not None:
+                self._bytes_held -= previous['bytes']
+            if size > self.max_bytes:
+                logger.debug(f"Zone {zone} ({size} bytes) exceeds the zone cache size, not cached")
+                return
+            self._entries[zone] = {
+                'zone': zone_data,
+                'serial': serial,
+                'bytes': size,
+                'cached_at': time.time()
+            }
+            self._bytes_held += size
+            while len(self._entries) > self.max_entries or self._bytes_held > self.max_bytes:
+                evicted_zone, evicted = self._entries.popitem(last=False)
+                self._bytes_held -= evicted['bytes']
+                self._metrics['evictions'] += 1
+                logger.debug(f"Zone cache evicted {evicted_zone}")
+
+    def get_store(self, zone: str, serial: Optional[int]) -> Optional['RecordStore']:
+        """Return the record store built for this zone serial, if any"""
+        with self._lock:
+            entry = self._entries.get(zone)
+            if entry is not None and entry['serial'] == serial:
+                return entry.get('store')
+            return None
+
+    def set_store(self, zone: str, serial: Optional[int], store: 'RecordStore'):
+        """Attach a record store to the cached zone with this serial"""
+        with self._lock:
+            entry = self._entries.get(zone)
+            if entry is not None and entry['serial'] == serial:
+                entry['store'] = store
+
+    def invalidate(self, zone: str):
+        """Remove a zone from the cache"""
+        with self._lock:
+            entry = self._entries.pop(zone, None)
+            if entry is not None:
+                self._bytes_held -= entry['bytes']
+
+    @staticmethod
+    def _estimate_size(zone_data) -> int:
+        """Approximate memory held by a zone as the wire size of its names and rdata"""
+        size = 0
+        origin = zone_data.origin
+        for name, node in zone_data.nodes.items():
+            size += len(name.derelativize(origin).to_wire())
+            for rdataset in node.rdatasets:
+                for rdata in rdataset:
+                    size += 10 + len(rdata.to_wire(origin=origin))
+        return size
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the memory held"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['zones'] = len(self._entries)
+            metrics['bytes_held'] = self._bytes_held
+            metrics['max_bytes'] = self.max_bytes
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_rate'] = round(metrics['hits'] / lookups, 3) if lookups else 0.0
+        return metrics
+
+
+class RecordStore:
+    """Records of one zone held once and indexed by type and by owner name"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self.records = records
+        self.created_at = time.time()
+        self.by_type = {}
+        self.by_name = {}
+        self._merged = {}
+        for index, record in enumerate(records):
+            self.by_type.setdefault(record['type'].upper(), []).append(index)
+            self.by_name.setdefault(record['name'].lower(), []).append(index)
+
+    def select(self, record_type: str = 'all') -> List[Dict[str, Any]]:
+        """Return records matching a type filter ('all', 'direct', 'inverse', 'special' or a type)"""
+        if record_type == 'all':
+            return list(self.records)
+
+        types = RECORD_TYPE_FILTERS.get(record_type, [record_type.upper()])
+        if len(types) == 1:
+            indices = self.by_type.get(types[0], [])
+        else:
+            indices = self._merged.get(record_type)
+            if indices is None:
+                # Merge the per-type index lists to keep the original record order
+                indices = sorted(index for rtype in types for index in self.by_type.get(rtype, []))
+                self._merged[record_type] = indices
+        return [self.records[index] for index in indices]
+
+    def owned_by(self, name: str) -> List[Dict[str, Any]]:
+        """Return the records of one owner name (relative, '@' for the apex)"""
+        return [self.records[index] for index in self.by_name.get(name.lower(), [])]
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class ZoneEntry:
+    """One entry of a zone file: a record, a directive or a blank / comment line
+
+    ``text`` is the exact source of the entry, comments and line breaks
+    included (several lines for a parenthesized record).
+    """
+
+    __slots__ = ('text', 'owner', 'rtype', 'rdata', 'explicit', 'origin')
+
+    def __init__(self, text: str, owner: Optional[str] = None, rtype: Optional[str] = None,
+                 rdata: str = '', explicit: bool = True, origin: Optional[str] = None):
+        self.text = text
+        self.owner = owner
+        self.rtype = rtype
+        self.rdata = rdata
+        self.explicit = explicit
+        self.origin = origin
+
+
+class ZoneFile:
+    """Zone file parsed in one pass into entries indexed by (owner, type)
+
+    Entries keep their original text, so an unmodified file is serialized back
+    byte for byte and edits only rewrite the entries they touch. Owner names
+    are indexed absolute and lowercase, following $ORIGIN directives and
+    records that omit their owner.
+    """
+
+    def __init__(self, text: str, zone: str):
+        self.origin = zone.strip().rstrip('.').lower() + '.'
+        self.entries: List[ZoneEntry] = []
+        self._index: Dict[Tuple[str, str], List[ZoneEntry]] = {}
+        self._owners: Dict[str, List[ZoneEntry]] = {}
+        self._parse(text)
+
+    @staticmethod
+    def _absolute(name: str, origin: str) -> str:
+        """Absolute lowercase form of a name relative to origin"""
+        if name == '@':
+            return origin
+        if name.endswith('.'):
+            return name.lower()
+        return f"{name}.{origin}".lower() if origin != '.' else f"{name}.".lower()
+
+    @staticmethod
+    def _relative(owner: str, origin: str) -> str:
+        """Shortest way of writing an absolute owner name under origin"""
+        if owner == origin:
+            return '@'
+        if owner.endswith('.' + origin):
+            return owner[:-len(origin) - 1]
+        return owner
+
+    def _parse(self, text: str):
+        """Split the text into entries, tokenizing only lines with parentheses or quotes"""
+        origin = self.origin
+        owner = origin
+        start = end = 0
+        depth = 0
+        tokens = []
+        for line in io.StringIO(text, newline='\n'):
+            end += len(line)
+            if depth == 0 and '(' not in line and '"' not in line:
+                # Fast path: a single-line entry without quoted strings
+                tokens = line.split(';', 1)[0].split()
+            else:
+                for token in ZONE_FILE_TOKEN.findall(line):
+                    first = token[0]
+                    if first == '(':
+                        depth += 1
+                    elif first == ')':
+                        depth = max(depth - 1, 0)
+                    elif first != ';' and first != '\n':
+                        tokens.append(token)
+                if depth:
+                    continue
+
+            entry_text = text[start:end]
+            start = end
+            if not tokens:
+                entry = ZoneEntry(entry_text)
+            elif tokens[0][0] == '$':
+                entry = ZoneEntry(entry_text)
+                if tokens[0].upper() == '$ORIGIN' and len(tokens) > 1:
+                    origin = self._absolute(tokens[1], origin)
+            else:
+                entry = self._parse_record(entry_text, tokens, origin, owner)
+                owner = entry.owner
+            tokens = []
+            self.entries.append(entry)
+            if entry.rtype:
+                self._add_to_index(entry)
+
+        if start < len(text):
+            # Parenthesis left open at the end of the file: keep the rest verbatim
+            self.entries.append(ZoneEntry(text[start:]))
+
+    def _parse_record(self, text: str, tokens: List[str], origin: str, owner: str) -> ZoneEntry:
+        """Split a record into owner, type and rdata; TTL and class may come in any order"""
+        explicit = text[0] not in ' \t'
+        if explicit:
+            owner = self._absolute(tokens[0], origin)
+            first = position = 1
+        else:
+            first = position = 0
+        count = len(tokens)
+        while position < count and position - first < 2 and (
+                tokens[position][0].isdigit() or tokens[position].upper() in ZONE_FILE_CLASSES):
+            position += 1
+        rtype = tokens[position].upper() if position < count else None
+        return ZoneEntry(text, owner, rtype, ' '.join(tokens[position + 1:]), explicit, origin)
+
+    def _add_to_index(self, entry: ZoneEntry):
+        self._index.setdefault((entry.owner, entry.rtype), []).append(entry)
+        self._owners.setdefault(entry.owner, []).append(entry)
+
+    def _remove_from_index(self, entry: ZoneEntry):
+        self._index[(entry.owner, entry.rtype)].remove(entry)
+        self._owners[entry.owner].remove(entry)
+
+    def find(self, name: str, rtype: str) -> List[ZoneEntry]:
+        """Records of a name (relative to the zone, '@' for the apex) and type"""
+        return list(self._index.get((self._absolute(name or '@', self.origin), rtype.upper()), []))
+
+    def records(self) -> Iterator[ZoneEntry]:
+        return (entry for entry in self.entries if entry.rtype)
+
+    def format_record(self, owner: str, rtype: str, rdata: str, ttl: int, origin: str) -> str:
+        """Zone file line of a record, with its owner written relative to origin"""
+        name = self._relative(owner, origin)
+        return f"{name:<30} {ttl:<8} IN {rtype:<8} {rdata}"
+
+    def add(self, name: str, rtype: str, rdata: str, ttl: int) -> ZoneEntry:
+        """Insert a record after the last record of its owner, or after the last record"""
+        owner = self._absolute(name or '@', self.origin)
+        rtype = rtype.upper()
+        siblings = self._owners.get(owner)
+        if siblings:
+            position = max(self.entries.index(entry) for entry in siblings)
+        else:
+            position = len(self.entries) - 1
+            while position >= 0 and not self.entries[position].rtype:
+                position -= 1
+
+        if position < 0:
+            # No record yet: append to the file
+            position = len(self.entries) - 1
+            origin = self.origin
+        else:
+            origin = self.entries[position].origin
+
+        line = self.format_record(owner, rtype, rdata, ttl, origin)
+        if position >= 0 and not self.entries[position].text.endswith('\n'):
+            # Keep a missing final newline missing
+            self.entries[position].text += '\n'
+            text = line
+        else:
+            text = line + '\n'
+
+        entry = ZoneEntry(text, owner, rtype, rdata, True, origin)
+        self.entries.insert(position + 1, entry)
+        self._add_to_index(entry)
+        return entry
+
+    def remove(self, entry: ZoneEntry):
+        """Delete a record; a following record inheriting its owner gets it written out"""
+        position = self.entries.index(entry)
+        if entry.explicit:
+            self._pin_next_owner(position)
+        del self.entries[position]
+        self._remove_from_index(entry)
+
+    def replace(self, entry: ZoneEntry, name: str, rtype: str, rdata: str, ttl: int) -> ZoneEntry:
+        """Rewrite a record in place"""
+        owner = self._absolute(name or '@', self.origin)
+        if owner != entry.owner:
+            self._pin_next_owner(self.entries.index(entry))
+        self._remove_from_index(entry)
+        newline = '\n' if entry.text.endswith('\n') else ''
+        entry.owner = owner
+        entry.rtype = rtype.upper()
+        entry.rdata = rdata
+        entry.explicit = True
+        entry.text = self.format_record(owner, entry.rtype, rdata, ttl, entry.origin) + newline
+        self._add_to_index(entry)
+        return entry
+
+    def _pin_next_owner(self, position: int):
+        """Write out the owner of the next record when it is inherited from entries[position]"""
+        for entry in itertools.islice(self.entries, position + 1, None):
+            if entry.rtype:
+                if not entry.explicit:
+                    entry.text = self._relative(entry.owner, entry.origin) + entry.text
+                    entry.explicit = True
+                return
+
+    def bump_serial(self) -> Optional[int]:
+        """Increment the SOA serial (RFC 1982 arithmetic) in place, returning the new value"""
+        soa = next(iter(self._index.get((self.origin, 'SOA'), [])), None)
+        if soa is None:
+            return None
+        fields = soa.rdata.split()
+        if len(fields) < 3 or not fields[2].isdigit():
+            return None
+
+        # The serial is the third rdata word, counted from the end of the entry's words
+        words = [match for match in ZONE_FILE_TOKEN.finditer(soa.text) if match.group()[0] not in '();\n']
+        match = words[len(words) - len(fields) + 2]
+        serial = (int(fields[2]) + 1) % 2 ** 32
+        soa.text = f"{soa.text[:match.start()]}{serial}{soa.text[match.end():]}"
+        fields[2] = str(serial)
+        soa.rdata = ' '.join(fields)
+        return serial
+
+    def to_text(self) -> str:
+        return ''.join(entry.text for entry in self.entries)
+
+
+class ResolverCache(dns.resolver.LRUCache):
+    """Resolver LRU cache honoring answer TTLs, with eviction and bypass counters
+
+    Negative answers (NXDOMAIN / NoAnswer) are cached by the resolver itself
+    for the SOA minimum of the zone.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        super().__init__(max_size)
+        self.evictions = 0
+        self.bypassed = 0
+
+    def put(self, key, value):
+        with self.lock:
+            if key not in self.data and len(self.data) >= self.max_size:
+                self.evictions += 1
+        super().put(key, value)
+
+    def record_bypass(self):
+        with self.lock:
+            self.bypassed += 1
+
+    def invalidate_zone(self, zone: str) -> int:
+        """Drop the cached answers of every name in a zone, returning how many were dropped"""
+        origin = dns.name.from_text(zone)
+        with self.lock:
+            keys = [key for key in self.data if key[0].is_subdomain(origin)]
+        for key in keys:
+            self.flush(key)
+        return len(keys)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return size, hit rate, eviction and bypass counters"""
+        with self.lock:
+            metrics = {
+                'size': len(self.data),
+                'max_size': self.max_size,
+                'hits': self.statistics.hits,
+                'misses': self.statistics.misses,
+                'evictions': self.evictions,
+                'bypassed': self.bypassed
+            }
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_rate'] = round(metrics['hits'] / lookups, 3) if lookups else 0.0
+        return metrics
+
+
+class PipelinedQueryChannel:
+    """Long-lived TCP connection to one DNS server carrying many outstanding queries
+
+    Queries are written back to back without waiting for earlier answers and
+    responses are matched by message ID as they arrive (RFC 7766). The EDNS
+    TCP keepalive option (RFC 7828) asks the server to keep the connection
+    open; it is reopened transparently after the server closes it.
+    """
+
+    def __init__(self, server: str, port: int = 53, max_outstanding: int = 256,
+                 idle_timeout: float = 30, connect_timeout: float = 5):
+        self.server = server
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self._slots = threading.BoundedSemaphore(max(1, min(max_outstanding, 65535)))
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+        self._sock = None
+        self._pending = {}
+        self._next_id = 0
+        self._metrics = {
+            'connections': 0,
+            'queries': 0,
+            'errors': 0,
+            'max_outstanding': 0
+        }
+
+    def query(self, request, timeout: float):
+        """Send a query over the shared connection and wait up to timeout for its response"""
+        if not self._slots.acquire(timeout=timeout):
+            raise dns.resolver.LifetimeTimeout(timeout=timeout, errors=[])
+        try:
+            request.use_edns(0, options=[dns.edns.GenericOption(dns.edns.OptionType.KEEPALIVE, b'')])
+            future = Future()
+            while True:
+                sock = self._connect()
+                with self._lock:
+                    if self._sock is not sock:
+                        # The connection failed before the query was registered on it
+                        continue
+                    while self._next_id in self._pending:
+                        self._next_id = (self._next_id + 1) & 0xFFFF
+                    request.id = self._next_id
+                    self._next_id = (self._next_id + 1) & 0xFFFF
+                    self._pending[request.id] = (future, request)
+                    self._metrics['queries'] += 1
+                    self._metrics['max_outstanding'] = max(self._metrics['max_outstanding'], len(self._pending))
+                    break
+
+            wire = request.to_wire()
+            try:
+                with self._send_lock:
+                    sock.sendall(struct.pack('!H', len(wire)) + wire)
+            except OSError as e:
+                self._fail(sock, e)
+
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    self._pending.pop(request.id, None)
+                raise dns.resolver.LifetimeTimeout(timeout=timeout, errors=[])
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close the connection, failing the queries still waiting for an answer"""
+        with self._lock:
+            sock = self._sock
+        if sock is not None:
+            self._fail(sock, EOFError('Query channel closed'))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return connection, query and error counters"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['connected'] = self._sock is not None
+            metrics['outstanding'] = len(self._pending)
+        return metrics
+
+    def _connect(self):
+        """Return the open socket, connecting first if needed
+
+        The connection is opened without holding the lock, so a slow or
+        unreachable server does not block the reader and other queries; the
+        connect lock keeps concurrent queries from opening one each.
+        """
+        with self._connect_lock:
+            with self._lock:
+                if self._sock is not None:
+                    return self._sock
+            sock = socket.create_connection((self.server, self.port), timeout=self.connect_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.settimeout(self.idle_timeout)
+            with self._lock:
+                self._sock = sock
+                self._metrics['connections'] += 1
+            threading.Thread(target=self._read_loop, args=(sock,), name='dns-pipeline', daemon=True).start()
+            return sock
+
+    def _read_loop(self, sock):
+        """Dispatch responses to the queries waiting for them until the connection ends"""
+        try:
+            while True:
+                try:
+                    header = sock.recv(2)
+                except socket.timeout:
+                    # Nothing read yet, so the framing is intact: keep waiting for answers
+                    with self._lock:
+                        if self._pending:
+                            continue
+                    # Idle beyond the keepalive timeout: close instead of letting the server do it
+                    self._fail(sock, EOFError('Query channel idle'))
+                    return
+                if not header:
+                    raise EOFError('Query channel closed by the server')
+                try:
+                    header += DNSManager._recv_exactly(sock, 2 - len(header))
+                    (length,) = struct.unpack('!H', header)
+                    wire = DNSManager._recv_exactly(sock, length)
+                except socket.timeout:
+                    # A message left half read cannot be resynchronized: drop the connection
+                    raise EOFError('Query channel timed out in the middle of a response')
+                response = dns.message.from_wire(wire)
+                with self._lock:
+                    entry = self._pending.get(response.id)
+                    if entry is None or not entry[1].is_response(response):
+                        continue
+                    del self._pending[response.id]
+                self._apply_keepalive(sock, response)
+                entry[0].set_result(response)
+        except (OSError, EOFError, dns.exception.DNSException) as e:
+            self._fail(sock, e)
+
+    def _apply_keepalive(self, sock, response):
+        """Shorten the idle timeout to the one advertised by the server, in units of 100 ms"""
+        for option in response.options:
+            if option.otype != dns.edns.OptionType.KEEPALIVE:
+                continue
+            data = option.to_wire()
+            if data and len(data) >= 2:
+                (server_timeout,) = struct.unpack('!H', data[:2])
+                if 0 < server_timeout / 10 < self.idle_timeout:
+                    self.idle_timeout = server_timeout / 10
+                    sock.settimeout(self.idle_timeout)
+
+    def _fail(self, sock, error: Exception):
+        """Close a connection and fail every query still waiting on it"""
+        with self._lock:
+            if self._sock is not sock:
+                return
+            self._sock = None
+            pending = list(self._pending.values())
+            self._pending.clear()
+            if not isinstance(error, EOFError) or pending:
+                self._metrics['errors'] += 1
+        try:
+            sock.close()
+        except OSError:
+            pass
+        for future, _ in pending:
+            if not future.done():
+                future.set_exception(error)
+
+
+class NameserverSelector:
+    """Latency-ranked choice among the configured nameservers, with health tracking
+
+    Each server keeps a smoothed RTT and RTT variance (RFC 6298 style) and a
+    window of recent RTTs for percentiles. Servers failing repeatedly are
+    skipped until their retry interval has passed.
+    """
+
+    def __init__(self, primaries: List[str], secondaries: Optional[List[str]] = None,
+                 window: int = 100, failure_threshold: int = 3, retry_interval: float = 30,
+                 timeout_k: float = 4, min_timeout: float = 0.05):
+        self.failure_threshold = failure_threshold
+        self.retry_interval = retry_interval
+        self.timeout_k = timeout_k
+        self.min_timeout = min_timeout
+        self._lock = threading.Lock()
+        self._servers = OrderedDict()
+        for role, servers in (('primary', primaries), ('secondary', secondaries or [])):
+            for server in servers:
+                self._servers.setdefault(server, {
+                    'role': role,
+                    'srtt': None,
+                    'rttvar': None,
+                    'samples': deque(maxlen=window),
+                    'failures': 0,
+                    'down_until': 0.0,
+                    'queries': 0,
+                    'errors': 0
+                })
+        self._metrics = {'hedged': 0, 'hedge_wins': 0}
+
+    @property
+    def servers(self) -> List[str]:
+        return list(self._servers)
+
+    def ranked(self) -> List[str]:
+        """Return the servers, healthy ones first, each group ordered by smoothed RTT
+
+        Servers without measurements yet rank first so that they get sampled;
+        primaries win ties over secondaries.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self._servers, key=lambda server: (
+                self._servers[server]['down_until'] > now,
+                self._servers[server]['srtt'] or 0.0,
+                self._servers[server]['role'] != 'primary'
+            ))
+
+    def record_success(self, server: str, rtt: float):
+        """Fold a measured round-trip time into the server's estimates"""
+        with self._lock:
+            stats = self._servers[server]
+            stats['queries'] += 1
+            stats['failures'] = 0
+            stats['down_until'] = 0.0
+            stats['samples'].append(rtt)
+            if stats['srtt'] is None:
+                stats['srtt'] = rtt
+                stats['rttvar'] = rtt / 2
+            else:
+                stats['rttvar'] = 0.75 * stats['rttvar'] + 0.25 * abs(stats['srtt'] - rtt)
+                stats['srtt'] = 0.875 * stats['srtt'] + 0.125 * rtt
+
+    def record_failure(self, server: str):
+        """Count a failed exchange, marking the server down after repeated failures"""
+        with self._lock:
+            stats = self._servers[server]
+            stats['queries'] += 1
+            stats['errors'] += 1
+            stats['failures'] += 1
+            if stats['failures'] >= self.failure_threshold:
+                stats['down_until'] = time.monotonic() + self.retry_interval
+
+    def timeout(self, server: str, max_timeout: float) -> float:
+        """Return the retransmission timeout of a server, SRTT + k * RTTVAR
+
+        Servers not measured yet get max_timeout; the result is clamped
+        between min_timeout and max_timeout.
+        """
+        with self._lock:
+            stats = self._servers.get(server)
+            if stats is None or stats['srtt'] is None:
+                return max_timeout
+            rto = stats['srtt'] + self.timeout_k * stats['rttvar']
+        return min(max_timeout, max(self.min_timeout, rto))
+
+    def record_hedge(self, won: bool):
+        with self._lock:
+            self._metrics['hedged'] += 1
+            self._metrics['hedge_wins'] += 1 if won else 0
+
+    def percentile(self, server: str, percent: float, min_samples: int = 20) -> Optional[float]:
+        """Return the given RTT percentile of a server, None until enough samples exist"""
+        with self._lock:
+            samples = sorted(self._servers[server]['samples'])
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return per-server RTT estimates and health, and hedging counters"""
+        now = time.monotonic()
+        with self._lock:
+            servers = {
+                server: {
+                    'role': stats['role'],
+                    'healthy': stats['down_until'] <= now,
+                    'srtt_ms': round(stats['srtt'] * 1000, 2) if stats['srtt'] is not None else None,
+                    'rttvar_ms': round(stats['rttvar'] * 1000, 2) if stats['rttvar'] is not None else None,
+                    'rto_ms': round(max(self.min_timeout, stats['srtt'] + self.timeout_k * stats['rttvar']) * 1000, 2)
+                              if stats['srtt'] is not None else None,
+                    'queries': stats['queries'],
+                    'errors': stats['errors']
+                }
+                for server, stats in self._servers.items()
+            }
+            metrics = dict(self._metrics)
+        for server in servers:
+            p95 = self.percentile(server, 95, min_samples=1)
+            servers[server]['p95_ms'] = round(p95 * 1000, 2) if p95 is not None else None
+        metrics['servers'] = servers
+        return metrics
+
+
+class NegativeCache:
+    """Per-zone cache of NXDOMAIN / NoAnswer results and wildcard fingerprints"""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (zone, qname, rtype) -> expiry; rtype None marks an NXDOMAIN name
+        self._entries = OrderedDict()
+        self._wildcards = {}
+        self._lock = threading.Lock()
+        self._metrics = {
+            'hits': 0,
+            'stored': 0,
+            'evictions': 0
+        }
+
+    def is_negative(self, zone: str, qname: str, rtype: str) -> bool:
+        """Return True when the name, or this type of the name, is known not to exist"""
+        qname = qname.lower()
+        now = time.monotonic()
+        with self._lock:
+            for key in ((zone, qname, None), (zone, qname, rtype)):
+                expiry = self._entries.get(key)
+                if expiry is None:
+                    continue
+                if expiry < now:
+                    del self._entries[key]
+                    continue
+                self._metrics['hits'] += 1
+                return True
+            return False
+
+    def add(self, zone: str, qname: str, rtype: Optional[str] = None):
+        """Remember a NoAnswer for a type, or an NXDOMAIN for the whole name when rtype is None"""
+        if self.ttl <= 0:
+            return
+        key = (zone, qname.lower(), rtype)
+        with self._lock:
+            self._entries[key] = time.monotonic() + self.ttl
+            self._entries.move_to_end(key)
+            self._metrics['stored'] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics['evictions'] += 1
+
+    def get_wildcard(self, zone: str) -> Optional[Dict[str, set]]:
+        """Return the wildcard answer sets by type recorded for a zone, if still fresh"""
+        with self._lock:
+            entry = self._wildcards.get(zone)
+            if entry is None or entry[1] < time.monotonic():
+                self._wildcards.pop(zone, None)
+                return None
+            return entry[0]
+
+    def set_wildcard(self, zone: str, fingerprint: Dict[str, set]):
+        """Record the wildcard answer sets by type of a zone ({} when it has no wildcard)"""
+        with self._lock:
+            self._wildcards[zone] = (fingerprint, time.monotonic() + self.ttl)
+
+    def invalidate(self, zone: str):
+        """Forget every negative answer and the wildcard fingerprint of a zone"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == zone]:
+                del self._entries[key]
+            self._wildcards.pop(zone, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return hit/store/eviction counters and the zones answering with a wildcard"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['entries'] = len(self._entries)
+            metrics['wildcard_zones'] = sorted(
+                zone for zone, (fingerprint, _) in self._wildcards.items() if fingerprint
+            )
+        return metrics
+
+
+class ZoneListRefresher:
+    """Zone list snapshot refreshed by a background discovery worker (stale-while-revalidate)"""
+
+    def __init__(self, discover, interval: float = 300):
+        self._discover = discover
+        self.interval = interval
+        self._zones = None
+        self._discovery_method = None
+        self._refreshed_at = None
+        self._last_duration = None
+        self._last_error = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._next_completed = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the worker thread; the first discovery runs immediately"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='zone-refresher', daemon=True)
+            self._thread.start()
+
+    def trigger(self) -> threading.Event:
+        """Request an immediate rescan without waiting for it"""
+        with self._lock:
+            # A scan already in progress may have read stale settings, so the
+            # returned event belongs to the next scan to start
+            completed = self._next_completed
+        self._wakeup.set()
+        return completed
+
+    def get_zones(self) -> Optional[List[str]]:
+        """Return the current snapshot, or None if no discovery has completed yet"""
+        with self._lock:
+            return list(self._zones) if self._zones is not None else None
+
+    def status(self) -> Dict[str, Any]:
+        """Return the snapshot and its freshness information"""
+        with self._lock:
+            return {
+                'zones': list(self._zones) if self._zones is not None else None,
+                'discovery_method': self._discovery_method,
+                'refreshed_at': self._refreshed_at,
+                'last_duration_ms': self._last_duration,
+                'last_error': self._last_error,
+                'refreshing': self._refreshing,
+                'interval': self.interval
+            }
+
+    def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._refresh()
+            self._wakeup.wait(self.interval)
+
+    def _refresh(self):
+        with self._lock:
+            self._refreshing = True
+            completed = self._next_completed
+            self._next_completed = threading.Event()
+        start = time.perf_counter()
+        try:
+            zones, method = self._discover()
+            with self._lock:
+                self._zones = zones
+                self._discovery_method = method
+                self._refreshed_at = time.time()
+                self._last_error = None
+            logger.info(f"Zone list refreshed in background: {len(zones)} zones ({method})")
+        except Exception as e:
+            # Keep serving the previous snapshot
+            logger.error(f"Background zone discovery failed: {e}")
+            with self._lock:
+                self._last_error = str(e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._last_duration = round((time.perf_counter() - start) * 1000, 1)
+            completed.set()
+
+
+class MutationJobQueue:
+    """Record mutations run in the background by a bounded worker pool, one at a time per zone
+
+    submit() returns at once with a job ID. A job starts once every earlier
+    job touching one of its zones has finished, so the edits of a zone are
+    applied in submission order while different zones are edited in
+    parallel. A running job may release() its zones and its worker slot
+    early, once its changes are queued for a coalesced commit; released jobs
+    only wait for their commit, on up to released_threads threads beyond the
+    workers. Finished jobs are kept retention seconds for status polling.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 1000, retention: float = 3600,
+                 released_threads: int = 64):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.released_threads = released_threads
+        self._executor = ThreadPoolExecutor(max_workers=workers + released_threads,
+                                            thread_name_prefix='mutation-worker')
+        self._jobs = {}
+        self._functions = {}
+        self._done = {}
+        # Zone -> IDs of its unfinished jobs in submission order; a job runs
+        # when it heads the queue of each of its zones
+        self._zone_queues = {}
+        # Ready jobs waiting for one of the worker slots
+        self._runnable = deque()
+        self._active = 0
+        self._released = set()
+        self._current = threading.local()
+        self._finished = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0,
+            'rejected': 0,
+            'succeeded': 0,
+            'failed': 0,
+            'queue_time_total': 0.0,
+            'run_time_total': 0.0
+        }
+
+    def submit(self, kind: str, zones: List[str], function: Callable[[], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Queue function, returning the new job, or None when max_pending jobs are already unfinished"""
+        with self._lock:
+            self._prune()
+            if self.max_pending and len(self._functions) + self._running >= self.max_pending:
+                self._metrics['rejected'] += 1
+                return None
+            job_id = secrets.token_hex(8)
+            job = {
+                'id': job_id,
+                'kind': kind,
+                'zones': sorted(set(zone.rstrip('.').lower() for zone in zones)),
+                'status': 'queued',
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None
+            }
+            self._jobs[job_id] = job
+            self._functions[job_id] = function
+            self._done[job_id] = threading.Event()
+            for zone in job['zones']:
+                self._zone_queues.setdefault(zone, deque()).append(job_id)
+            self._metrics['submitted'] += 1
+            if self._is_ready(job):
+                self._runnable.append(job_id)
+            starting = self._dispatch()
+            snapshot = dict(job)
+        for next_id in starting:
+            self._executor.submit(self._run, next_id)
+        return snapshot
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a job, or None if it is unknown or expired"""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait until a job has finished (or timeout), then return it"""
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        return self.get(job_id)
+
+    def release(self):
+        """Let the next jobs of the running job's zones start before it finishes
+
+        Called from inside a job once the order of its changes is fixed;
+        outside jobs it does nothing. The job keeps its thread but no longer
+        counts against the workers.
+        """
+        job_id = getattr(self._current, 'job_id', None)
+        if job_id is None:
+            return
+        with self._lock:
+            if job_id in self._released:
+                return
+            self._runnable.extend(self._release_zones(self._jobs[job_id]))
+            self._active -= 1
+            starting = self._dispatch()
+        for next_id in starting:
+            self._executor.submit(self._run, next_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['queued'] = len(self._functions)
+            metrics['running'] = self._running
+            metrics['zones_busy'] = len(self._zone_queues)
+            metrics['retained'] = len(self._jobs)
+        finished = metrics['succeeded'] + metrics['failed']
+        queue_time = metrics.pop('queue_time_total')
+        run_time = metrics.pop('run_time_total')
+        metrics['workers'] = self.workers
+        metrics['queue_time_avg_ms'] = round(queue_time / finished * 1000, 2) if finished else 0.0
+        metrics['run_time_avg_ms'] = round(run_time / finished * 1000, 2) if finished else 0.0
+        return metrics
+
+    def _dispatch(self) -> List[str]:
+        """Take the ready jobs that free worker slots allow to start (lock held)"""
+        starting = []
+        while self._runnable and self._active < self.workers:
+            starting.append(self._runnable.popleft())
+            self._active += 1
+        return starting
+
+    def _is_ready(self, job: Dict[str, Any]) -> bool:
+        return all(self._zone_queues[zone][0] == job['id'] for zone in job['zones'])
+
+    def _release_zones(self, job: Dict[str, Any]) -> List[str]:
+        """Remove a job from the head of its zone queues, returning the jobs now ready (lock held)"""
+        if job['id'] in self._released:
+            return []
+        self._released.add(job['id'])
+        ready = []
+        for zone in job['zones']:
+            queue = self._zone_queues[zone]
+            queue.popleft()
+            if not queue:
+                del self._zone_queues[zone]
+            elif queue[0] not in ready and self._is_ready(self._jobs[queue[0]]):
+                ready.append(queue[0])
+        return ready
+
+    def _prune(self):
+        """Forget the jobs finished more than retention seconds ago"""
+        expiry = time.time() - self.retention
+        while self._finished and self._finished[0][0] < expiry:
+            _, job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+            self._done.pop(job_id, None)
+
+    def _run(self, job_id: str):
+        with self._lock:
+            job = self._jobs[job_id]
+            function = self._functions.pop(job_id)
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            self._running += 1
+        start = time.perf_counter()
+        self._current.job_id = job_id
+        try:
+            result = function()
+            status = 'succeeded' if result.get('success') else 'failed'
+        except Exception as e:
+            logger.error(f"Record {job['kind']} job {job_id} failed: {e}")
+            result = {'success': False, 'message': f'Technical error during {job["kind"]}: {str(e)}'}
+            status = 'failed'
+        finally:
+            self._current.job_id = None
+        duration = time.perf_counter() - start
+        logger.info(f"Record {job['kind']} job {job_id} {status} in {round(duration * 1000, 1)} ms")
+
+        with self._lock:
+            job['status'] = status
+            job['finished_at'] = time.time()
+            job['result'] = result
+            self._finished.append((job['finished_at'], job_id))
+            self._running -= 1
+            self._metrics[status] += 1
+            self._metrics['queue_time_total'] += job['started_at'] - job['submitted_at']
+            self._metrics['run_time_total'] += duration
+            # Start the jobs this one was holding back
+            if job_id in self._released:
+                self._released.discard(job_id)
+            else:
+                self._runnable.extend(self._release_zones(job))
+                self._released.discard(job_id)
+                self._active -= 1
+            starting = self._dispatch()
+            done = self._done.get(job_id)
+        if done is not None:
+            done.set()
+        for next_id in starting:
+            self._executor.submit(self._run, next_id)
+
+
+class ZoneCommitScheduler:
+    """Debounced per-zone commits folding the edits received within a window into one
+
+    The first edit of a zone starts a window of window seconds. Every edit of
+    the zone received meanwhile joins it, and they are committed together
+    (one write, one validation, one reload) in the order received. Edits
+    arriving while a commit runs wait for the next one. submit() returns a
+    Future resolved with the edit's own result once its commit has landed.
+    """
+
+    # Upper bounds of the edits-per-commit histogram buckets
+    BUCKETS = (1, 2, 4, 8, 16, 32)
+
+    def __init__(self, commit: Callable[[Any, List[Any]], List[Dict[str, Any]]], window: float = 0.2):
+        self._commit = commit
+        self.window = window
+        self._pending = {}
+        self._committing = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._metrics = {
+            'commits': 0,
+            'edits': 0,
+            'max_edits_per_commit': 0,
+            'last_edits_per_commit': 0
+        }
+        self._histogram = [0] * (len(self.BUCKETS) + 1)
+
+    def submit(self, key: Tuple[str, Any], edit: Any) -> Future:
+        """Queue an edit for the zone commit identified by key, whose first item is the zone"""
+        future = Future()
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = []
+                if key not in self._committing:
+                    self._schedule(key)
+            pending.append((edit, future))
+        return future
+
+    def wait_idle(self, zones: List[str], timeout: Optional[float] = None) -> bool:
+        """Wait until no edit of the zones is pending or being committed"""
+        zones = set(zones)
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not any(key[0] in zones for key in itertools.chain(self._pending, self._committing)),
+                timeout
+            )
+
+    def record_commit(self, edits: int):
+        """Count a zone file commit and the number of edits it carried"""
+        with self._lock:
+            self._metrics['commits'] += 1
+            self._metrics['edits'] += edits
+            self._metrics['max_edits_per_commit'] = max(self._metrics['max_edits_per_commit'], edits)
+            self._metrics['last_edits_per_commit'] = edits
+            self._histogram[bisect.bisect_left(self.BUCKETS, edits)] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            histogram = list(self._histogram)
+            metrics['pending_edits'] = sum(len(pending) for pending in self._pending.values())
+            metrics['committing'] = len(self._committing)
+        metrics['window'] = self.window
+        metrics['edits_per_commit_avg'] = (
+            round(metrics['edits'] / metrics['commits'], 2) if metrics['commits'] else 0.0
+        )
+        labels = [str(bound) if bound == previous + 1 else f'{previous + 1}-{bound}'
+                  for previous, bound in zip((0,) + self.BUCKETS, self.BUCKETS)]
+        labels.append(f'{self.BUCKETS[-1] + 1}+')
+        metrics['edits_per_commit'] = dict(zip(labels, histogram))
+        return metrics
+
+    def _schedule(self, key: Tuple[str, Any]):
+        timer = threading.Timer(self.window, self._flush, (key,))
+        timer.daemon = True
+        timer.start()
+
+    def _flush(self, key: Tuple[str, Any]):
+        with self._lock:
+            batch = self._pending.pop(key, [])
+            self._committing.add(key)
+        try:
+            results = self._commit(key, [edit for edit, _ in batch])
+        except Exception as e:
+            logger.error(f"Coalesced commit of zone {key[0]} failed: {e}")
+            results = [{'success': False, 'message': f'Technical SSH error: {str(e)}'} for _ in batch]
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+        with self._idle:
+            self._committing.discard(key)
+            if key in self._pending:
+                # Edits received during the commit start their own window
+                self._schedule(key)
+            self._idle.notify_all()
+
+
+class RateLimiter:
+    """Token bucket limiting the number of operations per second (0 disables it)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Deadline:
+    """Wall-clock budget shared by the stages and queries of one request (a budget of 0 means no limit)
+
+    Callers check expired() before starting work, and it remembers when it
+    has returned True: cut_short then tells that some work was skipped and
+    the results are partial. A child deadline never outlives its parent and
+    reports being cut short to it.
+    """
+
+    def __init__(self, budget: float, parent: Optional['Deadline'] = None):
+        self.budget = budget
+        self.cut_short = False
+        self._parent = parent
+        self._expires_at = time.monotonic() + budget if budget else None
+        if parent is not None and parent._expires_at is not None:
+            if self._expires_at is None or parent._expires_at < self._expires_at:
+                self._expires_at = parent._expires_at
+
+    def child(self, budget: float) -> 'Deadline':
+        """Return a deadline for one stage, ending after budget or with this one"""
+        return Deadline(budget, parent=self)
+
+    def remaining(self) -> float:
+        if self._expires_at is None:
+            return float('inf')
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        if self.remaining() > 0:
+            return False
+        deadline = self
+        while deadline is not None:
+            deadline.cut_short = True
+            deadline = deadline._parent
+        return True
+
+    def clamp(self, timeout: float) -> float:
+        """Shorten a timeout so that it ends with the budget"""
+        return min(timeout, self.remaining())
+
+
+class SubdomainEnumerator:
+    """Concurrent, rate-limited subdomain enumeration over streamed wordlists with resumable checkpoints"""
+
+    def __init__(self, query, concurrency: int = 64, rate_limit: float = 500,
+                 checkpoint_dir: Optional[str] = None, checkpoint_interval: int = 1000,
+                 skip=None):
+        self._query = query
+        # Optional (qname, rtype, zone) predicate for queries whose answer is already known
+        self._skip = skip
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(rate_limit)
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_interval = checkpoint_interval
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='dns-enum')
+        self._zone_locks = {}
+        self._lock = threading.Lock()
+        self._metrics = {'runs': 0, 'resumed_runs': 0, 'queries': 0, 'skipped': 0, 'records': 0}
+        self._last_runs = OrderedDict()
+
+    @staticmethod
+    def iter_wordlists(paths: List[str]) -> Iterator[str]:
+        """Stream unique labels from wordlist files, one label per line"""
+        seen = set()
+        for path in paths:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    label = line.strip().lower().rstrip('.')
+                    if not label or label.startswith('#') or label in seen:
+                        continue
+                    seen.add(label)
+                    yield label
+
+    @staticmethod
+    def wordlists_signature(paths: List[str]) -> str:
+        """Identify a wordlist set by path, size and modification time"""
+        parts = []
+        for path in paths:
+            st = os.stat(path)
+            parts.append(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}")
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+    def run(self, zone: str, labels: Iterator[str], lifetime: float,
+            signature: Optional[str] = None, record_types: Optional[List[str]] = None,
+            deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Enumerate labels under zone; resumes from the zone checkpoint when signature matches
+
+        When the deadline expires, no further labels are queried and the
+        checkpoint keeps the position reached for the next run.
+        """
+        record_types = record_types or SUBDOMAIN_RECORD_TYPES
+        with self._zone_lock(zone):
+            checkpoint = self._load_checkpoint(zone, signature)
+            position = checkpoint['position'] if checkpoint else 0
+            records = checkpoint['records'] if checkpoint else []
+            resumed_from = position
+            if resumed_from:
+                logger.info(f"Resuming subdomain enumeration of {zone} at label {resumed_from}")
+
+            queries = 0
+            skipped = 0
+            start = time.perf_counter()
+            in_flight = deque()
+            outstanding = 0
+
+            def drain_one():
+                nonlocal position, outstanding
+                label_index, futures = in_flight.popleft()
+                outstanding -= len(futures)
+                for future in futures:
+                    records.extend(future.result())
+                position = label_index + 1
+                if signature and position % self.checkpoint_interval == 0:
+                    self._save_checkpoint(zone, signature, position, records)
+
+            stopped = False
+            for index, label in enumerate(labels):
+                if index < resumed_from:
+                    continue
+                if deadline is not None and deadline.expired():
+                    stopped = True
+                    break
+                qname = f"{label}.{zone}"
+                futures = []
+                for rtype in record_types:
+                    if self._skip is not None and self._skip(qname, rtype, zone):
+                        skipped += 1
+                        continue
+                    self.rate_limiter.acquire()
+                    futures.append(self._executor.submit(
+                        self._query, qname, rtype, zone, lifetime, deadline=deadline
+                    ))
+                    queries += 1
+                in_flight.append((index, futures))
+                outstanding += len(futures)
+                # Keep at most `concurrency` queries outstanding
+                while outstanding > self.concurrency:
+                    drain_one()
+            while in_flight:
+                drain_one()
+
+            if signature:
+                if stopped:
+                    self._save_checkpoint(zone, signature, position, records)
+                else:
+                    self._delete_checkpoint(zone)
+            if stopped:
+                logger.info(f"Subdomain enumeration of {zone} stopped at label {position}: deadline reached")
+            duration = time.perf_counter() - start
+            stats = {
+                'zone': zone,
+                'labels': position,
+                'resumed_from': resumed_from,
+                'stopped': stopped,
+                'queries': queries,
+                'skipped': skipped,
+                'records': len(records),
+                'duration_ms': round(duration * 1000, 1),
+                'qps': round(queries / duration, 1) if duration > 0 else 0.0
+            }
+            self._record_run(stats)
+            logger.info(f"Subdomain enumeration of {zone}: {stats['labels']} labels, {queries} queries "
+                        f"in {stats['duration_ms']} ms ({stats['qps']} q/s), {len(records)} records")
+            return records
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return run counters and the statistics of recent runs"""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['last'] = list(self._last_runs.values())
+        return metrics
+
+    def _record_run(self, stats: Dict[str, Any]):
+        with self._lock:
+            self._metrics['runs'] += 1
+            self._metrics['resumed_runs'] += 1 if stats['resumed_from'] else 0
+            self._metrics['queries'] += stats['queries']
+            self._metrics['skipped'] += stats['skipped']
+            self._metrics['records'] += stats['records']
+            self._last_runs.pop(stats['zone'], None)
+            self._last_runs[stats['zone']] = stats
+            while len(self._last_runs) > 20:
+                self._last_runs.popitem(last=False)
+
+    @contextmanager
+    def _zone_lock(self, zone: str):
+        with self._lock:
+            lock = self._zone_locks.setdefault(zone, threading.Lock())
+        with lock:
+            yield
+
+    def _checkpoint_path(self, zone: str) -> Optional[str]:
+        if not self.checkpoint_dir:
+            return None
+        return os.path.join(self.checkpoint_dir, f"{zone.rstrip('.')}.json")
+
+    def _load_checkpoint(self, zone: str, signature: Optional[str]) -> Optional[Dict[str, Any]]:
+        path = self._checkpoint_path(zone)
+        if not signature or not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable enumeration checkpoint {path}: {e}")
+            return None
+        if checkpoint.get('signature') != signature:
+            logger.info(f"Wordlists changed since the last enumeration of {zone}, starting over")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, zone: str, signature: str, position: int, records: List[Dict[str, Any]]):
+        path = self._checkpoint_path(zone)
+        if not path:
+            return
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'zone': zone, 'signature': signature, 'position': position,
+                           'records': records, 'saved_at': time.time()}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save enumeration checkpoint {path}: {e}")
+
+    def _delete_checkpoint(self, zone: str):
+        path = self._checkpoint_path(zone)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove enumeration checkpoint {path}: {e}")
+
+
+class DNSSECChainWalker:
+    """Enumerate signed zones by following their NSEC chain or collecting their NSEC3 hashes"""
+
+    def __init__(self, dns_server: str, max_queries: int = 10000, channel=None, port: int = 53):
+        self.dns_server = dns_server
+        self.port = port
+        self.max_queries = max_queries
+        # Optional PipelinedQueryChannel used instead of one UDP exchange per query
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._last_walks = OrderedDict()
+
+    def detect_mode(self, zone: str, lifetime: float, deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Return 'nsec3' or 'nsec' for a signed zone, None when it is not signed"""
+        origin = dns.name.from_text(zone)
+        response = self._query(origin, dns.rdatatype.NSEC3PARAM, lifetime, deadline)
+        if response.get_rrset(response.answer, origin, dns.rdataclass.IN, dns.rdatatype.NSEC3PARAM):
+            return 'nsec3'
+        response = self._query(origin, dns.rdatatype.NSEC, lifetime, deadline)
+        if response.get_rrset(response.answer, origin, dns.rdataclass.IN, dns.rdatatype.NSEC):
+            return 'nsec'
+        return None
+
+    def walk_nsec(self, zone: str, lifetime: float, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Follow the NSEC chain from the apex, one query per owner name
+
+        Returns the owner names with the types of their NSEC bitmaps, and
+        whether the chain was followed back to the apex.
+        """
+        origin = dns.name.from_text(zone)
+        names = {}
+        queries = 0
+        current = origin
+        complete = False
+        while queries < self.max_queries:
+            try:
+                response = self._query(current, dns.rdatatype.NSEC, lifetime, deadline)
+                queries += 1
+                nsec = self._find_nsec(response, current)
+                if nsec is None and len(current) < 127:
+                    # Delegations and some servers do not answer NSEC queries for
+                    # the owner itself; the first name below it is covered by it
+                    response = self._query(dns.name.Name((b'\x00',) + current.labels), dns.rdatatype.A,
+                                           lifetime, deadline)
+                    queries += 1
+                    nsec = self._find_nsec(response, current)
+            except dns.exception.Timeout:
+                if deadline is None or not deadline.expired():
+                    raise
+                logger.info(f"NSEC walk of {zone} stopped at {current}: deadline reached")
+                break
+            if nsec is None:
+                logger.info(f"NSEC walk of {zone} stopped at {current}: no NSEC record returned")
+                break
+
+            names[current.to_text()] = self._bitmap_types(nsec[0])
+            following = nsec[0].next
+            if following == origin or following.to_text() in names or not following.is_subdomain(origin):
+                complete = True
+                break
+            current = following
+
+        return {'names': names, 'queries': queries, 'complete': complete}
+
+    def collect_nsec3(self, zone: str, lifetime: float, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Collect the NSEC3 hash chain of a zone with queries for random names
+
+        Candidate names are hashed locally first and only queried when their
+        hash falls in a part of the chain that is still unknown.
+        """
+        origin = dns.name.from_text(zone)
+        chain = {}
+        owners = []
+        params = None
+        queries = 0
+        attempts = 0
+        while queries < self.max_queries and attempts < self.max_queries * 1000:
+            if chain and all(entry['next'] in chain for entry in chain.values()):
+                break
+            attempts += 1
+            qname = dns.name.from_text(secrets.token_hex(8), origin)
+            if params is not None and self._covered(self._hash(qname, params), chain, owners):
+                continue
+
+            try:
+                response = self._query(qname, dns.rdatatype.A, lifetime, deadline)
+            except dns.exception.Timeout:
+                if deadline is None or not deadline.expired():
+                    raise
+                logger.info(f"NSEC3 hash collection of {zone} stopped: deadline reached")
+                break
+            queries += 1
+            for rrset in response.authority:
+                if rrset.rdtype != dns.rdatatype.NSEC3:
+                    continue
+                owner_hash = rrset.name.labels[0].decode().lower()
+                if owner_hash not in chain:
+                    bisect.insort(owners, owner_hash)
+                for rdata in rrset:
+                    params = (rdata.salt, rdata.iterations, rdata.algorithm)
+                    chain[owner_hash] = {
+                        'next': base64.b32encode(rdata.next).decode().translate(
+                            dns.rdtypes.ANY.NSEC3.b32_normal_to_hex).lower(),
+                        'types': self._bitmap_types(rdata)
+                    }
+            if params is None and queries >= 3:
+                logger.info(f"No NSEC3 records returned for {zone}, stopping hash collection")
+                break
+
+        complete = bool(chain) and all(entry['next'] in chain for entry in chain.values())
+        return {'hashes': chain, 'params': params, 'queries': queries, 'complete': complete}
+
+    def match_nsec3(self, zone: str, hashes: Dict[str, Any], params, labels: Iterator[str]) -> Dict[str, List[str]]:
+        """Recover owner names offline by hashing candidate labels against collected hashes"""
+        origin = dns.name.from_text(zone)
+        names = {}
+        wanted = sum(1 for entry in hashes.values() if entry['types'])
+        apex = hashes.get(self._hash(origin, params))
+        if apex and apex['types']:
+            names[origin.to_text()] = apex['types']
+        for label in labels:
+            try:
+                qname = dns.name.from_text(label, origin)
+            except dns.exception.DNSException:
+                continue
+            owner_hash = self._hash(qname, params)
+            if owner_hash in hashes and hashes[owner_hash]['types']:
+                names[qname.to_text()] = hashes[owner_hash]['types']
+                if len(names) == wanted:
+                    break
+        return names
+
+    def record_walk(self, report: Dict[str, Any]):
+        with self._lock:
+            self._last_walks.pop(report['zone'], None)
+            self._last_walks[report['zone']] = report
+            while len(self._last_walks) > 20:
+                self._last_walks.popitem(last=False)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return the reports of recent chain walks"""
+        with self._lock:
+            return {'last': list(self._last_walks.values())}
+
+    def _query(self, qname, rdtype, lifetime: float, deadline: Optional[Deadline] = None):
+        if deadline is not None:
+            if deadline.expired():
+                raise dns.exception.Timeout(timeout=0)
+            lifetime = deadline.clamp(lifetime)
+        query = dns.message.make_query(qname, rdtype, want_dnssec=True)
+        if self.channel is not None:
+            return self.channel.query(query, lifetime)
+        response, _ = dns.query.udp_with_fallback(query, self.dns_server, timeout=lifetime, port=self.port)
+        return response
+
+    @staticmethod
+    def _find_nsec(response, owner):
+        for section in (response.answer, response.authority):
+            for rrset in section:
+                if rrset.rdtype == dns.rdatatype.NSEC and rrset.name == owner:
+                    return rrset
+        return None
+
+    @staticmethod
+    def _bitmap_types(rdata) -> List[str]:
+        return [
+            dns.rdatatype.to_text(window * 256 + byte_index * 8 + bit)
+            for window, bitmap in rdata.windows
+            for byte_index, byte in enumerate(bitmap)
+            for bit in range(8)
+            if byte & (0x80 >> bit)
+        ]
+
+    @staticmethod
+    def _hash(qname, params) -> str:
+        salt, iterations, algorithm = params
+        return dns.dnssec.nsec3_hash(qname, salt, iterations, algorithm).lower()
+
+    @staticmethod
+    def _covered(owner_hash: str, chain: Dict[str, Any], owners: List[str]) -> bool:
+        """Return True when a hash is an owner of, or falls in a gap of, the known chain"""
+        if not owners:
+            return False
+        if owner_hash in chain:
+            return True
+        # Closest known owner before the hash, wrapping around to the last one
+        start = owners[bisect.bisect_left(owners, owner_hash) - 1]
+        end = chain[start]['next']
+        if start < end:
+            return start < owner_hash < end
+        return owner_hash > start or owner_hash < end
+
 
 class DNSManager:
     """DNS BIND operations manager"""
@@ -34,19 +2078,152 @@ class DNSManager:
         self.resolver = dns.resolver.Resolver()
         self.resolver.nameservers = [dns_server]
         
-        # Default SSH configuration (will be updated via update_ssh_config)
-        self.ssh_config = {
+        # Unconfigured SSH defaults, the base of every SSH context. Never
+        # replaced: a request without SSH settings must not see another's
+        self._default_ssh_config = MappingProxyType({
             'hostname': dns_server,
             'username': 'admin',
             'password': 'password',
             'port': 22,
             'zone_files_path': '/etc/bind/zone',
             'configured': False
-        }
+        })
+        # Immutable SSH configuration bound to the current request thread
+        self._request_ssh = threading.local()
+        # SSH configuration of the background zone discovery, set by refresh_zones
+        self._discovery_ssh_config = None
         
         # Load configuration from YAML file
         self.config = self._load_zones_config()
 
+        # Per-backend circuit breakers (DNS servers, SSH hosts), probed in the background
+        breaker_settings = self.config.get('circuit_breaker', {})
+        self.breakers = CircuitBreakerSet(
+            failure_threshold=breaker_settings.get('failure_threshold', 3),
+            probe_interval=breaker_settings.get('probe_interval', 10)
+        )
+
+        # Nameservers queried by discovery, ranked by their measured latency
+        nameserver_settings = self.config.get('nameservers', {})
+        self.nameservers = NameserverSelector(
+            nameserver_settings.get('primaries') or [dns_server],
+            nameserver_settings.get('secondaries') or [],
+            failure_threshold=nameserver_settings.get('failure_threshold', 3),
+            retry_interval=nameserver_settings.get('retry_interval', 30),
+            timeout_k=nameserver_settings.get('timeout_k', 4),
+            min_timeout=nameserver_settings.get('min_timeout', 0.05)
+        )
+        self.resolver.nameservers = self.nameservers.servers
+
+        # Cache of resolver answers, bypassed for a while after a zone is written
+        cache_settings = self.config.get('cache', {})
+        self.resolver_cache = ResolverCache(cache_settings.get('resolver_cache_size', 10000))
+        self.resolver.cache = self.resolver_cache
+        self._zone_writes = {}
+
+        # Optional persistent TCP connections pipelining queries to each server
+        discovery_settings = self.config.get('discovery', {})
+        self._query_channels = {}
+        if discovery_settings.get('query_transport', 'udp') == 'tcp_pipeline':
+            for server in set(self.nameservers.servers) | {dns_server}:
+                self._query_channels[server] = PipelinedQueryChannel(
+                    server,
+                    max_outstanding=discovery_settings.get('pipeline_max_outstanding', 256),
+                    idle_timeout=discovery_settings.get('pipeline_idle_timeout', 30)
+                )
+        self.query_channel = self._query_channels.get(dns_server)
+
+        # Duplicate (hedged) queries sent to a second server when the first is slow
+        self.hedge_executor = ThreadPoolExecutor(
+            max_workers=2 * discovery_settings.get('max_concurrency', 16),
+            thread_name_prefix='dns-hedge'
+        )
+
+        # Bounded pool running DNS discovery queries concurrently
+        self.query_executor = ThreadPoolExecutor(
+            max_workers=self.config.get('discovery', {}).get('max_concurrency', 16),
+            thread_name_prefix='dns-query'
+        )
+
+        # Zone -> zone file path maps built from named.conf "file" directives,
+        # one per SSH server
+        self._zone_path_maps = {}
+        self._zone_path_lock = threading.Lock()
+
+        # In-memory zone list kept up to date by a background worker
+        self.zone_refresher = ZoneListRefresher(
+            self._discover_zone_list,
+            interval=self.config.get('discovery', {}).get('zone_refresh_interval', 300)
+        )
+
+        # Transferred zones, reused while their SOA serial is unchanged
+        self.zone_cache = ZoneCache(
+            max_entries=cache_settings.get('zone_cache_max_entries', 32),
+            max_bytes=cache_settings.get('zone_cache_max_bytes', 64 * 1024 * 1024)
+        )
+
+        # Records found by query sweeps when AXFR is refused, indexed by type,
+        # keyed by (SSH server, zone) like the zone files below
+        self._discovered_stores = OrderedDict()
+        self._discovered_stores_lock = threading.Lock()
+
+        # Zone files read over SFTP, reused while their size and mtime are
+        # unchanged, keyed by (SSH server, zone)
+        self._zone_files = OrderedDict()
+        self._zone_files_lock = threading.Lock()
+
+        # Single-record zone file edits committed together when received in quick succession
+        self.commit_scheduler = ZoneCommitScheduler(
+            self._commit_coalesced_edits,
+            window=self.config.get('ssh', {}).get('commit_debounce', 0.2)
+        )
+
+        # Record mutations run in the background, serialized per zone
+        job_settings = self.config.get('jobs', {})
+        self.mutation_jobs = MutationJobQueue(
+            workers=job_settings.get('workers', 4),
+            max_pending=job_settings.get('max_pending', 1000),
+            retention=job_settings.get('retention', 3600),
+            released_threads=job_settings.get('released_threads', 64)
+        )
+
+        # Zone transfer statistics (AXFR / IXFR counts, bytes and records moved)
+        self._transfer_stats = {'totals': {}, 'last': {}}
+        self._transfer_stats_lock = threading.Lock()
+
+        # NXDOMAIN / NoAnswer results and wildcard fingerprints of swept zones
+        self.negative_cache = NegativeCache(
+            ttl=cache_settings.get('negative_cache_ttl', 300),
+            max_entries=cache_settings.get('negative_cache_max_entries', 100000)
+        )
+
+        # Subdomain enumeration engine used by the fallback discovery
+        self.subdomain_enumerator = SubdomainEnumerator(
+            self._query_records,
+            concurrency=discovery_settings.get('enumeration_concurrency', 64),
+            rate_limit=discovery_settings.get('enumeration_rate_limit', 500),
+            checkpoint_dir=discovery_settings.get('enumeration_checkpoint_dir', ''),
+            checkpoint_interval=discovery_settings.get('enumeration_checkpoint_interval', 1000),
+            skip=lambda qname, rtype, zone: self.negative_cache.is_negative(zone, qname, rtype)
+        )
+
+        # NSEC / NSEC3 enumeration of signed zones that refuse AXFR
+        self.chain_walker = DNSSECChainWalker(
+            dns_server,
+            max_queries=discovery_settings.get('dnssec_walk_max_queries', 10000),
+            channel=self.query_channel
+        )
+
+        # Persistent SSH connections shared by discovery and zone edits
+        ssh_settings = self.config.get('ssh', {})
+        self.ssh_pool = SSHConnectionPool(
+            idle_timeout=ssh_settings.get('idle_timeout', 300),
+            keepalive_interval=ssh_settings.get('keepalive_interval', 30),
+            max_idle_connections=ssh_settings.get('max_idle_connections', 4),
+            connect_timeout=ssh_settings.get('connect_timeout', 10),
+            breakers=self.breakers
+        )
+
     def _load_zones_config(self) -> Dict[str, Any]:
         """Load zones configuration from YAML file"""
         config_file = 'zones_config.yaml'
@@ -61,7 +2238,79 @@ class DNSManager:
                 'max_subdomains': 50,
                 'dns_timeout': 5,
                 'enable_subdomain_discovery': True,
-                'enable_dns_walking': True
+                'enable_dns_walking': True,
+                'zone_refresh_interval': 300,
+                'refresh_wait_timeout': 30,
+                'enable_ixfr': True,
+                'transfer_timeout': 30,
+                'max_concurrency': 16,
+                'wordlists': [],
+                'enumeration_concurrency': 64,
+                'enumeration_rate_limit': 500,
+                'enumeration_checkpoint_dir': '',
+                'enumeration_checkpoint_interval': 1000,
+                'detect_wildcards': True,
+                'wildcard_action': 'skip',
+                'dnssec_walk': 'auto',
+                'dnssec_walk_max_queries': 10000,
+                'query_transport': 'udp',
+                'pipeline_max_outstanding': 256,
+                'pipeline_idle_timeout': 30,
+                'sweep_budget': 15,
+                'request_timeout': 30
+            },
+            'ssh': {
+                'idle_timeout': 300,
+                'keepalive_interval': 30,
+                'max_idle_connections': 4,
+                'connect_timeout': 10,
+                'transaction_mode': True,
+                'zone_map_check_interval': 30,
+                'read_zone_files': True,
+                'batch_max_operations': 1000,
+                'reload_scope': 'zone',
+                'commit_debounce': 0.2,
+                'commit_wait_timeout': 60
+            },
+            'nameservers': {
+                'primaries': [],
+                'secondaries': [],
+                'failure_threshold': 3,
+                'retry_interval': 30,
+                'hedge_percentile': 0,
+                'hedge_min_samples': 20,
+                'timeout_k': 4,
+                'min_timeout': 0.05,
+                'max_retransmits': 2
+            },
+            'circuit_breaker': {
+                'failure_threshold': 3,
+                'probe_interval': 10
+            },
+            'dynamic_update': {
+                'zones': [],
+                'server': '',
+                'port': 53,
+                'tsig_key_name': '',
+                'tsig_secret': '',
+                'tsig_algorithm': 'hmac-sha256',
+                'timeout': 5
+            },
+            'jobs': {
+                'async_mutations': True,
+                'workers': 4,
+                'max_pending': 1000,
+                'retention': 3600,
+                'released_threads': 64
+            },
+            'cache': {
+                'zone_cache_max_entries': 32,
+                'zone_cache_max_bytes': 67108864,
+                'record_store_ttl': 60,
+                'negative_cache_ttl': 300,
+                'negative_cache_max_entries': 100000,
+                'resolver_cache_size': 10000,
+                'write_bypass_seconds': 30
             }
         }
         
@@ -112,9 +2361,78 @@ class DNSManager:
         self.config = self._load_zones_config()
         logger.info("Configuration reloaded")
 
-    def update_ssh_config(self, config: Dict[str, Any]):
-        """Update SSH configuration"""
-        self.ssh_config.update(config)
+    @property
+    def ssh_config(self) -> Mapping[str, Any]:
+        """SSH configuration of the current request, or the unconfigured default outside requests"""
+        context = getattr(self._request_ssh, 'config', None)
+        return context if context is not None else self._default_ssh_config
+
+    def make_ssh_context(self, config: Dict[str, Any]) -> Mapping[str, Any]:
+        """Return a read-only SSH configuration, filling missing keys from the default one"""
+        merged = dict(self._default_ssh_config)
+        merged.update(config)
+        return MappingProxyType(merged)
+
+    @contextmanager
+    def ssh_context(self, config: Optional[Dict[str, Any]]):
+        """Bind an SSH configuration to the current thread for the duration of a with-block
+
+        Concurrent requests each see their own configuration; None binds the
+        unconfigured default one.
+        """
+        previous = getattr(self._request_ssh, 'config', None)
+        self._request_ssh.config = self.make_ssh_context(config) if config else None
+        try:
+            yield self.ssh_config
+        finally:
+            self._request_ssh.config = previous
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return runtime metrics of the DNS manager"""
+        return {
+            'ssh_pool': self.ssh_pool.get_metrics(),
+            'zone_cache': self.zone_cache.get_metrics(),
+            'zone_transfers': self._get_transfer_metrics(),
+            'subdomain_enumeration': self.subdomain_enumerator.get_metrics(),
+            'negative_cache': self.negative_cache.get_metrics(),
+            'dnssec_walk': self.chain_walker.get_metrics(),
+            'resolver_cache': self.resolver_cache.get_metrics(),
+            'query_channels': {server: channel.get_metrics() for server, channel in self._query_channels.items()},
+            'nameservers': self.nameservers.get_metrics(),
+            'circuit_breakers': self.breakers.status(),
+            'mutation_jobs': self.mutation_jobs.get_metrics(),
+            'zone_commits': self.commit_scheduler.get_metrics()
+        }
+
+    def get_backend_status(self) -> Dict[str, Any]:
+        """Return the circuit breaker state of every backend contacted so far"""
+        # Make sure the configured DNS and SSH servers are listed before their first use
+        self._dns_breaker(self.dns_server)
+        if self.ssh_config.get('configured', False) and PARAMIKO_AVAILABLE:
+            self.ssh_pool.breaker(self.ssh_config)
+        return {
+            'backends': self.breakers.status(),
+            'unavailable': self.breakers.unavailable()
+        }
+
+    def _dns_available(self) -> bool:
+        """Return True when at least one nameserver's circuit breaker is closed"""
+        return any(not self._dns_breaker(server).is_open for server in self.nameservers.servers)
+
+    def _dns_breaker(self, server: str) -> CircuitBreaker:
+        return self.breakers.get(f"dns {server}", lambda: self._probe_dns(server))
+
+    def _probe_dns(self, server: str):
+        """Check that a DNS server answers; any response, even REFUSED, will do"""
+        timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
+        dns.query.udp(dns.message.make_query('.', 'SOA'), server, timeout=timeout)
+
+    def _get_transfer_metrics(self) -> Dict[str, Any]:
+        with self._transfer_stats_lock:
+            return {
+                'totals': {rtype: dict(totals) for rtype, totals in self._transfer_stats['totals'].items()},
+                'last': list(self._transfer_stats['last'].values())
+            }
 
     def test_ssh_connection(self, ssh_config: Dict[str, Any]) -> Dict[str, Any]:
         """Test SSH connection to server"""
@@ -142,6 +2460,10 @@ class DNSManager:
             stdin, stdout, stderr = ssh_client.exec_command('whoami')
             user_output = stdout.read().decode().strip()
             
+            breaker = self.ssh_pool.breaker(ssh_config)
+            if breaker is not None:
+                breaker.record_success()
+
             if user_output == ssh_config['username']:
                 result['success'] = True
                 result['message'] = f'SSH connection successful as {user_output}'
@@ -173,35 +2495,72 @@ class DNSManager:
         return result
 
     def get_zones(self) -> List[str]:
-        """Retrieve the list of configured DNS zones"""
+        """Retrieve the list of configured DNS zones from the in-memory snapshot"""
         try:
-            # Default common zones from configuration
-            common_zones = self.config.get('fallback_zones', ['localhost'])
-
-            # Attempt retrieval via SSH (requires configuration)
-            zones = self._get_zones_from_config()
+            # Serve the last discovered list immediately, refreshing it in the background
+            self.start_zone_refresher()
+            zones = self.zone_refresher.get_zones()
             if zones:
                 return zones
 
-            # Otherwise, return common zones
-            return common_zones
+            # No discovery has completed yet: return common zones from configuration
+            return self.config.get('fallback_zones', ['localhost'])
 
         except Exception as e:
             logger.error(f"Error retrieving zones: {e}")
             return self.config.get('fallback_zones', ['localhost'])
 
+    def start_zone_refresher(self):
+        """Start the background zone discovery worker if it is not running"""
+        self.zone_refresher.start()
+
+    def refresh_zones(self, ssh_config: Optional[Dict[str, Any]] = None) -> threading.Event:
+        """Trigger an immediate background zone rescan, returning an event set when it completes
+
+        ssh_config, when given, becomes the SSH configuration of this and
+        later background discoveries; request contexts never read it.
+        """
+        if ssh_config is not None:
+            self._discovery_ssh_config = dict(ssh_config)
+        self.start_zone_refresher()
+        return self.zone_refresher.trigger()
+
+    def get_zones_status(self) -> Dict[str, Any]:
+        """Return the zone snapshot together with its discovery metadata"""
+        return self.zone_refresher.status()
+
+    def _discover_zone_list(self) -> Tuple[List[str], str]:
+        """Run a full zone discovery, returning the zones and the method that found them"""
+        with self.ssh_context(self._discovery_ssh_config):
+            return self._discover_zone_list_with_ssh()
+
+    def _discover_zone_list_with_ssh(self) -> Tuple[List[str], str]:
+        zones = self._discover_zones_via_ssh()
+        if zones:
+            return zones, 'ssh_automatic'
+        if self.ssh_config.get('configured', False) and PARAMIKO_AVAILABLE:
+            # An unreachable SSH host must not replace the known zones with the fallback ones
+            breaker = self.ssh_pool.breaker(self.ssh_config)
+            if breaker is not None:
+                breaker.check()
+        return self._get_fallback_zones(), 'fallback'
+
     def _get_zones_from_config(self) -> List[str]:
         """Attempt to retrieve zones from BIND configuration file via SSH"""
+        return self._discover_zones_via_ssh() or self._get_fallback_zones()
+
+    def _discover_zones_via_ssh(self) -> List[str]:
+        """Discover zones via SSH, returning an empty list when SSH discovery is unavailable"""
         zones = []
         
         # Check if SSH is configured
         if not self.ssh_config.get('configured', False):
             logger.info("SSH not configured, using fallback zones")
-            return self._get_fallback_zones()
+            return []
             
         if not PARAMIKO_AVAILABLE:
             logger.warning("Paramiko not available, using fallback zones")
-            return self._get_fallback_zones()
+            return []
         
         try:
             logger.info("Starting automatic zone discovery via SSH...")
@@ -256,80 +2615,32 @@ class DNSManager:
                 return sorted(list(set(valid_zones)))  # Remove duplicates and sort
             else:
                 logger.warning("No valid zones found via SSH, using fallback zones")
-                return self._get_fallback_zones()
+                return []
                 
         except Exception as e:
             logger.error(f"Error in automatic zone discovery: {e}", exc_info=True)
             logger.info("Falling back to fallback zones due to error")
-            return self._get_fallback_zones()
+            return []
 
     def _discover_zones_from_bind_config(self) -> List[str]:
         """Discover zones by analyzing BIND configuration files"""
         zones = []
-        
-        try:
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
-            )
-            
-            # BIND configuration files to analyze
-            config_files = [
-                '/etc/bind/named.conf.local',
-                '/etc/bind/named.conf',
-                '/etc/named.conf',
-                '/var/named/named.conf',
-                '/usr/local/etc/named.conf'
-            ]
-            
-            for config_file in config_files:
-                try:
-                    # Check if file exists
-                    stdin, stdout, stderr = ssh_client.exec_command(f'test -f {config_file} && echo "exists" || echo "not_found"')
-                    file_check = stdout.read().decode().strip()
-                    
-                    if file_check == "exists":
-                        logger.debug(f"Analyzing configuration file: {config_file}")
-                        
-                        # Read file content
-                        stdin, stdout, stderr = ssh_client.exec_command(f'cat {config_file}')
-                        content = stdout.read().decode()
-                        
-                        # Analyze zone directives
-                        file_zones = self._parse_bind_config_zones(content)
-                        for zone in file_zones:
-                            if zone not in zones:
-                                zones.append(zone)
-                                
-                except Exception as e:
-                    logger.debug(f"Error analyzing {config_file}: {e}")
-                    continue
-            
-            ssh_client.close()
+        
+        try:
+            with self.ssh_pool.connection(self.ssh_config) as ssh_client:
+                zones = self._read_bind_config_zones(ssh_client)
             
         except Exception as e:
             logger.error(f"SSH error in zone discovery in configuration: {e}")
         
         return zones
 
-    def _parse_bind_config_zones(self, content: str) -> List[str]:
-        """Parse the content of a BIND configuration file to extract zones"""
-        zones = []
-        
-        # Regex for capturing zone declarations
-        # Format: zone "nom.zone" { ... }
-        import re
-        zone_pattern = r'zone\s+"([^"]+)"\s*\{'
+    def _read_bind_config_zones(self, ssh_client) -> List[str]:
+        """Read BIND configuration files over an open SSH connection and extract zones"""
+        zone_paths = self._refresh_zone_path_map(ssh_client)
         
-        matches = re.findall(zone_pattern, content, re.IGNORECASE)
-        for match in matches:
-            zone_name = match.strip()
+        zones = []
+        for zone_name in zone_paths:
             # Ignore common system zones
             if not self._is_system_zone(zone_name):
                 zones.append(zone_name)
@@ -337,73 +2648,221 @@ class DNSManager:
         
         return zones
 
-    def _discover_zones_from_zone_files(self) -> List[str]:
-        """Discover zones by listing zone files in specific directories only"""
-        zones = []
+    def _fetch_bind_config_files(self, ssh_client) -> List[Tuple[str, int, str]]:
+        """Read every BIND configuration file, following include statements, in one remote command"""
+        # BIND configuration files to analyze
+        config_files = [
+            '/etc/bind/named.conf.local',
+            '/etc/bind/named.conf',
+            '/etc/named.conf',
+            '/var/named/named.conf',
+            '/usr/local/etc/named.conf'
+        ]
         
-        try:
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
-            )
-            
-            # Only scan the specific zone directories (not generic paths)
-            specific_zone_directories = [
-                '/etc/bind/zone/direct',
-                '/etc/bind/zone/reverse'
-            ]
+        # Breadth-first walk over the include graph; relative includes are
+        # resolved against the directory of the including file
+        command = f"""queue={shlex.quote(' '.join(config_files))}
+seen=' '
+while [ -n "$queue" ]; do
+    set -- $queue; f=$1; shift; queue="$*"
+    case "$seen" in *" $f "*) continue ;; esac
+    seen="$seen$f "
+    [ -f "$f" ] || continue
+    printf '{BIND_CONFIG_MARKER} %s %s\\n' "$(stat -c %Y "$f" 2>/dev/null || echo 0)" "$f"
+    cat "$f"; echo
+    for inc in $(sed -n 's/^[[:space:]]*include[[:space:]]*"\\([^"]*\\)".*/\\1/p' "$f"); do
+        case "$inc" in /*) ;; *) inc="$(dirname "$f")/$inc" ;; esac
+        queue="$queue $inc"
+    done
+done"""
+        stdin, stdout, stderr = ssh_client.exec_command(f'sh -c {shlex.quote(command)}')
+        output = stdout.read().decode(errors='replace')
+        
+        files = []
+        current = None
+        for line in output.split('\n'):
+            if line.startswith(BIND_CONFIG_MARKER + ' '):
+                mtime, _, path = line[len(BIND_CONFIG_MARKER) + 1:].partition(' ')
+                current = (path, int(mtime) if mtime.isdigit() else 0, [])
+                files.append(current)
+            elif current is not None:
+                current[2].append(line)
+        
+        return [(path, mtime, '\n'.join(lines)) for path, mtime, lines in files]
+
+    def _parse_bind_config_zones(self, content: str) -> Dict[str, Optional[str]]:
+        """Parse the content of a BIND configuration file to extract zones and their file directives"""
+        zones = {}
+        content = self._strip_bind_config_comments(content)
+        
+        # Regex for capturing zone declarations
+        # Format: zone "nom.zone" [class] { ... file "path"; ... };
+        zone_pattern = re.compile(r'zone\s+"([^"]+)"\s*(?:\w+\s*)?\{', re.IGNORECASE)
+        file_pattern = re.compile(r'(?:^|[;{\s])file\s+"([^"]+)"\s*;', re.IGNORECASE)
+        
+        for match in zone_pattern.finditer(content):
+            zone_name = match.group(1).strip().rstrip('.') or '.'
             
-            # Add fallback only if SSH config specifies a different path
-            configured_path = self.ssh_config.get('zone_files_path', '/etc/bind/zone')
-            if configured_path and configured_path not in ['/etc/bind/zone', '/etc/bind/zone/direct', '/etc/bind/zone/reverse']:
-                specific_zone_directories.append(configured_path)
+            # Find the matching closing brace of the zone block
+            depth = 1
+            pos = match.end()
+            while pos < len(content) and depth:
+                if content[pos] == '{':
+                    depth += 1
+                elif content[pos] == '}':
+                    depth -= 1
+                pos += 1
+            block = content[match.end():pos - 1]
             
-            for zone_dir in specific_zone_directories:
-                try:
-                    # Check if directory exists
-                    stdin, stdout, stderr = ssh_client.exec_command(f'test -d {zone_dir} && echo "exists" || echo "not_found"')
-                    dir_check = stdout.read().decode().strip()
-                    
-                    if dir_check == "exists":
-                        logger.debug(f"Analyzing zone directory: {zone_dir}")
-                        
-                        # List only zone files with specific patterns
-                        # Look for files that start with 'db.' or end with '.zone' or '.db'
-                        stdin, stdout, stderr = ssh_client.exec_command(
-                            f'find {zone_dir} -maxdepth 1 -type f \\( -name "db.*" -o -name "*.zone" -o -name "*.db" \\) 2>/dev/null | xargs -I {{}} basename {{}} || echo ""'
-                        )
-                        zone_files = stdout.read().decode().strip()
-                        
-                        if zone_files:
-                            for zone_file in zone_files.split('\n'):
-                                zone_file = zone_file.strip()
-                                if zone_file and self._is_zone_file(zone_file):
-                                    # Extract zone name from file name
-                                    zone_name = self._extract_zone_name_from_file(zone_file)
-                                    if (zone_name and 
-                                        zone_name not in zones and 
-                                        not self._is_system_zone(zone_name) and
-                                        self._is_valid_zone_name(zone_name)):
-                                        zones.append(zone_name)
-                                        logger.debug(f"Zone found in files: {zone_name} (file: {zone_file} in {zone_dir})")
-                        
-                except Exception as e:
-                    logger.debug(f"Error analyzing {zone_dir}: {e}")
+            file_match = file_pattern.search(block)
+            zones[zone_name] = file_match.group(1) if file_match else None
+        
+        return zones
+
+    def _strip_bind_config_comments(self, content: str) -> str:
+        """Remove C, C++ and shell style comments from BIND configuration text"""
+        return re.sub(r'/\*.*?\*/|//[^\n]*|#[^\n]*|("(?:[^"\\]|\\.)*")',
+                      lambda m: m.group(1) or '', content, flags=re.DOTALL)
+
+    def _refresh_zone_path_map(self, ssh_client) -> Dict[str, Optional[str]]:
+        """Rebuild the cached zone -> zone file path map from the BIND configuration"""
+        config_files = self._fetch_bind_config_files(ssh_client)
+        
+        zone_paths = {}
+        directory = None
+        for config_file, mtime, content in config_files:
+            logger.debug(f"Analyzing configuration file: {config_file}")
+            directory_match = re.search(r'\bdirectory\s+"([^"]+)"\s*;',
+                                        self._strip_bind_config_comments(content))
+            if directory_match:
+                directory = directory_match.group(1)
+        
+        for config_file, mtime, content in config_files:
+            for zone_name, zone_file in self._parse_bind_config_zones(content).items():
+                if zone_name in zone_paths and zone_paths[zone_name]:
                     continue
+                if zone_file and not zone_file.startswith('/'):
+                    # Relative paths are resolved against the server working directory;
+                    # without a directory option it is not known, so do not guess
+                    if directory:
+                        zone_file = os.path.join(directory, zone_file)
+                    else:
+                        logger.warning(f"Zone {zone_name} in {config_file} has a relative file "
+                                       f"\"{zone_file}\" and no directory option is set, ignoring it")
+                        zone_file = None
+                zone_paths[zone_name] = zone_file
+        
+        with self._zone_path_lock:
+            self._zone_path_maps[self._ssh_server_key()] = {
+                'paths': zone_paths,
+                'mtimes': {path: mtime for path, mtime, _ in config_files},
+                'checked_at': time.time()
+            }
+        
+        logger.debug(f"Zone file map rebuilt from {len(config_files)} configuration files: {len(zone_paths)} zones")
+        return zone_paths
+
+    def _ssh_server_key(self) -> Tuple[str, int]:
+        return (self.ssh_config.get('hostname'), int(self.ssh_config.get('port', 22)))
+
+    def _lookup_zone_file_path(self, zone: str, ssh_client) -> Optional[str]:
+        """Resolve a zone file path from the cached map, revalidating it against config mtimes"""
+        check_interval = self.config.get('ssh', {}).get('zone_map_check_interval', 30)
+        
+        with self._zone_path_lock:
+            zone_map = self._zone_path_maps.get(self._ssh_server_key())
+        if zone_map is None:
+            return self._refresh_zone_path_map(ssh_client).get(zone.rstrip('.'))
+        if time.time() - zone_map['checked_at'] >= check_interval:
+            # Cheap freshness check: a single stat of every configuration file read
+            paths = ' '.join(shlex.quote(path) for path in zone_map['mtimes'])
+            stdin, stdout, stderr = ssh_client.exec_command(f"stat -c '%Y %n' {paths} 2>/dev/null")
+            current_mtimes = {}
+            for line in stdout.read().decode(errors='replace').splitlines():
+                mtime, _, path = line.partition(' ')
+                if mtime.isdigit():
+                    current_mtimes[path] = int(mtime)
             
-            ssh_client.close()
+            if current_mtimes != zone_map['mtimes']:
+                logger.info("BIND configuration changed, rebuilding zone file map")
+                return self._refresh_zone_path_map(ssh_client).get(zone.rstrip('.'))
+            with self._zone_path_lock:
+                zone_map['checked_at'] = time.time()
+        
+        # The snapshot read above: another server's map or an invalidation
+        # in the meantime cannot change the answer
+        return zone_map['paths'].get(zone.rstrip('.'))
+
+    def invalidate_zone_path_map(self):
+        """Drop the cached zone -> zone file path maps of every server"""
+        with self._zone_path_lock:
+            self._zone_path_maps.clear()
+
+    def _discover_zones_from_zone_files(self) -> List[str]:
+        """Discover zones by listing zone files in specific directories only"""
+        zones = []
+        
+        try:
+            with self.ssh_pool.connection(self.ssh_config) as ssh_client:
+                zones = self._scan_zone_file_directories(ssh_client)
             
         except Exception as e:
             logger.error(f"SSH error in zone discovery in files: {e}")
         
         return zones
 
+    def _scan_zone_file_directories(self, ssh_client) -> List[str]:
+        """List zone files over an open SSH connection and extract zone names"""
+        zones = []
+        
+        # Only scan the specific zone directories (not generic paths)
+        specific_zone_directories = [
+            '/etc/bind/zone/direct',
+            '/etc/bind/zone/reverse'
+        ]
+
+        # Add fallback only if SSH config specifies a different path
+        configured_path = self.ssh_config.get('zone_files_path', '/etc/bind/zone')
+        if configured_path and configured_path not in ['/etc/bind/zone', '/etc/bind/zone/direct', '/etc/bind/zone/reverse']:
+            specific_zone_directories.append(configured_path)
+
+        for zone_dir in specific_zone_directories:
+            try:
+                # Check if directory exists
+                stdin, stdout, stderr = ssh_client.exec_command(f'test -d {zone_dir} && echo "exists" || echo "not_found"')
+                dir_check = stdout.read().decode().strip()
+
+                if dir_check == "exists":
+                    logger.debug(f"Analyzing zone directory: {zone_dir}")
+
+                    # List only zone files with specific patterns
+                    # Look for files that start with 'db.' or end with '.zone' or '.db'
+                    stdin, stdout, stderr = ssh_client.exec_command(
+                        f'find {zone_dir} -maxdepth 1 -type f \\( -name "db.*" -o -name "*.zone" -o -name "*.db" \\) 2>/dev/null | xargs -I {{}} basename {{}} || echo ""'
+                    )
+                    zone_files = stdout.read().decode().strip()
+
+                    if zone_files:
+                        for zone_file in zone_files.split('\n'):
+                            zone_file = zone_file.strip()
+                            if zone_file and self._is_zone_file(zone_file):
+                                # Extract zone name from file name
+                                zone_name = self._extract_zone_name_from_file(zone_file)
+                                if (zone_name and 
+                                    zone_name not in zones and 
+                                    not self._is_system_zone(zone_name) and
+                                    self._is_valid_zone_name(zone_name)):
+                                    zones.append(zone_name)
+                                    logger.debug(f"Zone found in files: {zone_name} (file: {zone_file} in {zone_dir})")
+
+            except (paramiko.SSHException, socket.error):
+                raise
+            except Exception as e:
+                logger.debug(f"Error analyzing {zone_dir}: {e}")
+                continue
+        
+        return zones
+
     def _is_zone_file(self, filename: str) -> bool:
         """Check if a filename represents a valid zone file"""
         if not filename or not filename.strip():
@@ -557,32 +3016,26 @@ class DNSManager:
         discovered_zones = []
         test_zones = self.config.get('test_zones', ['localhost', '127.in-addr.arpa', 'local'])
         
-        # Configure DNS timeout from configuration
+        # DNS timeout from configuration, the upper bound of each query
         dns_timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
-        original_timeout = self.resolver.timeout
-        self.resolver.timeout = dns_timeout
         
         logger.debug(f"Testing zones with DNS queries (timeout: {dns_timeout}s): {test_zones}")
         
-        try:
-            for zone in test_zones:
-                try:
-                    # Test if zone exists by attempting a SOA query
-                    answers = self.resolver.resolve(zone, 'SOA')
-                    discovered_zones.append(zone)
-                    logger.debug(f"Fallback zone detected via DNS: {zone}")
-                except dns.resolver.NXDOMAIN:
-                    logger.debug(f"Zone does not exist: {zone}")
-                except dns.resolver.NoAnswer:
-                    logger.debug(f"Zone exists but no SOA record: {zone}")
-                except dns.resolver.Timeout:
-                    logger.debug(f"DNS timeout for zone: {zone}")
-                except Exception as e:
-                    logger.debug(f"DNS error for zone {zone}: {e}")
-                    continue
-        finally:
-            # Restore original timeout
-            self.resolver.timeout = original_timeout
+        for zone in test_zones:
+            try:
+                # Test if zone exists by attempting a SOA query
+                answers = self._resolve(zone, 'SOA', zone, dns_timeout)
+                discovered_zones.append(zone)
+                logger.debug(f"Fallback zone detected via DNS: {zone}")
+            except dns.resolver.NXDOMAIN:
+                logger.debug(f"Zone does not exist: {zone}")
+            except dns.resolver.NoAnswer:
+                logger.debug(f"Zone exists but no SOA record: {zone}")
+            except dns.resolver.Timeout:
+                logger.debug(f"DNS timeout for zone: {zone}")
+            except Exception as e:
+                logger.debug(f"DNS error for zone {zone}: {e}")
+                continue
         
         # If no test zone worked, use defined fallback zones
         if not discovered_zones:
@@ -598,297 +3051,1038 @@ class DNSManager:
         
         return sorted(list(set(discovered_zones)))  # Remove duplicates and sort
 
-    def get_records(self, zone: str, record_type: str = 'all') -> List[Dict[str, Any]]:
-        """Retrieve DNS records for a given zone"""
-        records = []
+    def get_records(self, zone: str, record_type: str = 'all') -> List[Dict[str, Any]]:
+        """Retrieve DNS records for a given zone"""
+        return self.get_records_with_sources(zone, record_type)['records']
+
+    def get_records_with_sources(self, zone: str, record_type: str = 'all',
+                                 deadline: Optional[Deadline] = None,
+                                 try_transfer: bool = True) -> Dict[str, Any]:
+        """Retrieve DNS records together with the sources tried and how long each took
+
+        Sources are tried in order: zone transfer (unless try_transfer is
+        False, when the caller already saw it refused), zone file over SSH,
+        then DNS queries. Every record carries the 'source' it came from. All of
+        them share one deadline (discovery.request_timeout by default): the
+        stages left when it expires are skipped, and 'complete' is False
+        when the records are only those found in time. 'unavailable' lists
+        the backends whose circuit breaker is open.
+        """
+        discovery = self.config.get('discovery', {})
+        if deadline is None:
+            deadline = Deadline(discovery.get('request_timeout', 30))
+        records = []
+        sources = []
+
+        def finish_source(source: str, start: float, found: Optional[List[Dict[str, Any]]],
+                          skipped: bool = False):
+            sources.append({
+                'source': source,
+                'success': found is not None,
+                'skipped': skipped,
+                'records': len(found) if found is not None else 0,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 1)
+            })
+
+        def result(found: List[Dict[str, Any]]) -> Dict[str, Any]:
+            return {'records': found, 'sources': sources, 'complete': not deadline.cut_short,
+                    'unavailable': self.breakers.unavailable()}
+
+        try:
+            # First, attempt zone AXFR transfer
+            logger.info(f"Attempting zone transfer for {zone}")
+            start = time.perf_counter()
+            skipped = not try_transfer or deadline.expired()
+            axfr_records = None if skipped else self._try_zone_transfer(zone, record_type, deadline)
+            finish_source('axfr', start, axfr_records, skipped)
+            if axfr_records is not None:
+                logger.info(f"Zone transfer successful: {len(axfr_records)} records found")
+                return result(axfr_records)
+
+            # Then read the authoritative zone file when SSH is configured
+            start = time.perf_counter()
+            skipped = deadline.expired()
+            file_records = None if skipped else self._try_zone_file(zone, record_type, deadline)
+            finish_source('zone_file', start, file_records, skipped)
+            if file_records is not None:
+                logger.info(f"Zone file read for {zone}: {len(file_records)} records found")
+                return result(file_records)
+
+            # Records discovered by a recent sweep are filtered in memory
+            start = time.perf_counter()
+            store = self._get_discovered_store(zone)
+            if store is not None:
+                logger.info(f"Using records discovered for {zone} {int(store.age())}s ago")
+                selected = store.select(record_type)
+                finish_source('query', start, selected)
+                return result(selected)
+
+            if deadline.expired() or not self._dns_available():
+                finish_source('query', start, None, skipped=True)
+                return result([])
+
+            logger.info(f"Zone transfer failed, using individual queries")
+
+            # Sweep every type once so that later type filters are served from memory
+            record_types = RECORD_TYPE_FILTERS['all']
+            
+            # If zone transfer fails, use individual queries. Each query gives up
+            # after its server's adaptive timeout, and the whole sweep after the
+            # configured wall-clock budget or the request deadline
+            dns_timeout = discovery.get('dns_timeout', 5)
+            sweep = deadline.child(discovery.get('sweep_budget', 15))
+            
+            # 1. Retrieve records from zone root, all types in parallel
+            apex_queries = [
+                (zone, rtype) for rtype in record_types
+                if rtype != 'PTR' or zone.endswith('.arpa')
+            ]
+            apex_futures = self._submit_queries(apex_queries, zone, dns_timeout, deadline=sweep)
+            
+            # 2. Signed zones can be enumerated through their NSEC / NSEC3 chain
+            chain_records, chain_complete = self._walk_dnssec_chain(zone, dns_timeout, sweep)
+            
+            # 3. Explore common subdomains while the apex queries are in flight,
+            # unless the chain already listed every name of the zone
+            subdomain_records = []
+            if (not chain_complete and
+                discovery.get('enable_subdomain_discovery', True)):
+                subdomain_records = self._discover_subdomains(zone, sweep)
+            
+            records.extend(self._collect_queries(apex_futures, sweep))
+            records.extend(chain_records)
+            records.extend(subdomain_records)
+            
+            # 4. If still no satisfactory result, try DNS walking approach
+            if (len(records) < 3 and not chain_complete and
+                discovery.get('enable_dns_walking', True)):
+                logger.info(f"Few records found ({len(records)}), trying DNS discovery")
+                walking_records = self._dns_walking(zone, sweep)
+                records.extend(walking_records)
+
+        except Exception as e:
+            logger.error(f"Error retrieving records: {e}")
+
+        # Remove duplicates
+        unique_records = []
+        seen = set()
+        for record in records:
+            key = (record['name'], record['type'], record['value'])
+            if key not in seen:
+                seen.add(key)
+                unique_records.append(record)
+
+        logger.info(f"Total unique records found: {len(unique_records)}")
+        store = RecordStore(unique_records)
+        # Partial results are returned but not kept for later requests
+        if unique_records and not deadline.cut_short:
+            self._set_discovered_store(zone, store)
+        elif deadline.cut_short:
+            logger.warning(f"Deadline reached while discovering {zone}, returning partial results")
+        selected = store.select(record_type)
+        finish_source('query', start, selected)
+        return result(selected)
+
+    def _try_zone_file(self, zone: str, record_type: str,
+                       deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
+        """Read the zone's records from its zone file over SFTP
+
+        The parsed file is reused while the size and modification time of
+        the file and of its $INCLUDEd files are unchanged. Returns None when
+        SSH is not configured or the file cannot be read or parsed, or
+        could not be read before the deadline.
+        """
+        if (not self.ssh_config.get('configured', False) or not PARAMIKO_AVAILABLE or
+                not self.config.get('ssh', {}).get('read_zone_files', True)):
+            return None
+
+        # Parsed files of one server are never served to sessions of another
+        cache_key = (self._ssh_server_key(), self._normalize_zone(zone))
+        try:
+            with self.ssh_pool.connection(self.ssh_config) as ssh_client:
+                zone_file_path = self._find_existing_zone_file(zone, ssh_client)
+                sftp = ssh_client.open_sftp()
+                # SFTP reads give up with the request; the pooled session is reset afterwards
+                if deadline is not None and deadline.budget:
+                    sftp.get_channel().settimeout(max(deadline.remaining(), 0.001))
+                try:
+                    with self._zone_files_lock:
+                        cached = self._zone_files.get(cache_key)
+                    if cached is not None and cached['path'] == zone_file_path:
+                        if self._stat_zone_files(sftp, cached['files']) == cached['files']:
+                            logger.info(f"Zone file {zone_file_path} unchanged, using parsed copy")
+                            with self._zone_files_lock:
+                                if cache_key in self._zone_files:
+                                    self._zone_files.move_to_end(cache_key)
+                            return cached['store'].select(record_type)
+
+                    files = {}
+                    text = self._read_zone_file_tree(sftp, zone_file_path, dns.name.from_text(zone), files)
+                finally:
+                    sftp.get_channel().settimeout(None)
+
+            zone_data = dns.zone.from_text(text, origin=zone, relativize=True, filename=zone_file_path)
+        except FileNotFoundError:
+            logger.info(f"No zone file found for {zone}")
+            return None
+        except dns.exception.DNSException as e:
+            logger.warning(f"Zone file of {zone} could not be parsed: {e}")
+            return None
+        except Exception as e:
+            if deadline is not None and deadline.expired():
+                logger.warning(f"Deadline reached while reading the zone file of {zone}")
+            else:
+                logger.warning(f"Zone file of {zone} could not be read over SSH: {e}")
+            return None
+
+        store = RecordStore(self._zone_to_records(zone_data, zone, 'all', source='zone_file'))
+        max_entries = self.config.get('cache', {}).get('zone_cache_max_entries', 32)
+        with self._zone_files_lock:
+            self._zone_files[cache_key] = {'path': zone_file_path, 'files': files, 'store': store}
+            self._zone_files.move_to_end(cache_key)
+            while len(self._zone_files) > max_entries:
+                self._zone_files.popitem(last=False)
+        return store.select(record_type)
+
+    def _read_zone_file_tree(self, sftp, path: str, origin, files: Dict[str, Tuple[int, int]],
+                             depth: int = 0) -> str:
+        """Read a zone file over SFTP, inlining its $INCLUDE files
+
+        Each include is wrapped in $ORIGIN directives so that the included
+        records use the include's origin and the parent's origin is restored
+        afterwards. The (size, mtime) of every file read is stored in files.
+        """
+        if depth > 8:
+            raise dns.exception.SyntaxError(f"$INCLUDE nesting too deep at {path}")
+        st = sftp.stat(path)
+        files[path] = (st.st_size, st.st_mtime)
+        with sftp.open(path, 'r') as f:
+            content = f.read().decode('utf-8', errors='replace')
+
+        lines = []
+        current_origin = origin
+        for line in content.splitlines():
+            fields = line.split(';', 1)[0].split()
+            directive = fields[0].upper() if fields and line[:1] == '$' else None
+            if directive == '$ORIGIN' and len(fields) > 1:
+                current_origin = dns.name.from_text(fields[1], current_origin)
+            elif directive == '$INCLUDE' and len(fields) > 1:
+                include_path = fields[1].strip('"')
+                if not include_path.startswith('/'):
+                    include_path = os.path.join(os.path.dirname(path), include_path)
+                include_origin = (dns.name.from_text(fields[2], current_origin)
+                                  if len(fields) > 2 else current_origin)
+                lines.append(f"$ORIGIN {include_origin.to_text()}")
+                lines.append(self._read_zone_file_tree(sftp, include_path, include_origin, files, depth + 1))
+                lines.append(f"$ORIGIN {current_origin.to_text()}")
+                continue
+            lines.append(line)
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _stat_zone_files(sftp, files: Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+        """Return the current (size, mtime) of previously read zone files"""
+        current = {}
+        for path in files:
+            try:
+                st = sftp.stat(path)
+            except OSError:
+                continue
+            current[path] = (st.st_size, st.st_mtime)
+        return current
+
+    def _get_discovered_store(self, zone: str) -> Optional['RecordStore']:
+        """Return the record store of the last query sweep of a zone if still fresh"""
+        ttl = self.config.get('cache', {}).get('record_store_ttl', 60)
+        key = (self._ssh_server_key(), self._normalize_zone(zone))
+        with self._discovered_stores_lock:
+            store = self._discovered_stores.get(key)
+            if store is None:
+                return None
+            if store.age() > ttl:
+                del self._discovered_stores[key]
+                return None
+            self._discovered_stores.move_to_end(key)
+            return store
+
+    def _set_discovered_store(self, zone: str, store: 'RecordStore'):
+        max_entries = self.config.get('cache', {}).get('zone_cache_max_entries', 32)
+        key = (self._ssh_server_key(), self._normalize_zone(zone))
+        with self._discovered_stores_lock:
+            self._discovered_stores[key] = store
+            self._discovered_stores.move_to_end(key)
+            while len(self._discovered_stores) > max_entries:
+                self._discovered_stores.popitem(last=False)
+
+    def _discover_subdomains(self, zone: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Discover current subdomains of the zone, skipped once the deadline has expired"""
+        records = []
+        if deadline is not None and deadline.expired():
+            return records
+        
+        discovery = self.config.get('discovery', {})
+        dns_timeout = discovery.get('dns_timeout', 5)
+        wordlists = discovery.get('wordlists') or []
+        
+        # Types answered by a wildcard would "find" every candidate label
+        wildcard = self._detect_wildcard(zone, dns_timeout, deadline)
+        record_types = [
+            rtype for rtype in SUBDOMAIN_RECORD_TYPES
+            if not (rtype in wildcard and discovery.get('wildcard_action', 'skip') == 'skip')
+        ]
+        if not record_types:
+            logger.info(f"Zone {zone} answers every record type with a wildcard, skipping subdomain discovery")
+            return records
+        
+        if wordlists:
+            # Stream labels from the configured wordlists; progress is checkpointed
+            try:
+                signature = self.subdomain_enumerator.wordlists_signature(wordlists)
+            except OSError as e:
+                logger.error(f"Subdomain wordlist unavailable: {e}")
+                return records
+            records = self.subdomain_enumerator.run(
+                zone, self.subdomain_enumerator.iter_wordlists(wordlists), dns_timeout,
+                signature=signature, record_types=record_types, deadline=deadline
+            )
+            return self._suppress_wildcard_records(zone, records, wildcard)
+        
+        # Limit the number of subdomains according to configuration
+        max_subdomains = discovery.get('max_subdomains', 50)
+        subdomains_to_test = COMMON_SUBDOMAINS[:max_subdomains]
+        
+        records = self.subdomain_enumerator.run(
+            zone, iter(subdomains_to_test), dns_timeout, record_types=record_types, deadline=deadline
+        )
+        records = self._suppress_wildcard_records(zone, records, wildcard)
+        for record in records:
+            logger.debug(f"Subdomain found: {record}")
+        
+        logger.info(f"Subdomain discovery: {len(records)} records found (tested: {len(subdomains_to_test)}/{len(COMMON_SUBDOMAINS)})")
+        return records
+
+    def _dns_walking(self, zone: str, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """DNS walking technique for discovering additional records, skipped once the deadline has expired"""
+        records = []
+        if deadline is not None and deadline.expired():
+            return records
+        discovery = self.config.get('discovery', {})
+        dns_timeout = discovery.get('dns_timeout', 5)
+        
+        try:
+            # Try some common patterns with numbers, in the background,
+            # unless a wildcard would answer all of them
+            wildcard = self._detect_wildcard(zone, dns_timeout, deadline)
+            patterns = ['host', 'server', 'pc', 'workstation']
+            pattern_queries = []
+            if 'A' not in wildcard or discovery.get('wildcard_action', 'skip') != 'skip':
+                pattern_queries = [
+                    (f"{pattern}{i}.{zone}", 'A')
+                    for pattern in patterns
+                    for i in range(1, 6)  # Test 1-5
+                ]
+            pattern_futures = self._submit_queries(pattern_queries, zone, dns_timeout, deadline=deadline)
+            
+            # Try to retrieve NS records to obtain name servers
+            ns_timeout = deadline.clamp(dns_timeout) if deadline is not None else dns_timeout
+            ns_servers = []
+            try:
+                ns_answers = self._resolve(zone, 'NS', zone, ns_timeout)
+                ns_servers = [str(ns) for ns in ns_answers]
+                logger.info(f"NS servers found: {ns_servers}")
+            except Exception:
+                pass
+            
+            # Resolve the addresses of the first 2 NS servers concurrently
+            ns_address_futures = [
+                (ns_server, self.query_executor.submit(
+                    self._resolve, ns_server, 'A', zone, ns_timeout
+                ))
+                for ns_server in ns_servers[:2]
+            ]
+            
+            # Use each NS server for specific queries
+            ns_futures = []
+            for ns_server, future in ns_address_futures:
+                try:
+                    ns_ip = str(future.result()[0])
+                    
+                    # Create specific resolver for this NS server
+                    specific_resolver = dns.resolver.Resolver()
+                    specific_resolver.nameservers = [ns_ip]
+                    logger.info(f"Interrogating NS server {ns_server} ({ns_ip})")
+                    
+                    # Try specific queries on this server
+                    ns_futures.extend(self._submit_queries(
+                        [(zone, rtype) for rtype in ['A', 'AAAA', 'CNAME', 'MX', 'TXT', 'SRV']],
+                        zone, dns_timeout, resolver=specific_resolver, deadline=deadline
+                    ))
+                except Exception as e:
+                    logger.debug(f"Error with NS server {ns_server}: {e}")
+                    continue
+            
+            for record in self._collect_queries(ns_futures, deadline):
+                records.append(record)
+                logger.debug(f"DNS Walking found: {record}")
+            pattern_records = self._collect_queries(pattern_futures, deadline)
+            for record in self._suppress_wildcard_records(zone, pattern_records, wildcard):
+                records.append(record)
+                logger.debug(f"Pattern found: {record}")
+                        
+        except Exception as e:
+            logger.error(f"Error in DNS walking: {e}")
+        
+        logger.info(f"DNS Walking: {len(records)} additional records found")
+        return records
+
+    def _walk_dnssec_chain(self, zone: str, lifetime: float,
+                           deadline: Optional[Deadline] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Enumerate a signed zone through its NSEC chain or NSEC3 hashes
+
+        Returns the records of the owner names found and whether the walk
+        covered the whole chain, in which case label guessing is pointless.
+        """
+        discovery = self.config.get('discovery', {})
+        mode = discovery.get('dnssec_walk', 'auto')
+        if mode == 'off' or (deadline is not None and deadline.expired()):
+            return [], False
+        if self._dns_breaker(self.dns_server).is_open:
+            return [], False
+
+        start = time.perf_counter()
+        report = {'zone': zone, 'mode': None, 'names': 0, 'queries': 0, 'complete': False}
+        try:
+            detected = self.chain_walker.detect_mode(zone, lifetime, deadline)
+            if mode == 'auto':
+                mode = detected
+            if mode is None:
+                logger.debug(f"Zone {zone} is not signed, no NSEC chain to walk")
+                return [], False
+            report['mode'] = mode
+
+            if mode == 'nsec':
+                walk = self.chain_walker.walk_nsec(zone, lifetime, deadline)
+                names = walk['names']
+                report['complete'] = walk['complete']
+            else:
+                walk = self.chain_walker.collect_nsec3(zone, lifetime, deadline)
+                if walk['params'] is None:
+                    return [], False
+                # Every existing name has a hash in the chain: names are recovered
+                # offline from the wordlists instead of guessed with queries
+                labels = itertools.chain(COMMON_SUBDOMAINS, SubdomainEnumerator.iter_wordlists(
+                    discovery.get('wordlists') or []
+                ))
+                names = self.chain_walker.match_nsec3(zone, walk['hashes'], walk['params'], labels)
+                report['complete'] = walk['complete']
+                report['hashes'] = len(walk['hashes'])
+                report['matched'] = len(names)
+            report['queries'] = walk['queries']
+        except (dns.exception.DNSException, OSError) as e:
+            logger.warning(f"DNSSEC chain walk of {zone} failed: {e}")
+            return [], False
+
+        queries = [
+            (name, rtype)
+            for name, types in names.items()
+            for rtype in types
+            if rtype in RECORD_TYPE_FILTERS['all']
+        ]
+        records = self._collect_queries(self._submit_queries(queries, zone, lifetime, deadline=deadline), deadline)
+
+        report['names'] = len(names)
+        report['records'] = len(records)
+        report['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self.chain_walker.record_walk(report)
+        logger.info(f"{mode.upper()} walk of {zone}: {len(names)} names, {len(records)} records, "
+                     f"{report['queries']} queries in {report['duration_ms']} ms (complete: {report['complete']})")
+        return records, report['complete']
+
+    def _detect_wildcard(self, zone: str, lifetime: float, deadline: Optional[Deadline] = None) -> Dict[str, set]:
+        """Return the answers a wildcard gives by record type ({} when the zone has none)
+
+        Random labels are queried once per negative cache lifetime; any answer
+        they get can only come from a wildcard. The fingerprint is only cached
+        when every probe got an answer, NoAnswer or NXDOMAIN.
+        """
+        if not self.config.get('discovery', {}).get('detect_wildcards', True):
+            return {}
+        fingerprint = self.negative_cache.get_wildcard(zone)
+        if fingerprint is not None:
+            return fingerprint
+
+        probes = [
+            (f"{secrets.token_hex(8)}.{zone}", rtype)
+            for _ in range(2)
+            for rtype in SUBDOMAIN_RECORD_TYPES
+        ]
+        futures = [
+            self.query_executor.submit(self._lookup_records, qname, rtype, zone, lifetime, None, deadline)
+            for qname, rtype in probes
+        ]
+        fingerprint = {}
+        conclusive = True
+        for future in futures:
+            if deadline is not None and not future.done() and deadline.expired():
+                future.cancel()
+            if future.cancelled():
+                conclusive = False
+                continue
+            records, answered = future.result()
+            conclusive = conclusive and answered
+            for record in records:
+                fingerprint.setdefault(record['type'], set()).add(record['value'])
+        # An empty fingerprint from probes that timed out or were cut short by
+        # the deadline would hide a wildcard for the whole cache lifetime
+        if conclusive:
+            self.negative_cache.set_wildcard(zone, fingerprint)
+        else:
+            logger.debug(f"Wildcard probes of {zone} incomplete, fingerprint not cached")
+        if fingerprint:
+            logger.info(f"Wildcard detected in {zone} for {sorted(fingerprint)}")
+        return fingerprint
+
+    def _suppress_wildcard_records(self, zone: str, records: List[Dict[str, Any]],
+                                   wildcard: Dict[str, set]) -> List[Dict[str, Any]]:
+        """Drop records below the apex whose answer is the zone's wildcard answer"""
+        if not wildcard:
+            return records
+        kept = [
+            record for record in records
+            if record['name'] == '@' or record['value'] not in wildcard.get(record['type'], ())
+        ]
+        if len(kept) < len(records):
+            logger.debug(f"Suppressed {len(records) - len(kept)} wildcard answers in {zone}")
+        return kept
+
+    def _cache_bypassed(self, zone: str) -> bool:
+        """Return True while cached answers of a recently written zone must not be used"""
+        written_at = self._zone_writes.get(self._normalize_zone(zone))
+        bypass = self.config.get('cache', {}).get('write_bypass_seconds', 30)
+        if written_at is not None and time.monotonic() - written_at < bypass:
+            self.resolver_cache.record_bypass()
+            return True
+        return False
+
+    def _resolve(self, qname: str, rtype: str, zone: str, lifetime: float) -> 'dns.resolver.Answer':
+        """Resolve one name/type on the fastest healthy nameserver, through the resolver cache
+
+        Raises the same NXDOMAIN / NoAnswer / Timeout exceptions as Resolver.resolve.
+        """
+        name = dns.name.from_text(qname)
+        rdtype = dns.rdatatype.from_text(rtype)
+        zone_key = self._normalize_zone(zone)
+        written_at = self._zone_writes.get(zone_key)
+        use_cache = not self._cache_bypassed(zone)
+        if use_cache:
+            answer = self.resolver_cache.get((name, rdtype, dns.rdataclass.IN))
+            if answer is not None:
+                if answer.rrset is None:
+                    raise dns.resolver.NoAnswer(response=answer.response)
+                return answer
+            answer = self.resolver_cache.get((name, dns.rdatatype.ANY, dns.rdataclass.IN))
+            if answer is not None and answer.response.rcode() == dns.rcode.NXDOMAIN:
+                raise dns.resolver.NXDOMAIN(qnames=[name], responses={name: answer.response})
+
+        response, server = self._exchange(name, rdtype, lifetime)
+        # A write during the exchange has evicted the zone: do not cache an answer older than it
+        use_cache = use_cache and self._zone_writes.get(zone_key) == written_at
+        rcode = response.rcode()
+        if rcode == dns.rcode.NXDOMAIN:
+            if use_cache:
+                answer = dns.resolver.Answer(name, dns.rdatatype.ANY, dns.rdataclass.IN, response)
+                self.resolver_cache.put((name, dns.rdatatype.ANY, dns.rdataclass.IN), answer)
+            raise dns.resolver.NXDOMAIN(qnames=[name], responses={name: response})
+        if rcode != dns.rcode.NOERROR:
+            raise dns.resolver.NoNameservers(request=response, errors=[
+                (server, bool(self._query_channels), 53, dns.rcode.to_text(rcode), response)
+            ])
+
+        answer = dns.resolver.Answer(name, rdtype, dns.rdataclass.IN, response)
+        if use_cache:
+            self.resolver_cache.put((name, rdtype, dns.rdataclass.IN), answer)
+        if answer.rrset is None:
+            raise dns.resolver.NoAnswer(response=response)
+        return answer
+
+    def _exchange(self, name, rdtype, lifetime: float):
+        """Send a query to the ranked nameservers, returning (response, server)
+
+        Servers are tried fastest first, failing over on errors. Each attempt
+        waits for the server's adaptive timeout (SRTT + k * RTTVAR) rather
+        than the whole lifetime; once every server has been tried, the
+        timeouts double for each further round, as TCP retransmissions do.
+        When hedging is enabled and a server has not answered within its RTT
+        percentile, a duplicate query goes to the next server and the first
+        answer wins. Circuit breakers record one failure per server only once
+        the whole exchange has failed.
+        """
+        settings = self.config.get('nameservers', {})
+        hedge_percentile = settings.get('hedge_percentile', 0)
+        deadline = time.monotonic() + lifetime
+        servers = [server for server in self.nameservers.ranked() if not self._dns_breaker(server).is_open]
+        if not servers:
+            raise BackendUnavailable(f"No DNS server available: {', '.join(self.breakers.unavailable())}")
+        attempts = len(servers) * (1 + settings.get('max_retransmits', 2))
+        errors = []
+
+        def attempt_timeout(attempt: int) -> float:
+            server = servers[attempt % len(servers)]
+            backoff = 2 ** (attempt // len(servers))
+            return min(deadline - time.monotonic(), self.nameservers.timeout(server, lifetime) * backoff)
+
+        attempt = 0
+        while attempt < attempts:
+            timeout = attempt_timeout(attempt)
+            if timeout <= 0:
+                break
+            server = servers[attempt % len(servers)]
+            attempt += 1
+            hedge_server = servers[attempt % len(servers)]
+            hedge_delay = None
+            if hedge_percentile and hedge_server != server:
+                hedge_delay = self.nameservers.percentile(
+                    server, hedge_percentile, settings.get('hedge_min_samples', 20)
+                )
+            if hedge_delay is None or hedge_delay >= timeout:
+                try:
+                    return self._send_query(server, name, rdtype, timeout), server
+                except (dns.exception.DNSException, OSError, EOFError) as e:
+                    errors.append((server, False, 53, e, None))
+                    continue
+
+            # Hedged exchange: race the first server against the next one
+            first = self.hedge_executor.submit(self._send_query, server, name, rdtype, timeout)
+            done, _ = wait([first], timeout=hedge_delay)
+            if not done:
+                hedge_timeout = attempt_timeout(attempt)
+                attempt += 1
+                second = self.hedge_executor.submit(
+                    self._send_query, hedge_server, name, rdtype, max(0.0, hedge_timeout)
+                )
+                racing = {first: server, second: hedge_server}
+                while racing:
+                    done, _ = wait(list(racing), timeout=max(0.0, deadline - time.monotonic()),
+                                   return_when=FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for future in done:
+                        winner = racing.pop(future)
+                        try:
+                            response = future.result()
+                        except (dns.exception.DNSException, OSError, EOFError) as e:
+                            errors.append((winner, False, 53, e, None))
+                            continue
+                        self.nameservers.record_hedge(won=winner == hedge_server)
+                        return response, winner
+                continue
+            try:
+                return first.result(), server
+            except (dns.exception.DNSException, OSError, EOFError) as e:
+                errors.append((server, False, 53, e, None))
+
+        # No server answered: one failure per server for the whole exchange,
+        # not one per attempt, so a single lost query cannot open a breaker
+        last_errors = {server: error for server, _, _, error, _ in errors}
+        for server, error in last_errors.items():
+            self._dns_breaker(server).record_failure(error)
+        raise dns.resolver.LifetimeTimeout(timeout=lifetime, errors=errors)
+
+    def _send_query(self, server: str, name, rdtype, timeout: float):
+        """Query one nameserver, recording its round-trip time or its failure"""
+        request = dns.message.make_query(name, rdtype)
+        start = time.perf_counter()
+        try:
+            channel = self._query_channels.get(server)
+            if channel is not None:
+                response = channel.query(request, timeout)
+            else:
+                response, _ = dns.query.udp_with_fallback(request, server, timeout=timeout)
+        except Exception:
+            # The circuit breaker only counts whole exchanges, see _exchange
+            self.nameservers.record_failure(server)
+            raise
+        self.nameservers.record_success(server, time.perf_counter() - start)
+        self._dns_breaker(server).record_success()
+        return response
+
+    def _submit_queries(self, queries: List[Tuple[str, str]], zone: str, lifetime: float, resolver=None,
+                        deadline: Optional[Deadline] = None) -> List[Future]:
+        """Submit (name, type) queries to the bounded query pool"""
+        return [
+            self.query_executor.submit(self._query_records, qname, rtype, zone, lifetime, resolver, deadline)
+            for qname, rtype in queries
+        ]
+
+    def _collect_queries(self, futures: List[Future], deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Wait for submitted queries and return their records in submission order
+
+        Queries not started yet are cancelled once the deadline has expired.
+        """
+        records = []
+        for future in futures:
+            if deadline is not None and not future.done() and deadline.expired():
+                future.cancel()
+            if not future.cancelled():
+                records.extend(future.result())
+        return records
+
+    def _query_records(self, qname: str, rtype: str, zone: str, lifetime: float,
+                       resolver=None, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Resolve one name/type and convert the answer into record dictionaries
+
+        Queries still waiting in the pool when the deadline expires are
+        dropped without being sent.
+        """
+        return self._lookup_records(qname, rtype, zone, lifetime, resolver, deadline)[0]
+
+    def _lookup_records(self, qname: str, rtype: str, zone: str, lifetime: float, resolver=None,
+                        deadline: Optional[Deadline] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Like _query_records, also telling whether the name got a definite answer
+
+        Records, NoAnswer and NXDOMAIN are definite; timeouts, errors and
+        queries skipped by the deadline are not.
+        """
+        records = []
+        if deadline is not None:
+            if deadline.expired():
+                return records, False
+            lifetime = deadline.clamp(lifetime)
+        # Negative answers are only cached for the configured server
+        cache_negative = resolver is None
+        if cache_negative and self.negative_cache.is_negative(zone, qname, rtype):
+            return records, True
+        try:
+            logger.debug(f"Query {rtype} for {qname}")
+            if resolver is None:
+                answers = self._resolve(qname, rtype, zone, lifetime)
+            else:
+                answers = resolver.resolve(qname, rtype, lifetime=lifetime)
+            for answer in answers:
+                records.append({
+                    'name': self._convert_to_relative_name(qname, zone),
+                    'type': rtype,
+                    'value': str(answer),
+                    'ttl': answers.rrset.ttl if hasattr(answers, 'rrset') else 'N/A',
+                    'source': 'query'
+                })
+        except dns.resolver.NoAnswer:
+            if cache_negative:
+                self.negative_cache.add(zone, qname, rtype)
+        except dns.resolver.NXDOMAIN:
+            logger.debug(f"NXDOMAIN for {rtype} {qname}")
+            if cache_negative:
+                self.negative_cache.add(zone, qname)
+        except dns.resolver.Timeout:
+            logger.debug(f"Timeout for {rtype} {qname}")
+            if deadline is not None:
+                # Marks the results as partial when the deadline cut the query short
+                deadline.expired()
+            return records, False
+        except Exception as e:
+            logger.debug(f"Error for {qname} {rtype}: {e}")
+            return records, False
+        return records, True
+
+    def _try_zone_transfer(self, zone: str, record_type: str,
+                           deadline: Optional[Deadline] = None) -> Optional[List[Dict[str, Any]]]:
+        """Attempt a zone AXFR transfer, reusing the cached copy while the serial is unchanged
+
+        Returns None when the zone cannot be transferred before the deadline.
+        """
+        records = None
+        if deadline is not None and deadline.expired():
+            return records
+        try:
+            zone_data = self._get_zone_data(zone, deadline)
+            if zone_data is None:
+                return records
+
+            records = self._get_zone_store(zone, zone_data).select(record_type)
+
+        except (dns.query.TransferError, dns.xfr.TransferError) as e:
+            logger.warning(f"Zone transfer refused for {zone}: {e}")
+        except dns.exception.FormError as e:
+            logger.warning(f"Format error during zone transfer for {zone}: {e}")
+        except Exception as e:
+            if deadline is not None and deadline.expired():
+                logger.warning(f"Deadline reached during zone transfer for {zone}")
+            else:
+                logger.error(f"Zone transfer failed for {zone}: {e}")
+
+        return records
+
+    def _get_zone_data(self, zone: str, deadline: Optional[Deadline] = None):
+        """Return the parsed zone, transferring it only when the SOA serial has moved"""
+        serial = None
+        cached = self.zone_cache.peek(zone)
+        if cached is not None:
+            serial = self._query_soa_serial(zone, deadline)
+        cached_zone = self.zone_cache.lookup(zone, serial)
+        if cached_zone is not None:
+            logger.info(f"Zone {zone} unchanged (serial {serial}), using cached transfer")
+            return cached_zone
+
+        zone_data = None
+        report = None
+        if cached is not None and self.config.get('discovery', {}).get('enable_ixfr', True):
+            # Request only the changes since the cached serial
+            try:
+                zone_data, report = self._transfer_zone(zone, cached['zone'], cached['serial'], deadline)
+            except (dns.xfr.TransferError, dns.xfr.SerialWentBackwards, dns.exception.FormError) as e:
+                logger.info(f"IXFR unavailable for {zone} ({e}), falling back to AXFR")
+
+        if zone_data is None:
+            logger.info(f"Attempting zone AXFR transfer for {zone}")
+            # Attempt zone transfer (requires authorization)
+            zone_data, report = self._transfer_zone(zone, deadline=deadline)
+
+        self._record_transfer(zone, report)
+        soa = zone_data.get_rdataset('@', 'SOA')
+        if soa:
+            self.zone_cache.put(zone, zone_data, soa[0].serial)
+        logger.info(
+            f"Zone transfer successful for {zone}: {report['type']}, "
+            f"{report['records']} records, {report['bytes']} bytes in {report['duration_ms']} ms"
+        )
+        return zone_data
+
+    def _transfer_zone(self, zone: str, base_zone=None, base_serial: Optional[int] = None,
+                       deadline: Optional[Deadline] = None):
+        """Run an AXFR, or an IXFR applied to base_zone, and report what moved over the wire
+
+        The transfer is abandoned with dns.exception.Timeout when the deadline
+        expires. base_zone is never modified: an IXFR is applied to a copy.
+        """
+        is_ixfr = base_zone is not None
+        if is_ixfr:
+            # The cached zone must keep matching the serial it is cached under
+            # until put() replaces it. The copy shares the nodes, which the
+            # transaction copies before changing them
+            zone_data = dns.zone.Zone(base_zone.origin, base_zone.rdclass, base_zone.relativize)
+            zone_data.nodes.update(base_zone.nodes)
+        else:
+            zone_data = dns.zone.Zone(dns.name.from_text(zone))
+        rdtype = dns.rdatatype.IXFR if is_ixfr else dns.rdatatype.AXFR
+        query, _ = dns.xfr.make_query(zone_data, serial=base_serial if is_ixfr else None)
+        origin = zone_data.from_wire_origin()
+        transfer_timeout = self.config.get('discovery', {}).get('transfer_timeout', 30)
+
+        report = {
+            'type': 'ixfr' if is_ixfr else 'axfr',
+            'bytes': 0,
+            'records': 0,
+            'messages': 0,
+            'duration_ms': 0
+        }
+        start = time.perf_counter()
 
-        try:
-            if record_type == 'all':
-                # Retrieve all record types
-                record_types = ['A', 'AAAA', 'CNAME', 'MX', 'NS', 'PTR', 'SOA', 'TXT', 'SPF', 'SRV']
-            elif record_type == 'direct':
-                record_types = ['A', 'AAAA', 'CNAME']
-            elif record_type == 'inverse':
-                record_types = ['PTR']
-            elif record_type == 'special':
-                record_types = ['MX', 'NS', 'SOA', 'TXT', 'SPF', 'SRV']
-            else:
-                record_types = [record_type.upper()]
+        def message_timeout() -> float:
+            if deadline is None:
+                return transfer_timeout
+            if deadline.expired():
+                raise dns.exception.Timeout(timeout=deadline.budget)
+            return deadline.clamp(transfer_timeout)
 
-            # First, attempt zone AXFR transfer
-            logger.info(f"Attempting zone transfer for {zone}")
-            axfr_records = self._try_zone_transfer(zone, record_type)
-            if axfr_records:
-                logger.info(f"Zone transfer successful: {len(axfr_records)} records found")
-                return axfr_records
+        # Servers may refuse TCP while answering queries, so only queries open the breaker
+        self._dns_breaker(self.dns_server).check()
+        with socket.create_connection((self.dns_server, 53), timeout=message_timeout()) as sock:
+            wire = query.to_wire()
+            sock.sendall(struct.pack('!H', len(wire)) + wire)
+            # Changes are applied inside a transaction that only replaces the
+            # zone's nodes on commit
+            with dns.xfr.Inbound(zone_data, rdtype, base_serial) as inbound:
+                done = False
+                while not done:
+                    sock.settimeout(message_timeout())
+                    (length,) = struct.unpack('!H', self._recv_exactly(sock, 2))
+                    response_wire = self._recv_exactly(sock, length)
+                    message = dns.message.from_wire(
+                        response_wire,
+                        xfr=True,
+                        origin=origin,
+                        one_rr_per_rrset=is_ixfr
+                    )
+                    report['bytes'] += length + 2
+                    report['messages'] += 1
+                    report['records'] += sum(len(rrset) for rrset in message.answer)
+                    done = inbound.process_message(message)
 
-            logger.info(f"Zone transfer failed, using individual queries")
-            
-            # If zone transfer fails, use individual queries
-            zone_exists = False
-            
-            # Configure DNS timeout from configuration
-            dns_timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
-            # Use an even shorter timeout for individual record queries to be more responsive
-            record_query_timeout = min(dns_timeout, 0.5)  # Maximum 0.5 seconds for quick response
-            original_timeout = self.resolver.timeout
-            self.resolver.timeout = record_query_timeout
-            
-            try:
-                # 1. Retrieve records from zone root
-                for rtype in record_types:
-                    try:
-                        if rtype == 'PTR' and not zone.endswith('.arpa'):
-                            continue
+                if is_ixfr and inbound.rdtype == dns.rdatatype.AXFR:
+                    # Journal no longer covers our serial: server sent the full zone
+                    report['type'] = 'ixfr-full'
 
-                        logger.debug(f"Query {rtype} for {zone}")
-                        answers = self.resolver.resolve(zone, rtype)
-                        zone_exists = True
-
-                        for answer in answers:
-                            record = {
-                                'name': self._convert_to_relative_name(zone, zone),
-                                'type': rtype,
-                                'value': str(answer),
-                                'ttl': answers.rrset.ttl if hasattr(answers, 'rrset') else 'N/A'
-                            }
-                            records.append(record)
-                            logger.debug(f"Found: {record}")
-
-                    except dns.resolver.NoAnswer:
-                        continue
-                    except dns.resolver.NXDOMAIN:
-                        logger.debug(f"NXDOMAIN for {rtype} in {zone}")
-                        continue
-                    except dns.resolver.Timeout:
-                        logger.warning(f"Timeout for {rtype} in {zone}")
-                        continue
-                    except Exception as e:
-                        logger.debug(f"Error for {rtype} in {zone}: {e}")
-                        continue
+        report['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return zone_data, report
 
-                # 2. If asking for all records, explore common subdomains
-                if record_type == 'all' and self.config.get('discovery', {}).get('enable_subdomain_discovery', True):
-                    records.extend(self._discover_subdomains(zone))
-                
-                # 3. If still no satisfactory result, try DNS walking approach
-                if (len(records) < 3 and 
-                    self.config.get('discovery', {}).get('enable_dns_walking', True)):
-                    logger.info(f"Few records found ({len(records)}), trying DNS discovery")
-                    walking_records = self._dns_walking(zone)
-                    records.extend(walking_records)
-                    
-            finally:
-                # Restore original timeout
-                self.resolver.timeout = original_timeout
+    @staticmethod
+    def _recv_exactly(sock, count: int) -> bytes:
+        data = b''
+        while len(data) < count:
+            chunk = sock.recv(count - len(data))
+            if not chunk:
+                raise EOFError('Connection closed during zone transfer')
+            data += chunk
+        return data
 
-        except Exception as e:
-            logger.error(f"Error retrieving records: {e}")
+    def _record_transfer(self, zone: str, report: Dict[str, Any]):
+        """Accumulate zone transfer statistics by transfer type"""
+        with self._transfer_stats_lock:
+            totals = self._transfer_stats['totals'].setdefault(
+                report['type'], {'count': 0, 'bytes': 0, 'records': 0}
+            )
+            totals['count'] += 1
+            totals['bytes'] += report['bytes']
+            totals['records'] += report['records']
+            last = self._transfer_stats['last']
+            last.pop(zone, None)
+            last[zone] = dict(report, zone=zone, at=time.time())
+            while len(last) > self.zone_cache.max_entries:
+                last.pop(next(iter(last)))
 
-        # Remove duplicates
-        unique_records = []
-        seen = set()
-        for record in records:
-            key = (record['name'], record['type'], record['value'])
-            if key not in seen:
-                seen.add(key)
-                unique_records.append(record)
+    def get_transfer_report(self, zone: str) -> Optional[Dict[str, Any]]:
+        """Return the report of the last zone transfer of a zone"""
+        with self._transfer_stats_lock:
+            report = self._transfer_stats['last'].get(zone)
+            return dict(report) if report else None
 
-        logger.info(f"Total unique records found: {len(unique_records)}")
-        return unique_records
+    def _get_zone_store(self, zone: str, zone_data) -> 'RecordStore':
+        """Return the type-indexed records of a transferred zone, building them once per serial"""
+        soa = zone_data.get_rdataset('@', 'SOA')
+        serial = soa[0].serial if soa else None
+        store = self.zone_cache.get_store(zone, serial)
+        if store is None:
+            store = RecordStore(self._zone_to_records(zone_data, zone, 'all', source='axfr'))
+            self.zone_cache.set_store(zone, serial, store)
+        return store
 
-    def _discover_subdomains(self, zone: str) -> List[Dict[str, Any]]:
-        """Discover current subdomains of the zone"""
-        records = []
-        
-        # Extended list of commonly used subdomains
-        common_subdomains = [
-            'www', 'mail', 'ftp', 'ns1', 'ns2', 'ns3', 'ns', 'dns', 'dns1', 'dns2',
-            'mx', 'mx1', 'mx2', 'smtp', 'pop', 'pop3', 'imap', 'webmail',
-            'admin', 'cpanel', 'whm', 'panel', 'control',
-            'blog', 'shop', 'store', 'api', 'app', 'mobile',
-            'test', 'dev', 'staging', 'prod', 'demo',
-            'vpn', 'remote', 'ssh', 'sftp',
-            'cloud', 'cdn', 'static', 'media', 'img', 'images',
-            'video', 'stream', 'live', 'chat',
-            'forum', 'wiki', 'docs', 'help', 'support'
-        ]
-        
-        # Limit the number of subdomains according to configuration
-        max_subdomains = self.config.get('discovery', {}).get('max_subdomains', 50)
-        subdomains_to_test = common_subdomains[:max_subdomains]
-        
-        # Configure DNS timeout
-        dns_timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
-        original_timeout = self.resolver.timeout
-        self.resolver.timeout = dns_timeout
-        
+    def _query_soa_serial(self, zone: str, deadline: Optional[Deadline] = None) -> Optional[int]:
+        """Ask the DNS server for the current SOA serial of a zone"""
+        if self._dns_breaker(self.dns_server).is_open:
+            return None
         try:
-            for subdomain in subdomains_to_test:
-                full_name = f"{subdomain}.{zone}"
-                
-                # Test different record types for each subdomain
-                for rtype in ['A', 'AAAA', 'CNAME', 'MX', 'TXT']:
-                    try:
-                        answers = self.resolver.resolve(full_name, rtype)
-                        
-                        for answer in answers:
-                            record = {
-                                'name': self._convert_to_relative_name(full_name, zone),
-                                'type': rtype,
-                                'value': str(answer),
-                                'ttl': answers.rrset.ttl if hasattr(answers, 'rrset') else 'N/A'
-                            }
-                            records.append(record)
-                            logger.debug(f"Subdomain found: {record}")
-                            
-                    except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN, dns.resolver.Timeout):
-                        continue
-                    except Exception as e:
-                        logger.debug(f"Error for {full_name} {rtype}: {e}")
-                        continue
-        finally:
-            # Restore original timeout
-            self.resolver.timeout = original_timeout
-        
-        logger.info(f"Subdomain discovery: {len(records)} records found (tested: {len(subdomains_to_test)}/{len(common_subdomains)})")
-        return records
+            timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
+            if deadline is not None:
+                timeout = deadline.clamp(timeout)
+            query = dns.message.make_query(zone, 'SOA')
+            response = dns.query.udp(query, self.dns_server, timeout=timeout)
+            for rrset in response.answer:
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return rrset[0].serial
+        except Exception as e:
+            logger.debug(f"SOA serial query failed for {zone}: {e}")
+        return None
 
-    def _dns_walking(self, zone: str) -> List[Dict[str, Any]]:
-        """DNS walking technique for discovering additional records"""
+    def _zone_to_records(self, zone_data, zone: str, record_type: str,
+                         source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Convert a parsed zone into record dictionaries matching the type filter"""
         records = []
-        
-        try:
-            # Try to retrieve NS records to obtain name servers
-            ns_servers = []
-            try:
-                ns_answers = self.resolver.resolve(zone, 'NS')
-                ns_servers = [str(ns) for ns in ns_answers]
-                logger.info(f"NS servers found: {ns_servers}")
-            except:
-                pass
-            
-            # Use each NS server for specific queries
-            for ns_server in ns_servers[:2]:  # Limit to 2 NS servers
-                try:
-                    # Create specific resolver for this NS server
-                    specific_resolver = dns.resolver.Resolver()
-                    
-                    # Resolve NS server IP address
-                    try:
-                        ns_ip_answers = self.resolver.resolve(ns_server, 'A')
-                        ns_ip = str(ns_ip_answers[0])
-                        specific_resolver.nameservers = [ns_ip]
-                        logger.info(f"Interrogating NS server {ns_server} ({ns_ip})")
-                        
-                        # Try specific queries on this server
-                        for rtype in ['A', 'AAAA', 'CNAME', 'MX', 'TXT', 'SRV']:
-                            try:
-                                answers = specific_resolver.resolve(zone, rtype)
-                                for answer in answers:
-                                    record = {
-                                        'name': self._convert_to_relative_name(zone, zone),
-                                        'type': rtype,
-                                        'value': str(answer),
-                                        'ttl': answers.rrset.ttl if hasattr(answers, 'rrset') else 'N/A'
-                                    }
-                                    records.append(record)
-                                    logger.debug(f"DNS Walking found: {record}")
-                            except:
-                                continue
-                                
-                    except Exception as e:
-                        logger.debug(f"Error with NS server {ns_server}: {e}")
-                        continue
-                        
-                except Exception as e:
-                    logger.debug(f"General error with NS {ns_server}: {e}")
-                    continue
-            
-            # Try some common patterns with numbers
-            patterns = ['host', 'server', 'pc', 'workstation']
-            for pattern in patterns:
-                for i in range(1, 6):  # Test 1-5
-                    test_name = f"{pattern}{i}.{zone}"
-                    try:
-                        answers = self.resolver.resolve(test_name, 'A')
-                        for answer in answers:
-                            record = {
-                                'name': self._convert_to_relative_name(test_name, zone),
-                                'type': 'A',
-                                'value': str(answer),
-                                'ttl': answers.rrset.ttl if hasattr(answers, 'rrset') else 'N/A'
-                            }
-                            records.append(record)
-                            logger.debug(f"Pattern found: {record}")
-                    except:
-                        continue
-                        
-        except Exception as e:
-            logger.error(f"Error in DNS walking: {e}")
-        
-        logger.info(f"DNS Walking: {len(records)} additional records found")
+        for name, node in zone_data.nodes.items():
+            for rdataset in node.rdatasets:
+                records.extend(self._rdataset_to_records(name, rdataset, zone, record_type, source))
+
+        logger.info(f"Zone {zone} converted: {len(records)} records retrieved")
         return records
 
-    def _try_zone_transfer(self, zone: str, record_type: str) -> List[Dict[str, Any]]:
-        """Attempt a zone AXFR transfer"""
+    def _rdataset_to_records(self, name, rdataset, zone: str, record_type: str,
+                             source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Convert one relativized rdataset into record dictionaries matching the type filter"""
         records = []
-        try:
-            logger.info(f"Attempting zone AXFR transfer for {zone}")
-            # Attempt zone transfer (requires authorization)
-            zone_data = dns.zone.from_xfr(dns.query.xfr(self.dns_server, zone))
-
-            for name, node in zone_data.nodes.items():
-                for rdataset in node.rdatasets:
-                    rtype = dns.rdatatype.to_text(rdataset.rdtype)
-
-                    # Filter by type if necessary
-                    if self._should_include_record(rtype, record_type):
-                        for rdata in rdataset:
-                            # Construct full name
-                            if str(name) == '@':
-                                full_name = zone
-                            elif str(name) == zone:
-                                full_name = zone
-                            else:
-                                full_name = f"{name}.{zone}" if not str(name).endswith('.') else str(name)
-                            
-                            record = {
-                                'name': self._convert_to_relative_name(full_name, zone),
-                                'type': rtype,
-                                'value': str(rdata),
-                                'ttl': rdataset.ttl
-                            }
-                            records.append(record)
-
-            logger.info(f"Zone transfer successful: {len(records)} records retrieved")
-
-        except dns.query.TransferError as e:
-            logger.warning(f"Zone transfer refused for {zone}: {e}")
-        except dns.exception.FormError as e:
-            logger.warning(f"Format error during zone transfer for {zone}: {e}")
-        except Exception as e:
-            logger.error(f"Zone transfer failed for {zone}: {e}")
+        rtype = dns.rdatatype.to_text(rdataset.rdtype)
+
+        # Filter by type if necessary
+        if self._should_include_record(rtype, record_type):
+            for rdata in rdataset:
+                # Construct full name
+                if str(name) == '@':
+                    full_name = zone
+                elif str(name) == zone:
+                    full_name = zone
+                else:
+                    full_name = f"{name}.{zone}" if not str(name).endswith('.') else str(name)
+                
+                record = {
+                    'name': self._convert_to_relative_name(full_name, zone),
+                    'type': rtype,
+                    'value': str(rdata),
+                    'ttl': rdataset.ttl
+                }
+                if source:
+                    record['source'] = source
+                records.append(record)
 
         return records
 
+    def iter_zone_records(self, zone: str, record_type: str = 'all') -> Iterator[Dict[str, Any]]:
+        """Yield the records of a zone one by one while it is being transferred
+
+        Memory use stays flat whatever the zone size: each AXFR message is
+        converted and released before the next one is read. A cached zone
+        with an unchanged serial is served from the cache instead. Records
+        carry source 'axfr' like those of get_records_with_sources.
+        """
+        if self.zone_cache.peek(zone) is not None:
+            cached_zone = self.zone_cache.lookup(zone, self._query_soa_serial(zone))
+            if cached_zone is not None:
+                for name, node in cached_zone.nodes.items():
+                    for rdataset in node.rdatasets:
+                        yield from self._rdataset_to_records(name, rdataset, zone, record_type, 'axfr')
+                return
+
+        origin = dns.name.from_text(zone)
+        query = dns.message.make_query(origin, dns.rdatatype.AXFR)
+        transfer_timeout = self.config.get('discovery', {}).get('transfer_timeout', 30)
+        report = {'type': 'axfr-stream', 'bytes': 0, 'records': 0, 'messages': 0, 'duration_ms': 0}
+        start = time.perf_counter()
+
+        with socket.create_connection((self.dns_server, 53), timeout=transfer_timeout) as sock:
+            wire = query.to_wire()
+            sock.sendall(struct.pack('!H', len(wire)) + wire)
+
+            soa_seen = False
+            done = False
+            while not done:
+                (length,) = struct.unpack('!H', self._recv_exactly(sock, 2))
+                message = dns.message.from_wire(
+                    self._recv_exactly(sock, length),
+                    xfr=True,
+                    origin=origin,
+                    one_rr_per_rrset=True
+                )
+                if message.rcode() != dns.rcode.NOERROR:
+                    raise dns.xfr.TransferError(message.rcode())
+                report['bytes'] += length + 2
+                report['messages'] += 1
+
+                for rrset in message.answer:
+                    report['records'] += len(rrset)
+                    if rrset.rdtype == dns.rdatatype.SOA and rrset.name == dns.name.empty:
+                        # The zone SOA opens and closes the transfer
+                        if soa_seen:
+                            done = True
+                            break
+                        soa_seen = True
+                    elif not soa_seen:
+                        raise dns.exception.FormError('first RRset is not an SOA')
+                    yield from self._rdataset_to_records(rrset.name, rrset, zone, record_type, 'axfr')
+
+        report['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        self._record_transfer(zone, report)
+
     def _should_include_record(self, rtype: str, filter_type: str) -> bool:
         """Determine if a record should be included based on filter"""
         if filter_type == 'all':
             return True
-        elif filter_type == 'direct':
-            return rtype in ['A', 'AAAA', 'CNAME']
-        elif filter_type == 'inverse':
-            return rtype == 'PTR'
-        elif filter_type == 'special':
-            return rtype in ['MX', 'NS', 'SOA', 'TXT', 'SPF', 'SRV']
+        elif filter_type in RECORD_TYPE_FILTERS:
+            return rtype in RECORD_TYPE_FILTERS[filter_type]
         else:
             return rtype.upper() == filter_type.upper()
 
     def validate_zone(self, zone: str) -> bool:
         """Validate that a zone exists"""
+        dns_timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
         try:
-            self.resolver.resolve(zone, 'SOA')
+            self._resolve(zone, 'SOA', zone, dns_timeout)
             return True
         except:
             return False
@@ -903,15 +4097,16 @@ class DNSManager:
             'record_count': 0
         }
 
+        dns_timeout = self.config.get('discovery', {}).get('dns_timeout', 5)
         try:
             # SOA verification
-            soa_answer = self.resolver.resolve(zone, 'SOA')
+            soa_answer = self._resolve(zone, 'SOA', zone, dns_timeout)
             info['exists'] = True
             info['soa'] = str(soa_answer[0])
 
             # Retrieve NS
             try:
-                ns_answers = self.resolver.resolve(zone, 'NS')
+                ns_answers = self._resolve(zone, 'NS', zone, dns_timeout)
                 info['ns_records'] = [str(ns) for ns in ns_answers]
             except:
                 pass
@@ -925,6 +4120,27 @@ class DNSManager:
 
         return info
 
+    def submit_mutation(self, kind: str, zones: List[str], function: Callable[..., Dict[str, Any]], *args) -> Optional[Dict[str, Any]]:
+        """Queue function(*args) as a background job on zones, returning the job (None when the queue is full)
+
+        The job runs with the SSH configuration of the calling request.
+        """
+        ssh_config = self.ssh_config
+
+        def run():
+            with self.ssh_context(ssh_config):
+                return function(*args)
+
+        return self.mutation_jobs.submit(kind, zones, run)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status and, once finished, the result of a mutation job"""
+        return self.mutation_jobs.get(job_id)
+
+    def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait until a mutation job has finished, then return it"""
+        return self.mutation_jobs.wait(job_id, timeout)
+
     def add_dns_record(self, zone: str, name: str, record_type: str, value: str, ttl: int = 3600) -> Dict[str, Any]:
         """Add a new DNS record to the specified zone"""
         result = {
@@ -949,11 +4165,22 @@ class DNSManager:
             else:
                 full_name = zone
 
-            # Format record line for zone file
-            record_line = self._format_record_line(clean_name, record_type, value, ttl)
+            if self._uses_dynamic_update(zone):
+                # Zones accepting RFC 2136 updates are never edited through their file
+                result.update(self._send_dynamic_update(
+                    zone, [self._dynamic_add(zone, clean_name, record_type, value, ttl)], 'added'
+                ))
+                if result['success']:
+                    result['record'] = {
+                        'name': self._convert_to_relative_name(full_name, zone),
+                        'type': record_type,
+                        'value': value,
+                        'ttl': ttl
+                    }
+                return result
 
             # Attempt addition via SSH
-            ssh_result = self._add_record_via_ssh(zone, record_line)
+            ssh_result = self._add_record_via_ssh(zone, clean_name, record_type, value, ttl)
             if ssh_result['success']:
                 result.update(ssh_result)
                 result['record'] = {
@@ -1059,172 +4286,304 @@ class DNSManager:
         except:
             return False
 
-    def _format_record_line(self, name: str, record_type: str, value: str, ttl: int) -> str:
-        """Format a DNS record line for zone file"""
-        # Normalize name - empty or None becomes @
-        if not name or name.strip() == '':
-            name = '@'
-        else:
-            name = name.strip()
-        
-        # Format according to type
-        if record_type.upper() == 'MX':
-            return f"{name:<30} {ttl:<8} IN {record_type:<8} {value}"
-        else:
-            return f"{name:<30} {ttl:<8} IN {record_type:<8} {value}"
-
-    def _add_record_via_ssh(self, zone: str, record_line: str) -> Dict[str, Any]:
+    def _add_record_via_ssh(self, zone: str, name: str, record_type: str, value: str, ttl: int) -> Dict[str, Any]:
         """Add a record via SSH by actually modifying the zone file"""
-        result = {'success': False, 'message': ''}
-        
+        return self._edit_zone_file(
+            zone, lambda zone_file: self._zone_file_add(zone_file, zone, name, record_type, value, ttl), 'added'
+        )
+
+    def _zone_file_add(self, zone_file: ZoneFile, zone: str, name: str, record_type: str,
+                       value: str, ttl: int) -> Optional[str]:
+        """Add a record to a parsed zone file"""
+        entry = zone_file.add(name, record_type, value, ttl)
+        logger.info(f"Record added to zone {zone}: {entry.text.strip()}")
+        return None
+
+    def _zone_file_delete(self, zone_file: ZoneFile, zone: str, name: str, record_type: str,
+                          value: str) -> Optional[str]:
+        """Delete a record from a parsed zone file, returning an error message when it is missing"""
+        search_name = self._normalize_name_for_search(name, zone)
+        search_type = record_type.upper()
+        search_value = value.strip()
+        logger.info(f"Searching for record: name='{search_name}', type='{search_type}', value='{search_value}'")
+
+        candidates = zone_file.find(search_name, search_type)
+        entry = self._match_zone_entry(candidates, search_value, search_type)
+        if entry is None:
+            return f'Record not found in zone file. Checked: {len(candidates)} records.'
+        logger.info(f"Record found and deleted: {entry.text.strip()}")
+        zone_file.remove(entry)
+        return None
+
+    def _zone_file_update(self, zone_file: ZoneFile, zone: str, original: Dict[str, str],
+                          updated: Dict[str, Any]) -> Optional[str]:
+        """Replace a record of a parsed zone file, returning an error message when it is missing
+
+        updated must already hold a name relative to the zone.
+        """
+        search_name = self._normalize_name_for_search(original['name'], zone)
+        search_type = original['type'].upper()
+        search_value = original['value'].strip()
+        logger.info(f"Searching for record to modify: name='{search_name}', type='{search_type}', value='{search_value}'")
+
+        candidates = zone_file.find(search_name, search_type)
+        entry = self._match_zone_entry(candidates, search_value, search_type)
+        if entry is None:
+            return f'Original record not found in zone file. Checked: {len(candidates)} records.'
+        original_text = entry.text.strip()
+        zone_file.replace(entry, updated['name'], updated['type'], updated['value'], updated['ttl'])
+        logger.info(f"Record found and modified: {original_text} -> {entry.text.strip()}")
+        return None
+
+    def _edit_zone_file(self, zone: str, edit: Callable[[ZoneFile], Optional[str]], action: str) -> Dict[str, Any]:
+        """Apply edit to the parsed zone file, bump its SOA serial and commit it
+
+        edit receives the ZoneFile and returns an error message, or None once
+        it has changed the file. When ssh.commit_debounce is set, the edits of
+        the zone received within that window share one commit.
+        """
+        if not self.commit_scheduler.window:
+            return self._apply_zone_file_edits(zone, [(edit, action)])[0]
+
+        # Edits of one zone on one SSH account share a commit. The key leaves
+        # out the password: each edit carries its own configuration instead
+        ssh_config = self.ssh_config
+        key = (self._normalize_zone(zone), ssh_config.get('hostname'), ssh_config.get('port'),
+               ssh_config.get('username'))
+        future = self.commit_scheduler.submit(key, (edit, action, ssh_config))
+        # The edit's place is fixed: the next change of the zone may join its commit
+        self.mutation_jobs.release()
+        return future.result()
+
+    def _commit_coalesced_edits(self, key: Tuple[str, ...], edits: List[tuple]) -> List[Dict[str, Any]]:
+        """Commit the edits of a zone gathered by the commit scheduler
+
+        Consecutive edits made with the same SSH configuration are committed
+        together under it, so an edit never lands with another session's
+        credentials.
+        """
+        zone = key[0]
+        results = []
+        for ssh_config, group in itertools.groupby(edits, key=lambda item: item[2]):
+            with self.ssh_context(dict(ssh_config)):
+                results.extend(self._apply_zone_file_edits(zone, [(edit, action) for edit, action, _ in group]))
+        return results
+
+    def _apply_zone_file_edits(self, zone: str, edits: List[tuple]) -> List[Dict[str, Any]]:
+        """Apply (edit, action) pairs in order to the parsed zone file and commit them together
+
+        Returns one result per edit. An edit whose record is missing fails on
+        its own; when the shared commit fails, each edit is retried in its
+        own commit so that one invalid change does not reject the others.
+        """
+        results = [{'success': False, 'message': ''} for _ in edits]
+
         if not PARAMIKO_AVAILABLE:
-            result['message'] = 'Error: The paramiko module is not installed. Run: pip install paramiko'
-            return result
-        
+            message = 'Error: The paramiko module is not installed. Run: pip install paramiko'
+            return [{'success': False, 'message': message} for _ in edits]
+
         if not self.ssh_config.get('configured'):
-            result['message'] = 'SSH configuration required to modify zone files'
-            return result
-        
+            return [{'success': False, 'message': 'SSH configuration required to modify zone files'} for _ in edits]
+
+        applied = []
+        retry = False
+        error = None
         try:
-            # Create SSH client
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # SSH connection
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
-            )
-            
-            # Find the zone file path
-            zone_file_path = self._find_existing_zone_file(zone)
-            logger.debug(f"Using zone file path: {zone_file_path}")
-            
-            # Check if zone file exists
-            stdin, stdout, stderr = ssh_client.exec_command(f'test -f {zone_file_path} && echo "exists" || echo "not_found"')
-            file_check = stdout.read().decode().strip()
-            
-            if file_check == "not_found":
-                result['message'] = f'Zone file {zone_file_path} not found'
-                ssh_client.close()
-                return result
-            
-            # Create backup directory if it doesn't exist
-            stdin, stdout, stderr = ssh_client.exec_command('mkdir -p /etc/bind/backup')
-            
-            # Create file backup in the backup directory
-            backup_cmd = f'cp {zone_file_path} /etc/bind/backup/db.{zone}.backup.$(date +%Y%m%d_%H%M%S)'
-            stdin, stdout, stderr = ssh_client.exec_command(backup_cmd)
-            backup_status = stdout.channel.recv_exit_status()
-            
-            if backup_status != 0:
-                result['message'] = 'Error creating backup in /etc/bind/backup'
-                ssh_client.close()
-                return result
-            
-            # Read current file content
-            stdin, stdout, stderr = ssh_client.exec_command(f'cat {zone_file_path}')
-            current_content = stdout.read().decode()
-            
-            # Add new record before end line
-            lines = current_content.split('\n')
-            new_lines = []
-            record_added = False
-            
-            for line in lines:
-                new_lines.append(line)
-                # Add record after last existing record and before end comment lines
-                if not record_added and line.strip() and not line.startswith(';') and not line.startswith('$'):
-                    # If we find a record line, we will add our record after the corresponding section
-                    if any(rtype in line.upper() for rtype in ['IN A', 'IN AAAA', 'IN CNAME', 'IN MX', 'IN NS', 'IN TXT']):
-                        continue
-                elif not record_added and (line.strip() == '' or line.startswith(';')):
-                    # Add our record before empty or end comment lines
-                    new_lines.insert(-1, record_line)
-                    record_added = True
-            
-            # If record not added, add to end
-            if not record_added:
-                new_lines.insert(-1, record_line)
-            
-            # Increment serial number in SOA
-            new_content_lines = []
-            for line in new_lines:
-                if 'SOA' in line.upper() and ';' not in line.split('SOA')[0]:
-                    # Found SOA line, we will increment serial in following lines
-                    new_content_lines.append(line)
-                elif line.strip().isdigit() and len(line.strip()) == 10:
-                    # Probable serial number (YYYYMMDDNN)
-                    try:
-                        serial = int(line.strip())
-                        new_serial = serial + 1
-                        new_content_lines.append(line.replace(str(serial), str(new_serial)))
-                    except:
-                        new_content_lines.append(line)
+            # Borrow a pooled SSH connection
+            with self.ssh_pool.connection(self.ssh_config) as ssh_client:
+                # Find the zone file path
+                zone_file_path = self._find_existing_zone_file(zone, ssh_client)
+                logger.debug(f"Using zone file path: {zone_file_path}")
+
+                # Read current file content (a single round trip also tells whether it exists)
+                current_content = self._read_zone_file(ssh_client, zone_file_path)
+                if current_content is None:
+                    return [{'success': False, 'message': f'Zone file {zone_file_path} not found'} for _ in edits]
+
+                zone_file = ZoneFile(current_content, zone)
+                for index, (edit, _) in enumerate(edits):
+                    edit_error = edit(zone_file)
+                    if edit_error:
+                        results[index]['message'] = edit_error
+                    else:
+                        applied.append(index)
+                if not applied:
+                    return results
+
+                if zone_file.bump_serial() is None:
+                    logger.warning(f"No SOA serial found in {zone_file_path}, serial left unchanged")
+                new_content = zone_file.to_text()
+
+                # Backup, validate, replace and reload in one transaction
+                commit = self._commit_zone_file(ssh_client, zone, zone_file_path, current_content, new_content)
+                self.commit_scheduler.record_commit(len(applied))
+                if len(applied) > 1:
+                    logger.info(f"Coalesced commit of zone {zone}: {len(applied)} edits, "
+                                f"{'committed' if commit['success'] else 'failed'}")
+
+                if not commit['success'] and len(applied) > 1:
+                    retry = True
                 else:
-                    new_content_lines.append(line)
-            
-            new_content = '\n'.join(new_content_lines)
-            
-            # Write new content to temporary file
-            temp_file = f'/tmp/zone_{zone}_{int(time.time())}'
-            sftp = ssh_client.open_sftp()
-            
-            with sftp.file(temp_file, 'w') as f:
-                f.write(new_content)
-            
-            # Validate zone file syntax
-            stdin, stdout, stderr = ssh_client.exec_command(f'named-checkzone {zone} {temp_file}')
-            validation_status = stdout.channel.recv_exit_status()
-            validation_output = stderr.read().decode()
-            
-            if validation_status != 0:
-                result['message'] = f'Zone validation error: {validation_output}'
-                # Clean temporary file
-                ssh_client.exec_command(f'rm -f {temp_file}')
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Replace original zone file
-            stdin, stdout, stderr = ssh_client.exec_command(f'mv {temp_file} {zone_file_path}')
-            move_status = stdout.channel.recv_exit_status()
-            
-            if move_status != 0:
-                result['message'] = 'Error replacing zone file'
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Reload BIND configuration
-            stdin, stdout, stderr = ssh_client.exec_command('rndc reload')
-            reload_status = stdout.channel.recv_exit_status()
-            reload_output = stderr.read().decode()
-            
-            if reload_status == 0:
-                result['success'] = True
-                result['message'] = 'Record added successfully and DNS server reloaded'
-            else:
-                result['success'] = True  # Record added even if reload failed
-                result['message'] = f'Record added but DNS reload failed: {reload_output}'
-            
-            sftp.close()
-            ssh_client.close()
-            
+                    for index in applied:
+                        result = results[index]
+                        result['steps'] = commit['steps']
+                        if not commit['success']:
+                            result['message'] = commit['message']
+                            continue
+                        action = edits[index][1]
+                        result['success'] = True  # Record changed even if reload failed
+                        result['coalesced_edits'] = len(applied)
+                        if commit['reloaded']:
+                            result['message'] = f'Record {action} successfully and DNS server reloaded'
+                        else:
+                            result['message'] = f'Record {action} but DNS reload failed: {commit["reload_output"]}'
+
         except paramiko.AuthenticationException:
-            result['message'] = 'SSH authentication failed'
+            error = 'SSH authentication failed'
         except paramiko.SSHException as e:
-            result['message'] = f'SSH error: {str(e)}'
+            error = f'SSH error: {str(e)}'
         except Exception as e:
-            logger.error(f"SSH error adding record: {e}")
-            result['message'] = f'Technical SSH error: {str(e)}'
-            
+            logger.error(f"SSH error editing zone {zone}: {e}")
+            error = f'Technical SSH error: {str(e)}'
+
+        if error is not None:
+            for result in results:
+                if not result['success'] and not result['message']:
+                    result['message'] = error
+        elif retry:
+            logger.warning(f"Coalesced commit of zone {zone} failed, committing its {len(applied)} edits one by one")
+            for index in applied:
+                results[index] = self._apply_zone_file_edits(zone, [edits[index]])[0]
+
+        return results
+
+    @staticmethod
+    def _normalize_zone(zone: str) -> str:
+        """Canonical form of a zone name: no surrounding spaces or trailing dot, lowercase"""
+        return zone.strip().rstrip('.').lower()
+
+    def _uses_dynamic_update(self, zone: str) -> bool:
+        """Whether edits of a zone are sent as RFC 2136 dynamic updates instead of file rewrites"""
+        zones = self.config.get('dynamic_update', {}).get('zones') or []
+        zone = self._normalize_zone(zone)
+        return any(entry == '*' or str(entry).strip().rstrip('.').lower() == zone for entry in zones)
+
+    def _update_owner(self, zone: str, name: str) -> dns.name.Name:
+        """Absolute owner name of a record name relative to the zone ('' or '@' for the apex)"""
+        return dns.name.from_text(name.strip() or '@', dns.name.from_text(zone))
+
+    def _dynamic_add(self, zone: str, name: str, record_type: str, value: str, ttl: int):
+        """Dynamic update change adding a record"""
+        def change(update: dns.update.UpdateMessage):
+            update.add(self._update_owner(zone, name), ttl, record_type.upper(), value)
+        return change
+
+    def _dynamic_delete(self, zone: str, name: str, record_type: str, value: str):
+        """Dynamic update change deleting a record; the update fails with NXRRSET when the value is missing
+
+        The prerequisite is value dependent: the RRset read from the server
+        must still hold exactly the same records, the deleted value among
+        them (RFC 2136 compares whole RRsets). A value the server does not
+        have is required alone, which never matches.
+        """
+        def change(update: dns.update.UpdateMessage):
+            owner = self._update_owner(zone, self._normalize_name_for_search(name, zone))
+            rdtype = dns.rdatatype.from_text(record_type.upper())
+            rdata = dns.rdata.from_text(dns.rdataclass.IN, rdtype, value.strip(), update.origin)
+            current = self._dynamic_rrset(owner, rdtype)
+            for expected in (current if current is not None and rdata in current else [rdata]):
+                update.present(owner, expected)
+            update.delete(owner, rdata)
+        return change
+
+    def _dynamic_update(self, zone: str, original: Dict[str, str], updated: Dict[str, Any]):
+        """Dynamic update change replacing a record (updated holds a name relative to the zone)"""
+        remove = self._dynamic_delete(zone, original['name'], original['type'], original['value'])
+        add = self._dynamic_add(zone, updated['name'], updated['type'], updated['value'], updated['ttl'])
+
+        def change(update: dns.update.UpdateMessage):
+            remove(update)
+            add(update)
+        return change
+
+    def _dynamic_update_key(self):
+        """TSIG keyring and key name signing dynamic update traffic, (None, None) when unsigned"""
+        settings = self.config.get('dynamic_update', {})
+        key_name = settings.get('tsig_key_name')
+        if not key_name:
+            return None, None
+        return dns.tsigkeyring.from_text({key_name: settings.get('tsig_secret', '')}), key_name
+
+    def _dynamic_rrset(self, owner: dns.name.Name, rdtype) -> Optional[dns.rrset.RRset]:
+        """Current RRset of a name on the dynamic update server, None when it does not exist"""
+        settings = self.config.get('dynamic_update', {})
+        query = dns.message.make_query(owner, rdtype)
+        keyring, key_name = self._dynamic_update_key()
+        if keyring is not None:
+            query.use_tsig(keyring, key_name, algorithm=settings.get('tsig_algorithm', 'hmac-sha256'))
+        response = dns.query.tcp(query, settings.get('server') or self.dns_server,
+                                 timeout=settings.get('timeout', 5), port=settings.get('port', 53))
+        return response.get_rrset(response.answer, owner, dns.rdataclass.IN, rdtype)
+
+    def _send_dynamic_update(self, zone: str, changes: List[Callable[[dns.update.UpdateMessage], None]],
+                             action: Optional[str] = None) -> Dict[str, Any]:
+        """Send changes to a zone as one RFC 2136 UPDATE message, applied atomically by the server
+
+        The zone file is neither rewritten nor validated with named-checkzone and
+        BIND is not reloaded: the server applies the update and journals it.
+        """
+        settings = self.config.get('dynamic_update', {})
+        server = settings.get('server') or self.dns_server
+        result = {'success': False, 'message': '', 'engine': 'dynamic_update', 'rcode': None}
+
+        try:
+            keyring, key_name = self._dynamic_update_key()
+            update = dns.update.UpdateMessage(
+                zone, keyring=keyring, keyname=key_name or None,
+                keyalgorithm=settings.get('tsig_algorithm', 'hmac-sha256')
+            )
+            for change in changes:
+                change(update)
+
+            self._dns_breaker(server).check()
+            response = dns.query.tcp(update, server, timeout=settings.get('timeout', 5),
+                                     port=settings.get('port', 53))
+        except BackendUnavailable as e:
+            result['message'] = str(e)
+            return result
+        except dns.exception.Timeout:
+            result['message'] = f'Dynamic update of {zone} timed out waiting for {server}'
+            return result
+        except EOFError:
+            result['message'] = f'{server} closed the connection during the dynamic update of {zone}'
+            return result
+        except (dns.exception.DNSException, ValueError, OSError) as e:
+            logger.error(f"Dynamic update error for zone {zone}: {e}")
+            result['message'] = f'Dynamic update error: {str(e)}'
+            return result
+
+        rcode = response.rcode()
+        result['rcode'] = dns.rcode.to_text(rcode)
+        if rcode != dns.rcode.NOERROR:
+            result['message'] = {
+                dns.rcode.NXRRSET: 'Record not found in zone',
+                dns.rcode.REFUSED: f'Dynamic update refused by {server} (check allow-update / update-policy)',
+                dns.rcode.NOTAUTH: f'{server} is not authoritative for {zone} or rejected the TSIG key',
+                dns.rcode.NOTZONE: f'Record name outside of zone {zone}'
+            }.get(rcode, f'Dynamic update failed: {dns.rcode.to_text(rcode)}')
+            logger.warning(f"Dynamic update of zone {zone} failed: {result['rcode']}")
+            return result
+
+        self._invalidate_zone_records(zone)
+        result['success'] = True
+        if action:
+            result['message'] = f'Record {action} successfully by dynamic update'
+        else:
+            result['message'] = f'{len(changes)} changes applied by dynamic update'
+        logger.info(f"Dynamic update of zone {zone} applied ({len(changes)} changes)")
         return result
 
-    def _find_existing_zone_file(self, zone: str) -> str:
+    def _find_existing_zone_file(self, zone: str, ssh_client=None) -> str:
         """Find the existing zone file path by searching in multiple locations"""
         # Possible paths for the zone file - prioritize specific directories
         possible_paths = [
@@ -1251,37 +4610,357 @@ class DNSManager:
                 ])
         
         try:
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            if ssh_client is not None:
+                path = self._locate_zone_file(ssh_client, zone, possible_paths)
+            else:
+                with self.ssh_pool.connection(self.ssh_config) as pooled_client:
+                    path = self._locate_zone_file(pooled_client, zone, possible_paths)
+            if path:
+                return path
             
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
+        except Exception as e:
+            logger.error(f"SSH error finding zone file for {zone}: {e}")
+        
+        # If not found, return the default path based on zone type
+        return self._get_zone_file_path(zone)
+
+    def _locate_zone_file(self, ssh_client, zone: str, possible_paths: List[str]) -> Optional[str]:
+        """Resolve a zone file from the named.conf map, probing candidate paths as a last resort"""
+        path = self._lookup_zone_file_path(zone, ssh_client)
+        if path:
+            logger.debug(f"Zone file for {zone} resolved from BIND configuration: {path}")
+            return path
+        
+        return self._probe_zone_file_paths(ssh_client, zone, possible_paths)
+
+    def _probe_zone_file_paths(self, ssh_client, zone: str, possible_paths: List[str]) -> Optional[str]:
+        """Return the first candidate path that exists on the server, in a single command"""
+        candidates = ' '.join(shlex.quote(path) for path in possible_paths)
+        stdin, stdout, stderr = ssh_client.exec_command(
+            f'for p in {candidates}; do if [ -f "$p" ]; then echo "$p"; break; fi; done'
+        )
+        path = stdout.read().decode().strip()
+        
+        if path:
+            logger.debug(f"Found zone file for {zone} at: {path}")
+            return path
+        
+        return None
+
+    def _read_zone_file(self, ssh_client, zone_file_path: str) -> Optional[str]:
+        """Read a zone file over SSH, returning None when it does not exist"""
+        quoted_path = shlex.quote(zone_file_path)
+        stdin, stdout, stderr = ssh_client.exec_command(f'test -f {quoted_path} && cat {quoted_path}')
+        content = stdout.read().decode()
+        if stdout.channel.recv_exit_status() != 0:
+            return None
+        return content
+
+    def _commit_zone_file(self, ssh_client, zone: str, zone_file_path: str,
+                          current_content: str, new_content: str) -> Dict[str, Any]:
+        """Backup, validate, atomically replace a zone file and reload BIND"""
+        commit = self._commit_zone_files(ssh_client, [{
+            'zone': zone, 'path': zone_file_path, 'current': current_content, 'new': new_content
+        }])
+        return commit['zones'][zone]
+
+    def _commit_zone_files(self, ssh_client, changes: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Backup and validate every changed zone file, then replace and reload them all
+
+        changes are dicts with the zone, its file path and its current and new
+        content. No file is replaced unless every file validates, and a failed
+        replace restores the files already replaced from their backups.
+        """
+        if self.config.get('ssh', {}).get('transaction_mode', True):
+            steps = self._run_zone_transaction(ssh_client, changes)
+        else:
+            steps = self._run_zone_steps(ssh_client, changes)
+
+        zones = {}
+        for change in changes:
+            zone = change['zone']
+            for step in steps[zone]:
+                logger.debug(f"Zone commit {zone} - {step['step']}: {step['status']} ({step['duration_ms']} ms)")
+            zones[zone] = self._zone_commit_result(steps[zone])
+
+        failed = next((zone for zone, commit in zones.items() if not commit['success']), None)
+        if failed is not None:
+            # All or nothing: files replaced before the failure were restored
+            for zone, commit in zones.items():
+                if zone != failed:
+                    commit['success'] = False
+                    commit['reloaded'] = False
+                    commit['message'] = f"Not applied, zone {failed} failed: {zones[failed]['message']}"
+        else:
+            for zone in zones:
+                self._invalidate_zone_records(zone)
+
+        not_reloaded = [zone for zone, commit in zones.items() if not commit['reloaded']]
+        if len(zones) == 1:
+            reload_output = zones[changes[0]['zone']]['reload_output']
+        else:
+            reload_output = '; '.join(f"{zone}: {zones[zone]['reload_output']}" for zone in not_reloaded)
+        return {
+            'success': failed is None,
+            'message': zones[failed]['message'] if failed is not None else '',
+            'reloaded': failed is None and not not_reloaded,
+            'reload_output': reload_output,
+            'zones': zones
+        }
+
+    def _reload_commands(self, zones: List[str]) -> List[Tuple[str, str]]:
+        """(zone, rndc command) pairs reloading the changed zones
+
+        With ssh.reload_scope 'server' a single bare 'rndc reload' is reported
+        under an empty zone and shared by all zones.
+        """
+        if self.config.get('ssh', {}).get('reload_scope', 'zone') == 'server':
+            return [('', 'rndc reload')]
+        return [(zone, f'rndc reload {shlex.quote(zone)}') for zone in zones]
+
+    def _invalidate_zone_records(self, zone: str):
+        """Forget records discovered by query sweeps after the zone has been modified"""
+        # Answers cached before the write are stale; answers during the bypass
+        # window may still come from servers that have not reloaded yet.
+        # Writes are keyed by the normalized zone, as the reads look them up
+        zone_key = self._normalize_zone(zone)
+        self._zone_writes[zone_key] = time.monotonic()
+        self.resolver_cache.invalidate_zone(zone_key)
+        # Caches are keyed by (SSH server, zone): drop the zone for every server
+        with self._discovered_stores_lock:
+            for key in [key for key in self._discovered_stores if key[1] == zone_key]:
+                del self._discovered_stores[key]
+        with self._zone_files_lock:
+            for key in [key for key in self._zone_files if key[1] == zone_key]:
+                del self._zone_files[key]
+        self.negative_cache.invalidate(zone)
+
+    def _run_zone_transaction(self, ssh_client, changes: List[Dict[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Ship the whole backup -> validate -> replace -> reload sequence as one remote script"""
+        script = self._build_zone_transaction_script(changes)
+
+        stdin, stdout, stderr = ssh_client.exec_command('sh -s')
+        stdin.write(script)
+        stdin.flush()
+        stdin.channel.shutdown_write()
+        output = stdout.read().decode(errors='replace')
+        stdout.channel.recv_exit_status()
+
+        reported = {}
+        for line in output.splitlines():
+            parts = line.split('\t')
+            if len(parts) != 6 or parts[0] != 'STEP':
+                continue
+            _, zone, step_name, exit_code, duration, encoded_output = parts
+            try:
+                step_output = base64.b64decode(encoded_output).decode(errors='replace').strip()
+            except Exception:
+                step_output = ''
+            reported[(zone, step_name)] = {
+                'step': step_name,
+                'status': 'ok' if exit_code == '0' else 'failed',
+                'exit_code': int(exit_code) if exit_code.lstrip('-').isdigit() else None,
+                'duration_ms': int(duration) if duration.isdigit() else None,
+                'output': step_output
+            }
+
+        steps = {}
+        for change in changes:
+            zone = change['zone']
+            # A server-wide reload is reported once, with an empty zone, and shared by all zones
+            steps[zone] = [
+                reported.get((zone, name)) or reported.get(('', name)) or
+                {'step': name, 'status': 'skipped', 'exit_code': None, 'duration_ms': None, 'output': ''}
+                for name in ZONE_COMMIT_STEPS
+            ]
+            if (zone, 'restore') in reported:
+                steps[zone].append(reported[(zone, 'restore')])
+        return steps
+
+    def _build_zone_transaction_script(self, changes: List[Dict[str, str]]) -> str:
+        """Build the POSIX shell script executed by a zone edit transaction"""
+        # Each step prints: STEP <zone> <name> <exit code> <elapsed ms> <base64 output>
+        # and the script stops at the first failing step, except for the reload
+        lines = [
+            "STAMP=$(date +%Y%m%d_%H%M%S)",
+            "TEMP_FILES=''",
+            "now_ms() { ms=$(date +%s%N 2>/dev/null); case \"$ms\" in *N|'') echo 0 ;; *) echo $((ms / 1000000)) ;; esac; }",
+            "run_step() {",
+            "    zone=$1; name=$2; shift 2",
+            "    start=$(now_ms)",
+            "    out=$(\"$@\" 2>&1); rc=$?",
+            "    end=$(now_ms)",
+            "    printf 'STEP\\t%s\\t%s\\t%s\\t%s\\t%s\\n' \"$zone\" \"$name\" \"$rc\" \"$((end - start))\" "
+            "\"$(printf '%s' \"$out\" | base64 | tr -d '\\n')\"",
+            "    return $rc",
+            "}",
+            "fail() { rm -f $TEMP_FILES; exit 1; }",
+            "verify() { test -f \"$1\" && test \"$(sha256sum \"$1\" | cut -d' ' -f1)\" = \"$2\"; }",
+            "backup() { mkdir -p /etc/bind/backup && cp \"$1\" \"$2\"; }",
+            "write_temp() { printf '%s' \"$1\" | base64 -d > \"$2\"; }",
+            "replace_file() { " + self._replace_command('"$1"', '"$2"') + "; }",
+        ]
+
+        # Stage and validate every file before replacing any of them
+        for index, change in enumerate(changes):
+            zone = change['zone']
+            expected_checksum = hashlib.sha256(change['current'].encode()).hexdigest()
+            encoded_content = base64.b64encode(change['new'].encode()).decode()
+            lines += [
+                f"ZONE_{index}={shlex.quote(zone)}",
+                f"ZONE_FILE_{index}={shlex.quote(change['path'])}",
+                f"BACKUP_{index}=/etc/bind/backup/db.{shlex.quote(zone)}.backup.$STAMP",
+                # Staged next to the zone file so that the final mv is an atomic rename
+                f"TEMP_{index}=$(mktemp \"$ZONE_FILE_{index}.tmp.XXXXXX\") || fail",
+                f"TEMP_FILES=\"$TEMP_FILES $TEMP_{index}\"",
+                f"run_step \"$ZONE_{index}\" verify verify \"$ZONE_FILE_{index}\" {expected_checksum} || fail",
+                f"run_step \"$ZONE_{index}\" backup backup \"$ZONE_FILE_{index}\" \"$BACKUP_{index}\" || fail",
+                f"run_step \"$ZONE_{index}\" write write_temp {encoded_content} \"$TEMP_{index}\" || fail",
+                f"run_step \"$ZONE_{index}\" validate named-checkzone \"$ZONE_{index}\" \"$TEMP_{index}\" || fail",
+            ]
+
+        for index in range(len(changes)):
+            restores = ''.join(
+                f"run_step \"$ZONE_{done}\" restore cp \"$BACKUP_{done}\" \"$ZONE_FILE_{done}\"; "
+                for done in range(index)
             )
-            
-            for path in possible_paths:
+            lines.append(f"run_step \"$ZONE_{index}\" replace replace_file \"$TEMP_{index}\" \"$ZONE_FILE_{index}\" "
+                         f"|| {{ {restores}fail; }}")
+
+        index_of = {change['zone']: index for index, change in enumerate(changes)}
+        for zone, command in self._reload_commands([change['zone'] for change in changes]):
+            lines.append(f"run_step \"$ZONE_{index_of[zone]}\" reload {command}" if zone
+                         else f"run_step '' reload {command}")
+        lines += ["exit 0", ""]
+        return '\n'.join(lines)
+
+    def _replace_command(self, temp_file: str, zone_file: str) -> str:
+        """Shell command giving a staged file the mode and owner of the zone file, then renaming it over it
+
+        Both arguments must already be quoted. mktemp and SFTP create files
+        owned by the SSH user with their own mode, which named may not be
+        able to read; chown needs root, so the group is copied otherwise.
+        """
+        return (f"chmod --reference={zone_file} {temp_file} && "
+                f"{{ chown --reference={zone_file} {temp_file} 2>/dev/null || "
+                f"chgrp --reference={zone_file} {temp_file} 2>/dev/null || true; }} && "
+                f"mv {temp_file} {zone_file}")
+
+    def _run_zone_steps(self, ssh_client, changes: List[Dict[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Run the zone commit sequence as individual SSH commands, one round trip each"""
+        steps = {change['zone']: [] for change in changes}
+
+        def run_step(zone: str, name: str, command: str) -> bool:
+            start = time.perf_counter()
+            stdin, stdout, stderr = ssh_client.exec_command(command)
+            exit_code = stdout.channel.recv_exit_status()
+            step_output = (stdout.read() + stderr.read()).decode(errors='replace').strip()
+            steps[zone].append({
+                'step': name,
+                'status': 'ok' if exit_code == 0 else 'failed',
+                'exit_code': exit_code,
+                'duration_ms': int((time.perf_counter() - start) * 1000),
+                'output': step_output
+            })
+            return exit_code == 0
+
+        stamp = time.strftime('%Y%m%d_%H%M%S')
+        staged = []
+        ok = True
+        # Stage and validate every file before replacing any of them
+        for change in changes:
+            zone = change['zone']
+            quoted_path = shlex.quote(change['path'])
+            temp_file = f"{change['path']}.tmp.{secrets.token_hex(4)}"
+            quoted_backup = shlex.quote(f'/etc/bind/backup/db.{zone}.backup.{stamp}')
+
+            # The file must still hold the content the edit was made against
+            expected_checksum = hashlib.sha256(change['current'].encode()).hexdigest()
+            ok = run_step(zone, 'verify', f'test -f {quoted_path} && '
+                                          f'test "$(sha256sum {quoted_path} | cut -d\' \' -f1)" = {expected_checksum}')
+            ok = ok and run_step(zone, 'backup', f'mkdir -p /etc/bind/backup && cp {quoted_path} {quoted_backup}')
+            if ok:
+                start = time.perf_counter()
                 try:
-                    stdin, stdout, stderr = ssh_client.exec_command(f'test -f {path} && echo "exists" || echo "not_found"')
-                    file_check = stdout.read().decode().strip()
-                    
-                    if file_check == "exists":
-                        logger.debug(f"Found zone file for {zone} at: {path}")
-                        ssh_client.close()
-                        return path
+                    sftp = ssh_client.open_sftp()
+                    with sftp.file(temp_file, 'w') as f:
+                        f.write(change['new'])
+                    steps[zone].append({'step': 'write', 'status': 'ok', 'exit_code': 0,
+                                        'duration_ms': int((time.perf_counter() - start) * 1000), 'output': ''})
+                    staged.append((zone, quoted_path, shlex.quote(temp_file), quoted_backup))
+                except (paramiko.SSHException, socket.error):
+                    raise
                 except Exception as e:
-                    logger.debug(f"Error checking {path}: {e}")
-                    continue
-            
-            ssh_client.close()
-            
-        except Exception as e:
-            logger.error(f"SSH error finding zone file for {zone}: {e}")
-        
-        # If not found, return the default path based on zone type
-        return self._get_zone_file_path(zone)
+                    steps[zone].append({'step': 'write', 'status': 'failed', 'exit_code': None,
+                                        'duration_ms': int((time.perf_counter() - start) * 1000), 'output': str(e)})
+                    ok = False
+            ok = ok and run_step(zone, 'validate', f'named-checkzone {shlex.quote(zone)} {staged[-1][2]}')
+            if not ok:
+                break
+
+        if ok:
+            replaced = []
+            for zone, quoted_path, quoted_temp, quoted_backup in staged:
+                if not run_step(zone, 'replace', self._replace_command(quoted_temp, quoted_path)):
+                    ok = False
+                    for done_zone, done_path, _, done_backup in replaced:
+                        run_step(done_zone, 'restore', f'cp {done_backup} {done_path}')
+                    break
+                replaced.append((zone, quoted_path, quoted_temp, quoted_backup))
+        if not ok:
+            for zone, quoted_path, quoted_temp, quoted_backup in staged:
+                ssh_client.exec_command(f'rm -f {quoted_temp}')
+
+        reload_steps = []
+        if ok:
+            for zone, command in self._reload_commands([change['zone'] for change in changes]):
+                if zone:
+                    run_step(zone, 'reload', command)
+                else:
+                    # Server-wide reload shared by all zones
+                    first_zone = changes[0]['zone']
+                    run_step(first_zone, 'reload', command)
+                    reload_steps.append(steps[first_zone].pop())
+
+        for zone, zone_steps in steps.items():
+            zone_steps.extend(reload_steps)
+            done = {step['step'] for step in zone_steps}
+            zone_steps.extend({'step': name, 'status': 'skipped', 'exit_code': None, 'duration_ms': None, 'output': ''}
+                              for name in ZONE_COMMIT_STEPS if name not in done)
+            # Keep the order of ZONE_COMMIT_STEPS, with a restore after it
+            zone_steps.sort(key=lambda step: ZONE_COMMIT_STEPS.index(step['step'])
+                            if step['step'] in ZONE_COMMIT_STEPS else len(ZONE_COMMIT_STEPS))
+        return steps
+
+    def _zone_commit_result(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turn per-step statuses into the structured result of a zone commit"""
+        result = {
+            'success': False,
+            'message': '',
+            'reloaded': False,
+            'reload_output': '',
+            'steps': steps
+        }
+
+        failed = next((step for step in steps if step['status'] == 'failed' and step['step'] != 'reload'), None)
+        if failed is None and all(step['status'] == 'skipped' for step in steps):
+            result['message'] = 'Zone update transaction did not run'
+            return result
+        if failed is not None:
+            result['message'] = {
+                'verify': 'Zone file changed on the server since it was read, please retry',
+                'backup': 'Error creating backup in /etc/bind/backup',
+                'write': 'Error writing temporary zone file',
+                'validate': f'Zone validation error: {failed["output"]}',
+                'replace': 'Error replacing zone file'
+            }.get(failed['step'], f'Error during {failed["step"]}')
+            return result
+
+        reload_step = next(step for step in steps if step['step'] == 'reload')
+        result['success'] = True
+        result['reloaded'] = reload_step['status'] == 'ok'
+        result['reload_output'] = reload_step['output']
+        return result
 
     def _get_zone_file_path(self, zone: str) -> str:
         """Determine the correct file path for a zone based on its type"""
@@ -1308,186 +4987,16 @@ class DNSManager:
 
     def delete_dns_record(self, zone: str, name: str, record_type: str, value: str) -> Dict[str, Any]:
         """Delete a DNS record from the specified zone"""
-        result = {
-            'success': False,
-            'message': '',
-            'record': None
-        }
-
-        if not PARAMIKO_AVAILABLE:
-            result['message'] = 'Error: The paramiko module is not installed. Run: pip install paramiko'
-            return result
-        
-        if not self.ssh_config.get('configured'):
-            result['message'] = 'SSH configuration required to modify zone files'
+        if self._uses_dynamic_update(zone):
+            result = self._send_dynamic_update(zone, [self._dynamic_delete(zone, name, record_type, value)],
+                                               'deleted')
+            result['record'] = None
             return result
-        
-        try:
-            # Create SSH client
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # SSH connection
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
-            )
-            
-            # Find the zone file path
-            zone_file_path = self._find_existing_zone_file(zone)
-            logger.debug(f"Using zone file path for deletion: {zone_file_path}")
-            
-            # Check if zone file exists
-            stdin, stdout, stderr = ssh_client.exec_command(f'test -f {zone_file_path} && echo "exists" || echo "not_found"')
-            file_check = stdout.read().decode().strip()
-            
-            if file_check == "not_found":
-                result['message'] = f'Zone file {zone_file_path} not found'
-                ssh_client.close()
-                return result
-            
-            # Create backup directory if it doesn't exist
-            stdin, stdout, stderr = ssh_client.exec_command('mkdir -p /etc/bind/backup')
-            
-            # Create file backup in the backup directory
-            backup_cmd = f'cp {zone_file_path} /etc/bind/backup/db.{zone}.backup.$(date +%Y%m%d_%H%M%S)'
-            stdin, stdout, stderr = ssh_client.exec_command(backup_cmd)
-            backup_status = stdout.channel.recv_exit_status()
-            
-            if backup_status != 0:
-                result['message'] = 'Error creating backup in /etc/bind/backup'
-                ssh_client.close()
-                return result
-            
-            # Read current file content
-            stdin, stdout, stderr = ssh_client.exec_command(f'cat {zone_file_path}')
-            current_content = stdout.read().decode()
-            
-            # Normalize values for search
-            search_name = self._normalize_name_for_search(name, zone)
-            search_value = value.strip()
-            search_type = record_type.upper()
-            
-            logger.info(f"Searching for record: name='{search_name}', type='{search_type}', value='{search_value}'")
-            
-            # Delete corresponding record
-            lines = current_content.split('\n')
-            new_lines = []
-            record_found = False
-            records_checked = 0
-            
-            for line_num, line in enumerate(lines, 1):
-                original_line = line
-                line_stripped = line.strip()
-                
-                # Ignore empty and comment lines
-                if not line_stripped or line_stripped.startswith(';') or line_stripped.startswith('$'):
-                    new_lines.append(line)
-                    continue
-                
-                # Check if it's a DNS record line
-                if self._is_dns_record_line(line, search_type):
-                    records_checked += 1
-                    
-                    # Extract line components
-                    record_parts = self._parse_dns_record_line(line)
-                    if record_parts:
-                        line_name = self._normalize_name_for_search(record_parts['name'], zone)
-                        line_type = record_parts['type'].upper()
-                        line_value = record_parts['value'].strip()
-                        
-                        logger.debug(f"Line {line_num}: name='{line_name}', type='{line_type}', value='{line_value}'")
-                        
-                        # Check match
-                        if (line_type == search_type and 
-                            self._values_match(line_value, search_value, search_type) and
-                            self._names_match(line_name, search_name, zone)):
-                            
-                            record_found = True
-                            logger.info(f"Record found and deleted at line {line_num}: {original_line}")
-                            continue  # Do not add this line (= deletion)
-                
-                new_lines.append(line)
-            
-            logger.info(f"Search completed: {records_checked} records checked, found: {record_found}")
-            
-            if not record_found:
-                result['message'] = f'Record not found in zone file. Checked: {records_checked} records.'
-                ssh_client.close()
-                return result
-            
-            # Increment serial number in SOA
-            new_content_lines = []
-            for line in new_lines:
-                if 'SOA' in line.upper() and ';' not in line.split('SOA')[0]:
-                    new_content_lines.append(line)
-                elif line.strip().isdigit() and len(line.strip()) == 10:
-                    try:
-                        serial = int(line.strip())
-                        new_serial = serial + 1
-                        new_content_lines.append(line.replace(str(serial), str(new_serial)))
-                    except:
-                        new_content_lines.append(line)
-                else:
-                    new_content_lines.append(line)
-            
-            new_content = '\n'.join(new_content_lines)
-            
-            # Write new content to temporary file
-            temp_file = f'/tmp/zone_{zone}_{int(time.time())}'
-            sftp = ssh_client.open_sftp()
-            
-            with sftp.file(temp_file, 'w') as f:
-                f.write(new_content)
-            
-            # Validate zone file syntax
-            stdin, stdout, stderr = ssh_client.exec_command(f'named-checkzone {zone} {temp_file}')
-            validation_status = stdout.channel.recv_exit_status()
-            validation_output = stderr.read().decode()
-            
-            if validation_status != 0:
-                result['message'] = f'Zone validation error: {validation_output}'
-                ssh_client.exec_command(f'rm -f {temp_file}')
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Replace original zone file
-            stdin, stdout, stderr = ssh_client.exec_command(f'mv {temp_file} {zone_file_path}')
-            move_status = stdout.channel.recv_exit_status()
-            
-            if move_status != 0:
-                result['message'] = 'Error replacing zone file'
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Reload BIND configuration
-            stdin, stdout, stderr = ssh_client.exec_command('rndc reload')
-            reload_status = stdout.channel.recv_exit_status()
-            reload_output = stderr.read().decode()
-            
-            if reload_status == 0:
-                result['success'] = True
-                result['message'] = 'Record deleted successfully and DNS server reloaded'
-            else:
-                result['success'] = True
-                result['message'] = f'Record deleted but DNS reload failed: {reload_output}'
-            
-            sftp.close()
-            ssh_client.close()
-            
-        except paramiko.AuthenticationException:
-            result['message'] = 'SSH authentication failed'
-        except paramiko.SSHException as e:
-            result['message'] = f'SSH error: {str(e)}'
-        except Exception as e:
-            logger.error(f"SSH error deleting record: {e}")
-            result['message'] = f'Technical SSH error: {str(e)}'
-            
+
+        result = self._edit_zone_file(
+            zone, lambda zone_file: self._zone_file_delete(zone_file, zone, name, record_type, value), 'deleted'
+        )
+        result['record'] = None
         return result
 
     def _normalize_name_for_search(self, name: str, zone: str) -> str:
@@ -1509,47 +5018,12 @@ class DNSManager:
         
         return name if name else '@'
 
-    def _is_dns_record_line(self, line: str, record_type: str) -> bool:
-        """Check if a line contains a DNS record of the specified type"""
-        line_upper = line.upper()
-        return (
-            'IN' in line_upper and 
-            record_type.upper() in line_upper and
-            not line.strip().startswith(';') and
-            not line.strip().startswith('$')
-        )
-
-    def _parse_dns_record_line(self, line: str) -> Dict[str, str]:
-        """Parse a DNS record line and return its components"""
-        parts = line.split()
-        if len(parts) < 4:
-            return None
-        
-        try:
-            # Typical format: name TTL IN type value
-            # or: name IN type value
-            name = parts[0]
-            
-            # Find "IN" index
-            in_index = -1
-            for i, part in enumerate(parts):
-                if part.upper() == 'IN':
-                    in_index = i
-                    break
-            
-            if in_index == -1:
-                return None
-            
-            record_type = parts[in_index + 1] if in_index + 1 < len(parts) else ''
-            value = ' '.join(parts[in_index + 2:]) if in_index + 2 < len(parts) else ''
-            
-            return {
-                'name': name,
-                'type': record_type,
-                'value': value
-            }
-        except:
-            return None
+    def _match_zone_entry(self, candidates: List[ZoneEntry], value: str, record_type: str) -> Optional[ZoneEntry]:
+        """First zone file record among candidates whose value matches"""
+        for entry in candidates:
+            if self._values_match(entry.rdata, value, record_type):
+                return entry
+        return None
 
     def _values_match(self, value1: str, value2: str, record_type: str) -> bool:
         """Compare two DNS record values based on type"""
@@ -1566,12 +5040,6 @@ class DNSManager:
         
         return v1 == v2
 
-    def _names_match(self, name1: str, name2: str, zone: str) -> bool:
-        """Compare two DNS record names"""
-        n1 = self._normalize_name_for_search(name1, zone)
-        n2 = self._normalize_name_for_search(name2, zone)
-        return n1 == n2
-
     def update_dns_record(self, zone: str, original: Dict[str, str], updated: Dict[str, Any]) -> Dict[str, Any]:
         """Modify a DNS record in the specified zone"""
         result = {
@@ -1580,14 +5048,6 @@ class DNSManager:
             'record': None
         }
 
-        if not PARAMIKO_AVAILABLE:
-            result['message'] = 'Error: The paramiko module is not installed. Run: pip install paramiko'
-            return result
-        
-        if not self.ssh_config.get('configured'):
-            result['message'] = 'SSH configuration required to modify zone files'
-            return result
-
         # Validate new record parameters
         validation_result = self._validate_record_parameters(
             zone, updated['name'], updated['type'], updated['value'], updated['ttl']
@@ -1595,204 +5055,275 @@ class DNSManager:
         if not validation_result['valid']:
             result['message'] = validation_result['message']
             return result
-        
-        try:
-            # Create SSH client
-            ssh_client = paramiko.SSHClient()
-            ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # SSH connection
-            ssh_client.connect(
-                hostname=self.ssh_config['hostname'],
-                port=self.ssh_config['port'],
-                username=self.ssh_config['username'],
-                password=self.ssh_config['password'],
-                timeout=10
-            )
-            
-            # Find the zone file path
-            zone_file_path = self._find_existing_zone_file(zone)
-            logger.debug(f"Using zone file path for update: {zone_file_path}")
-            
-            # Check if zone file exists
-            stdin, stdout, stderr = ssh_client.exec_command(f'test -f {zone_file_path} && echo "exists" || echo "not_found"')
-            file_check = stdout.read().decode().strip()
-            
-            if file_check == "not_found":
-                result['message'] = f'Zone file {zone_file_path} not found'
-                ssh_client.close()
-                return result
-            
-            # Create backup directory if it doesn't exist
-            stdin, stdout, stderr = ssh_client.exec_command('mkdir -p /etc/bind/backup')
-            
-            # Create file backup in the backup directory
-            backup_cmd = f'cp {zone_file_path} /etc/bind/backup/db.{zone}.backup.$(date +%Y%m%d_%H%M%S)'
-            stdin, stdout, stderr = ssh_client.exec_command(backup_cmd)
-            backup_status = stdout.channel.recv_exit_status()
-            
-            if backup_status != 0:
-                result['message'] = 'Error creating backup in /etc/bind/backup'
-                ssh_client.close()
+
+        # Normalize updated record name
+        updated_copy = updated.copy()
+        updated_copy['name'] = self._ensure_relative_name(updated['name'], zone)
+
+        if self._uses_dynamic_update(zone):
+            result.update(self._send_dynamic_update(
+                zone, [self._dynamic_update(zone, original, updated_copy)], 'modified'
+            ))
+        else:
+            result.update(self._edit_zone_file(
+                zone, lambda zone_file: self._zone_file_update(zone_file, zone, original, updated_copy), 'modified'
+            ))
+        if not result['success']:
+            return result
+
+        result['record'] = self._record_summary(zone, updated_copy)
+        return result
+
+    def _record_summary(self, zone: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Name (relative for display), type, value and TTL of a record written to a zone"""
+        # Construct full name for response
+        if record['name'] and not record['name'].endswith('.') and record['name'] != '@':
+            full_name = f"{record['name']}.{zone}"
+        elif record['name'] == '@':
+            full_name = zone
+        else:
+            full_name = record['name']
+
+        return {
+            'name': self._convert_to_relative_name(full_name, zone),
+            'type': record['type'],
+            'value': record['value'],
+            'ttl': record['ttl']
+        }
+
+    def apply_record_batch(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply add / delete / update operations, possibly across zones, as one all-or-nothing commit
+
+        Operations are applied in order to the parsed zone files in memory, then
+        every changed zone is backed up and validated once and reloaded. Nothing
+        is written unless every operation and every zone succeeds. A batch on
+        a zone edited by dynamic update is sent as one UPDATE message, atomic
+        on the server; it cannot include other zones.
+        """
+        result = {
+            'success': False,
+            'message': '',
+            'operations': [
+                {'index': index, 'op': operation.get('op') if isinstance(operation, dict) else None,
+                 'zone': operation.get('zone') if isinstance(operation, dict) else None,
+                 'success': False, 'message': 'Not applied', 'record': None}
+                for index, operation in enumerate(operations)
+            ],
+            'zones': {}
+        }
+        report = result['operations']
+
+        if not operations:
+            result['message'] = 'No operations to apply'
+            return result
+        max_operations = self.config.get('ssh', {}).get('batch_max_operations', 1000)
+        if max_operations and len(operations) > max_operations:
+            result['message'] = f'Too many operations in one batch (maximum {max_operations})'
+            return result
+
+        # Validate every operation before touching any zone
+        file_edits = []
+        dynamic_edits = OrderedDict()
+        for index, operation in enumerate(operations):
+            edit = self._prepare_batch_operation(operation)
+            if isinstance(edit, str):
+                report[index]['message'] = edit
+                result['message'] = f'Operation {index} is invalid: {edit}'
                 return result
-            
-            # Read current file content
-            stdin, stdout, stderr = ssh_client.exec_command(f'cat {zone_file_path}')
-            current_content = stdout.read().decode()
-            
-            # Normalize values for search
-            search_name = self._normalize_name_for_search(original['name'], zone)
-            search_value = original['value'].strip()
-            search_type = original['type'].upper()
-            
-            logger.info(f"Searching for record to modify: name='{search_name}', type='{search_type}', value='{search_value}'")
-            
-            # Replace corresponding record
-            lines = current_content.split('\n')
-            new_lines = []
-            record_found = False
-            records_checked = 0
-            
-            # Normalize updated record name
-            clean_updated_name = self._ensure_relative_name(updated['name'], zone)
-            updated_copy = updated.copy()
-            updated_copy['name'] = clean_updated_name
-            
-            # Create new record line
-            new_record_line = self._format_record_line(
-                updated_copy['name'], updated_copy['type'], updated_copy['value'], updated_copy['ttl']
+            if self._uses_dynamic_update(edit[0]):
+                dynamic_edits.setdefault(edit[0], []).append((index, edit))
+            else:
+                file_edits.append((index, edit))
+
+        # A zone file transaction and an UPDATE message, or UPDATEs to two zones,
+        # cannot be rolled back together: such batches would not be all or nothing
+        if len(dynamic_edits) + bool(file_edits) > 1:
+            result['message'] = (
+                f"Batch mixes zones edited by dynamic update ({', '.join(dynamic_edits)}) with "
+                f"{'zone file edits' if file_edits else 'each other'}, which cannot be applied all or "
+                f"nothing together: send one batch for the zone files and one per dynamic-update zone"
             )
-            
-            for line_num, line in enumerate(lines, 1):
-                original_line = line
-                line_stripped = line.strip()
-                
-                # Ignore empty and comment lines
-                if not line_stripped or line_stripped.startswith(';') or line_stripped.startswith('$'):
-                    new_lines.append(line)
-                    continue
-                
-                # Check if it's a DNS record line
-                if self._is_dns_record_line(line, search_type):
-                    records_checked += 1
-                    
-                    # Extract line components
-                    record_parts = self._parse_dns_record_line(line)
-                    if record_parts:
-                        line_name = self._normalize_name_for_search(record_parts['name'], zone)
-                        line_type = record_parts['type'].upper()
-                        line_value = record_parts['value'].strip()
-                        
-                        logger.debug(f"Line {line_num}: name='{line_name}', type='{line_type}', value='{line_value}'")
-                        
-                        # Check match
-                        if (line_type == search_type and 
-                            self._values_match(line_value, search_value, search_type) and
-                            self._names_match(line_name, search_name, zone)):
-                            
-                            new_lines.append(new_record_line)
-                            record_found = True
-                            logger.info(f"Record found and modified at line {line_num}: {original_line} -> {new_record_line}")
+            return result
+
+        if file_edits:
+            commit = self._apply_batch_to_zone_files(file_edits, report)
+            result['zones'].update(commit['zones'])
+            result['success'] = commit['success']
+            result['message'] = commit['message']
+            return result
+
+        zone, zone_edits = next(iter(dynamic_edits.items()))
+        update = self._send_dynamic_update(zone, [edit[4] for _, edit in zone_edits])
+        result['zones'][zone] = update
+        if not update['success']:
+            for index, _ in zone_edits:
+                report[index]['message'] = update['message']
+            result['message'] = f"Dynamic update of zone {zone} failed, nothing applied: {update['message']}"
+            return result
+        for index, (_, action, _, record, _) in zone_edits:
+            report[index].update({'success': True, 'message': f'Record {action}', 'record': record})
+
+        result['success'] = True
+        result['message'] = f'{len(zone_edits)} operations applied to zone {zone} by dynamic update'
+        return result
+
+    def _apply_batch_to_zone_files(self, edits: List[Tuple[int, tuple]], report: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply prepared batch operations to the zone files over SSH as one all-or-nothing commit"""
+        result = {'success': False, 'message': '', 'zones': {}}
+
+        if not PARAMIKO_AVAILABLE:
+            result['message'] = 'Error: The paramiko module is not installed. Run: pip install paramiko'
+            return result
+
+        if not self.ssh_config.get('configured'):
+            result['message'] = 'SSH configuration required to modify zone files'
+            return result
+
+        # Coalesced single-record edits of these zones received earlier land
+        # first; a commit stuck on SSH or rndc must not hold the batch forever
+        zones = sorted({edit[0] for _, edit in edits})
+        wait_timeout = self.config.get('ssh', {}).get('commit_wait_timeout', 60)
+        if not self.commit_scheduler.wait_idle(zones, wait_timeout or None):
+            result['message'] = (f"Earlier changes of {', '.join(zones)} were still being committed after "
+                                 f"{wait_timeout}s, nothing applied")
+            return result
+
+        try:
+            # Borrow a pooled SSH connection
+            with self.ssh_pool.connection(self.ssh_config) as ssh_client:
+                zone_files = {}
+                applied = []
+                for index, (zone, action, apply, record, _) in edits:
+                    if zone not in zone_files:
+                        # Each zone file is read and parsed once for the whole batch
+                        zone_file_path = self._find_existing_zone_file(zone, ssh_client)
+                        current_content = self._read_zone_file(ssh_client, zone_file_path)
+                        if current_content is None:
+                            error = f'Zone file {zone_file_path} not found'
                         else:
-                            new_lines.append(line)
-                    else:
-                        new_lines.append(line)
-                else:
-                    new_lines.append(line)
-            
-            logger.info(f"Search completed: {records_checked} records checked, found: {record_found}")
-            
-            if not record_found:
-                result['message'] = f'Original record not found in zone file. Checked: {records_checked} records.'
-                ssh_client.close()
-                return result
-            
-            # Increment serial number in SOA
-            new_content_lines = []
-            for line in new_lines:
-                if 'SOA' in line.upper() and ';' not in line.split('SOA')[0]:
-                    new_content_lines.append(line)
-                elif line.strip().isdigit() and len(line.strip()) == 10:
-                    try:
-                        serial = int(line.strip())
-                        new_serial = serial + 1
-                        new_content_lines.append(line.replace(str(serial), str(new_serial)))
-                    except:
-                        new_content_lines.append(line)
+                            zone_files[zone] = (zone_file_path, current_content, ZoneFile(current_content, zone))
+                            error = None
+                    if zone in zone_files:
+                        error = apply(zone_files[zone][2])
+                    if error:
+                        report[index]['message'] = error
+                        result['message'] = f'Operation {index} failed, nothing applied: {error}'
+                        return result
+                    applied.append((index, action, record))
+
+                changes = []
+                for zone, (zone_file_path, current_content, zone_file) in zone_files.items():
+                    if zone_file.bump_serial() is None:
+                        logger.warning(f"No SOA serial found in {zone_file_path}, serial left unchanged")
+                    changes.append({'zone': zone, 'path': zone_file_path,
+                                    'current': current_content, 'new': zone_file.to_text()})
+
+                # One backup, validation and reload per zone for the whole batch
+                commit = self._commit_zone_files(ssh_client, changes)
+                for zone in zone_files:
+                    self.commit_scheduler.record_commit(sum(1 for _, edit in edits if edit[0] == zone))
+                result['zones'] = {
+                    zone: {'success': zone_commit['success'], 'message': zone_commit['message'],
+                           'steps': zone_commit['steps']}
+                    for zone, zone_commit in commit['zones'].items()
+                }
+                if not commit['success']:
+                    result['message'] = commit['message']
+                    for index, _ in edits:
+                        report[index]['message'] = f"Not applied: {commit['message']}"
+                    return result
+
+                for index, action, record in applied:
+                    report[index].update({'success': True, 'message': f'Record {action}', 'record': record})
+                result['success'] = True  # Records changed even if reload failed
+                if commit['reloaded']:
+                    result['message'] = (f'{len(edits)} operations applied to {len(changes)} zone(s) '
+                                         f'and DNS server reloaded')
                 else:
-                    new_content_lines.append(line)
-            
-            new_content = '\n'.join(new_content_lines)
-            
-            # Write new content to temporary file
-            temp_file = f'/tmp/zone_{zone}_{int(time.time())}'
-            sftp = ssh_client.open_sftp()
-            
-            with sftp.file(temp_file, 'w') as f:
-                f.write(new_content)
-            
-            # Validate zone file syntax
-            stdin, stdout, stderr = ssh_client.exec_command(f'named-checkzone {zone} {temp_file}')
-            validation_status = stdout.channel.recv_exit_status()
-            validation_output = stderr.read().decode()
-            
-            if validation_status != 0:
-                result['message'] = f'Zone validation error: {validation_output}'
-                ssh_client.exec_command(f'rm -f {temp_file}')
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Replace original zone file
-            stdin, stdout, stderr = ssh_client.exec_command(f'mv {temp_file} {zone_file_path}')
-            move_status = stdout.channel.recv_exit_status()
-            
-            if move_status != 0:
-                result['message'] = 'Error replacing zone file'
-                sftp.close()
-                ssh_client.close()
-                return result
-            
-            # Reload BIND configuration
-            stdin, stdout, stderr = ssh_client.exec_command('rndc reload')
-            reload_status = stdout.channel.recv_exit_status()
-            reload_output = stderr.read().decode()
-            
-            if reload_status == 0:
-                result['success'] = True
-                result['message'] = 'Record modified successfully and DNS server reloaded'
-            else:
-                result['success'] = True
-                result['message'] = f'Record modified but DNS reload failed: {reload_output}'
-            
-            # Construct full name for response
-            if updated_copy['name'] and not updated_copy['name'].endswith('.') and updated_copy['name'] != '@':
-                full_name = f"{updated_copy['name']}.{zone}"
-            elif updated_copy['name'] == '@':
-                full_name = zone
-            else:
-                full_name = updated_copy['name']
-            
-            result['record'] = {
-                'name': self._convert_to_relative_name(full_name, zone),
-                'type': updated_copy['type'],
-                'value': updated_copy['value'],
-                'ttl': updated_copy['ttl']
-            }
-            
-            sftp.close()
-            ssh_client.close()
-            
+                    result['message'] = (f'{len(edits)} operations applied to {len(changes)} zone(s) '
+                                         f'but DNS reload failed: {commit["reload_output"]}')
+
         except paramiko.AuthenticationException:
             result['message'] = 'SSH authentication failed'
         except paramiko.SSHException as e:
             result['message'] = f'SSH error: {str(e)}'
         except Exception as e:
-            logger.error(f"SSH error modifying record: {e}")
+            logger.error(f"SSH error applying record batch: {e}")
             result['message'] = f'Technical SSH error: {str(e)}'
-            
+
         return result
 
+    def _prepare_batch_operation(self, operation: Dict[str, Any]):
+        """Validate one batch operation
+
+        Returns (zone, past-tense action, zone file edit, record summary, dynamic
+        update change), or an error message.
+        """
+        if not isinstance(operation, dict):
+            return 'Operation must be an object'
+        op = str(operation.get('op', '')).strip().lower()
+        # Operations naming a zone differently ("Example.com." / "example.com")
+        # must edit the same parsed file in the same commit
+        zone = self._normalize_zone(str(operation.get('zone', '')))
+        if not zone:
+            return 'Zone is required'
+
+        if op == 'add':
+            record = {field: str(operation.get(field, '')).strip() for field in ('name', 'type', 'value')}
+            if not record['type'] or not record['value']:
+                return 'Type and value are required'
+            try:
+                record['ttl'] = int(operation.get('ttl', 3600))
+            except (TypeError, ValueError):
+                return 'TTL must be an integer'
+            validation = self._validate_record_parameters(zone, record['name'], record['type'],
+                                                          record['value'], record['ttl'])
+            if not validation['valid']:
+                return validation['message']
+            record['name'] = self._ensure_relative_name(record['name'], zone)
+            return (zone, 'added',
+                    lambda zone_file: self._zone_file_add(zone_file, zone, record['name'], record['type'],
+                                                          record['value'], record['ttl']),
+                    self._record_summary(zone, record),
+                    self._dynamic_add(zone, record['name'], record['type'], record['value'], record['ttl']))
+
+        if op == 'delete':
+            name, record_type, value = (str(operation.get(field, '')).strip() for field in ('name', 'type', 'value'))
+            if not record_type or not value:
+                return 'Type and value are required'
+            return (zone, 'deleted',
+                    lambda zone_file: self._zone_file_delete(zone_file, zone, name, record_type, value),
+                    None,
+                    self._dynamic_delete(zone, name, record_type, value))
+
+        if op == 'update':
+            original = operation.get('original')
+            updated = operation.get('updated')
+            if not isinstance(original, dict) or not isinstance(updated, dict):
+                return 'Incomplete data for modification'
+            original = {field: str(original.get(field, '')).strip() for field in ('name', 'type', 'value')}
+            if not original['type'] or not original['value']:
+                return 'Incomplete data for modification'
+            record = {field: str(updated.get(field, '')).strip() for field in ('name', 'type', 'value')}
+            for field in ('name', 'type', 'value'):
+                if not record[field]:
+                    return f'Field {field} is required'
+            try:
+                record['ttl'] = int(updated.get('ttl', 3600))
+            except (TypeError, ValueError):
+                return 'TTL must be an integer'
+            validation = self._validate_record_parameters(zone, record['name'], record['type'],
+                                                          record['value'], record['ttl'])
+            if not validation['valid']:
+                return validation['message']
+            record['name'] = self._ensure_relative_name(record['name'], zone)
+            return (zone, 'modified',
+                    lambda zone_file: self._zone_file_update(zone_file, zone, original, record),
+                    self._record_summary(zone, record),
+                    self._dynamic_update(zone, original, record))
+
+        return f"Unknown operation '{op}' (expected add, delete or update)"
+
     def _convert_to_relative_name(self, full_name: str, zone: str) -> str:
         """Convert a full name (FQDN) to a relative name for display"""
         if not full_name or not zone: